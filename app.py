@@ -93,6 +93,10 @@ def index():
 if __name__ == '__main__':
     # 设置日志
     setup_logging()
+
+    # 直接运行app.py时，spawn启动的子进程会以__mp_main__重新导入app.py（Flask、控制器、爬虫），
+    # 不使用PDF解析进程池；waitress启动时主模块是waitress-serve，子进程只导入解析模块
+    env.PDF_PARSE_WORKERS = 0
     
     # 导入并初始化调度器 - 单例模式避免重复初始化
     from scheduler import init_scheduler, shutdown_scheduler
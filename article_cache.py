@@ -0,0 +1,173 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import env
+from cache_store import DiskStore, SingleFlight, make_key
+
+logger = logging.getLogger(__name__)
+
+# 不影响页面内容的跟踪参数，规范化URL时去掉
+TRACKING_PARAMS = {'spm', 'from', 'fromid', 'ref', 'share_token', 'gclid', 'fbclid', 'ocid', 'cvid'}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL，同一篇文章的不同写法得到相同的缓存键
+    协议和域名转小写、去掉默认端口、片段和跟踪参数、查询参数排序
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'http'
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f'{host}:{port}'
+    path = parts.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')
+    )
+    # 文章内容与http/https无关，缓存键中不区分协议
+    return urlunsplit(('', host, path, urlencode(query), '')).lstrip('/')
+
+
+class ArticleCache:
+    """
+    按规范化URL缓存的JSON结果
+
+    内存中按LRU保留max_entries条，可选SQLite磁盘层，
+    并发请求同一URL时只加载一次，加载结果为None时不缓存，
+    等待超过wait_timeout秒仍未加载完时自行加载
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int, disk: DiskStore = None,
+                 wait_timeout: float = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.disk = disk
+        self.wait_timeout = wait_timeout
+        self._entries: OrderedDict = OrderedDict()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    def _get_memory(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _put_memory(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_disk(self, key: str):
+        if not self.disk:
+            return None
+        try:
+            value, expires_at = self.disk.get(self.namespace, key)
+        except Exception:
+            logger.error(f'读取磁盘缓存-失败[{self.namespace}]', exc_info=True)
+            return None
+        if value is not None:
+            self._put_memory(key, value, expires_at)
+        return value
+
+    def _put_disk(self, key: str, value, expires_at: float):
+        if not self.disk:
+            return
+        try:
+            self.disk.put(self.namespace, key, value, expires_at)
+        except Exception:
+            logger.error(f'写入磁盘缓存-失败[{self.namespace}]', exc_info=True)
+
+    def lookup(self, key: str):
+        value = self._get_memory(key)
+        if value is None:
+            value = self._get_disk(key)
+        return value
+
+    def store(self, key: str, value):
+        expires_at = time.time() + self.ttl
+        self._put_memory(key, value, expires_at)
+        self._put_disk(key, value, expires_at)
+
+    def get(self, key: str, loader):
+        """
+        获取缓存，未命中时调用loader加载
+        :param key: 缓存键，URL需先经过normalize_url
+        """
+        if self.ttl <= 0:
+            return loader()
+
+        key = make_key(key)
+        value = self.lookup(key)
+        if value is not None:
+            logger.info(f'缓存命中[{self.namespace}]')
+            return value
+
+        def load():
+            loaded = loader()
+            if loaded is not None:
+                self.store(key, loaded)
+            return loaded
+
+        value, _ = self._flight.do(key, load, self.wait_timeout)
+        return value
+
+    def invalidate(self, key: str):
+        key = make_key(key)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk:
+            self.disk.delete(self.namespace, key)
+
+
+_disk = None
+_disk_lock = threading.Lock()
+
+
+def get_disk_store() -> None | DiskStore:
+    global _disk
+    if not env.ARTICLE_CACHE_DB:
+        return None
+    if _disk is None:
+        with _disk_lock:
+            if _disk is None:
+                try:
+                    _disk = DiskStore(env.ARTICLE_CACHE_DB, env.ARTICLE_CACHE_DISK_MAX_ENTRIES)
+                except Exception:
+                    logger.error(f'打开磁盘缓存-失败[{env.ARTICLE_CACHE_DB}]，只使用内存缓存', exc_info=True)
+                    return None
+    return _disk
+
+
+# 提取后的文章，键为规范化的文章URL
+articles = ArticleCache('article', env.ARTICLE_CACHE_TTL, env.ARTICLE_CACHE_MAX_ENTRIES, get_disk_store(),
+                        env.ARTICLE_CACHE_WAIT_TIMEOUT)
+# 必应新闻搜索结果，键为规范化的查询参数
+searches = ArticleCache('bing_news', env.BING_SEARCH_CACHE_TTL, env.ARTICLE_CACHE_MAX_ENTRIES, get_disk_store(),
+                        env.ARTICLE_CACHE_WAIT_TIMEOUT)
+
+
+def get_article(url: str, loader):
+    return articles.get(normalize_url(url), loader)
+
+
+def get_search(params: dict, loader):
+    key = json.dumps(params, ensure_ascii=False, sort_keys=True)
+    return searches.get(key, loader)
@@ -1,11 +1,179 @@
+import asyncio
+import atexit
+import copy
 import logging
+import threading
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+import env
+import workflow_stream
+
 logger = logging.getLogger(__name__)
-async def send_post_request(session, url, headers, data):
-    async with session.post(url=url, headers=headers, json=data, ssl=True) as response:
-        if response.status != 200:
-            logger.error(f"Failed to post to {url} with status code {response.status},{response.text}")
-            return {
-                "data":
-                    {"outputs":
-                         {"result": "本次总结请求出错"}}}
-        return await response.json()
\ No newline at end of file
+
+# 请求失败时返回的默认结果，与工作流正常返回的格式一致
+ERROR_RESULT = {"data": {"outputs": {"result": "本次总结请求出错"}}}
+# 需要重试的状态码
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Flask的异步视图每个请求都在新的事件循环中执行，而aiohttp的会话绑定事件循环，
+# 所以共享的会话放在后台常驻事件循环中，所有请求都提交到这里执行，复用同一个连接池
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+_session = None
+
+
+def _get_loop():
+    global _loop, _loop_thread
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                _loop_thread = threading.Thread(target=loop.run_forever, name='async-request', daemon=True)
+                _loop_thread.start()
+                _loop = loop
+                atexit.register(close)
+    return _loop
+
+
+def _get_session() -> ClientSession:
+    """
+    只在后台事件循环中调用，不需要加锁
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = TCPConnector(
+            limit=env.WORKFLOW_HTTP_LIMIT,
+            limit_per_host=env.WORKFLOW_HTTP_LIMIT_PER_HOST,
+            ttl_dns_cache=env.WORKFLOW_HTTP_DNS_TTL,
+            keepalive_timeout=env.WORKFLOW_HTTP_KEEPALIVE,
+        )
+        _session = ClientSession(connector=connector, timeout=ClientTimeout(total=None, sock_connect=10))
+    return _session
+
+
+def close():
+    """
+    关闭共享的会话，进程退出时自动调用
+    """
+    if _loop is None or _session is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(5)
+    except Exception:
+        logger.error('关闭共享会话-失败', exc_info=True)
+
+
+async def run_in_app_loop(coro):
+    """
+    在后台事件循环中执行协程，可以在任意事件循环中await，调用方取消时一并取消
+    """
+    loop = _get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def _should_retry(e: Exception) -> bool:
+    if isinstance(e, workflow_stream.WorkflowTimeout):
+        return True
+    if isinstance(e, workflow_stream.WorkflowStreamError):
+        # 工作流返回的错误事件和4xx重试也不会成功
+        return e.status_code in RETRY_STATUS
+    return isinstance(e, (ClientError, asyncio.TimeoutError))
+
+
+async def _post_workflow(url, headers, data, retries, timeout):
+    session = _get_session()
+    for attempt in range(retries + 1):
+        try:
+            return await workflow_stream.apost(session, url, headers, data, timeout=timeout)
+        except Exception as e:
+            if attempt >= retries or not _should_retry(e):
+                raise
+            delay = env.WORKFLOW_HTTP_BACKOFF * 2 ** attempt
+            logger.warning(f'工作流请求失败，{delay}s后重试[{url}][第{attempt + 1}次][{e!r}]')
+            await asyncio.sleep(delay)
+
+
+async def post_workflow(url, headers, data, retries: int = None, timeout: float = None) -> dict:
+    """
+    使用共享的连接池调用工作流，连接失败、超时和429/5xx按指数退避重试，重试后仍失败时抛出异常
+    :param retries: 重试次数，默认为WORKFLOW_HTTP_RETRIES
+    :param timeout: 单次请求的超时时间(秒)，默认为WORKFLOW_HTTP_TIMEOUT
+    """
+    retries = env.WORKFLOW_HTTP_RETRIES if retries is None else retries
+    timeout = env.WORKFLOW_HTTP_TIMEOUT if timeout is None else timeout
+    return await run_in_app_loop(_post_workflow(url, headers, data, retries, timeout))
+
+
+async def send_post_request(url, headers, data, error_result=ERROR_RESULT):
+    """
+    调用工作流，重试后仍失败时返回error_result
+    """
+    try:
+        return await post_workflow(url, headers, data)
+    except (workflow_stream.WorkflowStreamError, ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Failed to post to {url}, {e!r}")
+        return copy.deepcopy(error_result)
+
+
+class RateLimiter:
+    """
+    异步限速器，按每秒请求数依次放行，同时限制进行中的请求数量
+    等待期间只让出事件循环，不会阻塞其他请求
+    """
+
+    def __init__(self, rps: float, max_in_flight: int):
+        self.interval = 1.0 / rps if rps and rps > 0 else 0
+        self.semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _wait_turn(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            delay = self._next_at - now
+            # 预约下一个放行时间，锁内不睡眠
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await self._wait_turn()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+    async def run(self, func, *args, **kwargs):
+        async with self:
+            return await func(*args, **kwargs)
+
+
+def build_rate_limiter(rps: float = None, max_in_flight: int = None, sleep_time: float = None) -> RateLimiter:
+    """
+    根据请求参数创建限速器
+    :param rps: 每秒请求数，未传时按sleep_time换算，都未传时使用默认值
+    :param max_in_flight: 最多同时进行的请求数
+    :param sleep_time: 旧参数，两次请求之间的间隔(秒)
+    """
+    if not rps:
+        if sleep_time is not None:
+            # sleep_time为0时只限制并发数
+            rps = 1.0 / sleep_time if sleep_time > 0 else 0
+        else:
+            rps = env.WORKFLOW_RPS
+    if not max_in_flight:
+        max_in_flight = env.WORKFLOW_MAX_IN_FLIGHT
+    logger.info(f'工作流请求限速[rps={rps}][max_in_flight={max_in_flight}]')
+    return RateLimiter(rps, max_in_flight)
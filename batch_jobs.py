@@ -0,0 +1,419 @@
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+import async_request
+import call_records
+import env
+import excel_stream
+import label_cache
+import lmjj_agent
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+# 只在查询结果中出现：记录为执行中，但执行它的服务进程已退出，需要调用恢复接口继续执行
+INTERRUPTED = 'interrupted'
+
+
+class BatchJobError(Exception):
+    """批量任务参数错误或任务不存在"""
+
+
+class JobKind:
+    """
+    一种批量任务：读取上传的表格、拆分出每次工作流请求的输入、校验单个结果、汇总成输出表格
+    拆分结果只取决于表格和参数，恢复时重新拆分即可与检查点对应
+    """
+    name = ''
+    required = ('app_code', 'file_info', 'from_addr', 'app_key')
+    # 工作流输入、输出变量名
+    input_key = 'text'
+    output_key = 'text'
+    result_filename = ''
+    # 需要读取的列和追加到原表格右侧的结果列
+    columns = []
+    result_columns = []
+
+    def prepare(self, params: dict):
+        """
+        校验并补全参数，补全后的参数保存在任务中，恢复时按同样的参数拆分
+        """
+        missing = [i for i in self.required if not params.get(i)]
+        if missing:
+            raise BatchJobError(f'缺少参数{missing}')
+
+    def load(self, file_path: str) -> pd.DataFrame:
+        return excel_stream.read_columns(file_path, self.columns)
+
+    def prompts(self, df: pd.DataFrame, params: dict) -> list[str]:
+        raise NotImplementedError
+
+    def parse(self, text: str):
+        """
+        校验单个请求的结果，格式不对时抛出异常，该请求会重试
+        """
+
+    def build(self, df: pd.DataFrame, params: dict, texts: list[str]) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class SemanticLabel(JobKind):
+    name = 'semantic_label'
+    result_filename = '识别对话详情-大模型'
+    columns = call_records.LABEL_COLUMNS
+    result_columns = call_records.LABEL_RESULT_COLUMNS
+    strip = True
+
+    def prepare(self, params):
+        super().prepare(params)
+        params['token_budget'] = params.get('token_budget') or env.SEMANTIC_LABEL_TOKEN_BUDGET
+        params['max_rows'] = env.SEMANTIC_LABEL_MAX_ROWS
+        if not params['token_budget'] and not params.get('output_len'):
+            raise BatchJobError("缺少参数['output_len']")
+
+    def load(self, file_path):
+        return call_records.drop_unrecognized(super().load(file_path))
+
+    def slices(self, df, params):
+        return call_records.label_slices(df, params.get('output_len'), params.get('token_budget'),
+                                         params.get('max_rows'))
+
+    def prompts(self, df, params):
+        return [call_records.label_prompt(i) for i in self.slices(df, params)]
+
+    def parse(self, text):
+        call_records.parse_label_text(text)
+
+    def build(self, df, params, texts):
+        df1_slice_list = self.slices(df, params)
+        keys = call_records.utterance_keys(df)
+        # 批量任务的拆分要与检查点对应，不跳过已缓存的记录，只把结果补充到标签缓存
+        fresh = call_records.collect_labels(df1_slice_list, texts, keys)
+        label_cache.store(label_cache.workflow_key(params['from_addr'], params['app_key']), fresh)
+        return call_records.fill_labels(df, keys, {}, fresh, call_records.slice_positions(df1_slice_list),
+                                        strip=self.strip)
+
+
+class SemanticLabelV2(SemanticLabel):
+    name = 'semantic_label_v2'
+    strip = False
+
+    def load(self, file_path):
+        return call_records.fill_unrecognized(JobKind.load(self, file_path))
+
+
+class ChatSummary(JobKind):
+    name = 'chat_summary'
+    input_key = 'connectCot'
+    output_key = 'result'
+    result_filename = '识别对话总结'
+    columns = call_records.SUMMARY_COLUMNS
+    result_columns = call_records.SUMMARY_RESULT_COLUMNS
+
+    def load(self, file_path):
+        return call_records.fill_unrecognized(super().load(file_path))
+
+    def prompts(self, df, params):
+        _, prompts = call_records.build_case_prompts(df)
+        return prompts
+
+    def build(self, df, params, texts):
+        case_ids, _ = call_records.build_case_prompts(df)
+        call_records.fill_case_results(df, case_ids, texts, self.result_columns[0])
+        return df
+
+
+JOB_KINDS = {kind.name: kind for kind in (SemanticLabel(), SemanticLabelV2(), ChatSummary())}
+
+
+_meta_lock = threading.Lock()
+
+
+def _write_json(path: str, data):
+    # 先写临时文件再替换，进程中途退出也不会留下不完整的文件
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class BatchJob:
+    """
+    一个批量任务在磁盘上的状态
+    job.json保存参数和状态，input.xlsx保存下载的表格，chunks/<序号>.json保存每个已完成请求的结果
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.dir = os.path.join(env.BATCH_JOB_DIR, job_id)
+        self.meta_path = os.path.join(self.dir, 'job.json')
+        self.lock_path = os.path.join(self.dir, 'job.lock')
+        self.input_path = os.path.join(self.dir, 'input.xlsx')
+        self.chunk_dir = os.path.join(self.dir, 'chunks')
+
+    def exists(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def read(self) -> dict:
+        with open(self.meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def update(self, **fields):
+        with _meta_lock:
+            meta = self.read()
+            meta.update(fields)
+            meta['updated_at'] = time.time()
+            _write_json(self.meta_path, meta)
+
+    def _chunk_path(self, index: int) -> str:
+        return os.path.join(self.chunk_dir, f'{index}.json')
+
+    def save_chunk(self, index: int, text: str):
+        _write_json(self._chunk_path(index), {'text': text})
+
+    def load_chunk(self, index: int) -> None | str:
+        try:
+            with open(self._chunk_path(index), encoding='utf-8') as f:
+                return json.load(f)['text']
+        except FileNotFoundError:
+            return None
+
+    def done_count(self) -> int:
+        return len([i for i in os.listdir(self.chunk_dir) if i.endswith('.json')])
+
+
+_running = set()
+_running_lock = threading.Lock()
+
+
+def _get_job(job_id: str) -> BatchJob:
+    if not job_id or not re.fullmatch(r'[0-9a-f]{32}', job_id):
+        raise BatchJobError(f'任务不存在[{job_id}]')
+    job = BatchJob(job_id)
+    if not job.exists():
+        raise BatchJobError(f'任务不存在[{job_id}]')
+    return job
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_active(job: BatchJob, meta: dict) -> bool:
+    """
+    任务是否正在某个服务进程中执行
+    """
+    if meta.get('pid') == os.getpid():
+        return job.job_id in _running
+    return meta.get('status') == RUNNING and bool(meta.get('pid')) and _pid_alive(meta['pid'])
+
+
+@contextlib.contextmanager
+def _job_lock(job: BatchJob):
+    """
+    跨进程的任务锁，多个服务进程共用BATCH_JOB_DIR，同一时间只有一个进程能认领任务
+    """
+    with open(job.lock_path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _start(job: BatchJob) -> bool:
+    """
+    认领任务并在后台线程中执行，任务已完成或正在某个服务进程中执行时不认领
+    :return: 是否由当前进程开始执行
+    """
+    with _job_lock(job):
+        # 持有锁后重新检查，其他进程可能刚刚认领
+        meta = job.read()
+        if meta['status'] == FINISHED or _is_active(job, meta):
+            return False
+        with _running_lock:
+            if job.job_id in _running:
+                return False
+            _running.add(job.job_id)
+        job.update(status=RUNNING, pid=os.getpid(), error='')
+    threading.Thread(target=_run, args=(job,), name=f'batch-job-{job.job_id[:8]}', daemon=True).start()
+    return True
+
+
+def _load_input(job: BatchJob, kind: JobKind, params: dict) -> pd.DataFrame:
+    if os.path.exists(job.input_path):
+        return kind.load(job.input_path)
+
+    # 只解析第一个文件
+    file_ids = list(lmjj_agent.iter_file_ids(params['file_info']))
+    if not file_ids:
+        raise BatchJobError('file_info中没有文件')
+    tenant_id, file_id = file_ids[0]
+    file_path = lmjj_agent.file_download_by_tenant(
+        app_code=params['app_code'],
+        file_id=file_id,
+        tenant_id=tenant_id,
+        remote_addr=params['remote_addr']
+    )
+    # 保存原表格，生成结果时逐行复制，只有需要的列加载到内存
+    tmp_path = f'{job.input_path}.tmp'
+    shutil.copyfile(file_path, tmp_path)
+    os.replace(tmp_path, job.input_path)
+    return kind.load(job.input_path)
+
+
+async def _run_chunk(limiter, url, headers, job: BatchJob, kind: JobKind, index: int, prompt: str) -> bool:
+    for attempt in range(env.BATCH_JOB_RETRIES + 1):
+        data = {
+            "inputs": {
+                kind.input_key: prompt
+            },
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
+            "user": str(uuid.uuid4())
+        }
+        try:
+            async with limiter:
+                # 首个token超时或生成卡住时会提前取消，按失败重试；结果格式不对也在这里重试，所以不再叠加连接层的重试
+                resp_json = await async_request.post_workflow(url, headers, data, retries=0,
+                                                              timeout=env.BATCH_JOB_REQUEST_TIMEOUT)
+            text = resp_json["data"]["outputs"][kind.output_key]
+            kind.parse(text)
+            job.save_chunk(index, text)
+            return True
+        except Exception as e:
+            logger.error(f'批量任务请求失败[{job.job_id}][第{index + 1}个][第{attempt + 1}次][{e!r}]')
+            if attempt < env.BATCH_JOB_RETRIES:
+                await asyncio.sleep(min(60, 2 ** attempt))
+    return False
+
+
+async def _run_chunks(job: BatchJob, kind: JobKind, params: dict, prompts: list[str], indexes: list[int]) -> list[int]:
+    """
+    并发执行未完成的请求，每个请求完成后立即保存检查点
+    :return: 重试后仍失败的请求序号
+    """
+    limiter = async_request.build_rate_limiter(params.get('rps'), params.get('max_in_flight'), params.get('sleep_time'))
+    url = f"{params['from_addr']}v1/workflows/run"
+    headers = {'Authorization': f"Bearer {params['app_key']}"}
+    succeeded = await asyncio.gather(*[
+        _run_chunk(limiter, url, headers, job, kind, i, prompts[i]) for i in indexes
+    ])
+    return [i for i, ok in zip(indexes, succeeded) if not ok]
+
+
+def _run(job: BatchJob):
+    try:
+        meta = job.read()
+        kind = JOB_KINDS[meta['kind']]
+        params = meta['params']
+
+        df = _load_input(job, kind, params)
+        prompts = kind.prompts(df, params)
+        job.update(total=len(prompts))
+        # 已有检查点的请求不再重复执行
+        indexes = [i for i in range(len(prompts)) if job.load_chunk(i) is None]
+        logger.info(f'批量任务开始[{job.job_id}][{kind.name}][共{len(prompts)}个][待执行{len(indexes)}个]')
+
+        failed = asyncio.run(_run_chunks(job, kind, params, prompts, indexes)) if indexes else []
+        if failed:
+            job.update(status=FAILED, failed_chunks=failed,
+                       error=f'{len(failed)}个请求重试后仍失败，可调用恢复接口继续执行')
+            return
+
+        texts = [job.load_chunk(i) for i in range(len(prompts))]
+        ret_df = kind.build(df, params, texts)
+        tmp_filepath = f'{tempfile.gettempdir()}/{kind.result_filename}-{job.job_id}.xlsx'
+        excel_stream.write_with_source(job.input_path, tmp_filepath, ret_df, kind.result_columns)
+        download_result = lmjj_agent.upload_file(app_code=params['app_code'], file=tmp_filepath,
+                                                 remote_addr=params['from_addr'])
+        job.update(status=FINISHED, failed_chunks=[], result=download_result)
+        logger.info(f'批量任务完成[{job.job_id}][{download_result}]')
+    except Exception as e:
+        logger.error(f'批量任务执行失败[{job.job_id}]', exc_info=True)
+        job.update(status=FAILED, error=str(e))
+    finally:
+        with _running_lock:
+            _running.discard(job.job_id)
+
+
+def submit(kind_name: str, params: dict) -> dict:
+    """
+    提交批量任务，在后台线程中执行，立即返回任务状态
+    """
+    kind = JOB_KINDS.get(kind_name)
+    if not kind:
+        raise BatchJobError(f'不支持的任务类型[{kind_name}]')
+    kind.prepare(params)
+
+    job = BatchJob(uuid.uuid4().hex)
+    os.makedirs(job.chunk_dir)
+    now = time.time()
+    _write_json(job.meta_path, {
+        'job_id': job.job_id,
+        'kind': kind_name,
+        'params': params,
+        'status': PENDING,
+        'total': None,
+        'failed_chunks': [],
+        'error': '',
+        'result': None,
+        'pid': None,
+        'created_at': now,
+        'updated_at': now,
+    })
+    _start(job)
+    return get_status(job.job_id)
+
+
+def get_status(job_id: str) -> dict:
+    """
+    查询任务状态，完成后result为上传结果，只读取不修改任务
+    服务重启导致中断的任务status为interrupted，调用resume从检查点继续执行
+    """
+    job = _get_job(job_id)
+    meta = job.read()
+    status = meta['status']
+    if status in (PENDING, RUNNING) and not _is_active(job, meta):
+        status = INTERRUPTED
+    return {
+        'job_id': job_id,
+        'kind': meta['kind'],
+        'status': status,
+        'total': meta['total'],
+        'done': job.done_count(),
+        'failed_chunks': meta['failed_chunks'],
+        'error': meta['error'],
+        'result': meta['result'],
+    }
+
+
+def resume(job_id: str) -> dict:
+    """
+    继续执行失败或中断的任务，只执行没有检查点的请求
+    多个服务进程同时恢复同一个任务时只有一个进程会执行
+    """
+    job = _get_job(job_id)
+    if _start(job):
+        logger.info(f'批量任务从检查点继续[{job_id}]')
+    return get_status(job_id)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+替身服务的公共工具：在后台线程中启动aiohttp应用，供基准测试、自测和pytest使用
+"""
+
+import asyncio
+import socket
+import threading
+
+from aiohttp import web
+
+
+def free_port() -> int:
+    """本机当前空闲的端口"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_in_thread(app: web.Application, port: int):
+    """在后台线程的事件循环中启动应用，返回该事件循环"""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait(10)
+    return loop
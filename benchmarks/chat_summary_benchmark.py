@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+chat_summary 按案件汇总对话的耗时对比
+
+生成合成的外呼记录表（每个案件若干条对话），对比：
+1. 旧写法：对每个案件编号做一次布尔筛选 + 按行apply拼接，结果按案件逐个df.loc写回
+2. 新写法：call_records.build_case_prompts / fill_case_results，一次groupby + 按列拼接 + map写回
+
+旧写法的耗时与 案件数 × 行数 成正比，只在不超过 --old-max-rows 的规模上执行。
+
+用法：python benchmarks/chat_summary_benchmark.py [--rows 200000] [--rows-per-case 10] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+import pandas as pd
+
+import call_records
+
+
+def make_frame(rows, rows_per_case, seed=0):
+    """生成合成的外呼记录，同一案件的对话相邻，少量解析命令为空"""
+    rng = np.random.default_rng(seed)
+    case_count = max(1, rows // rows_per_case)
+    case_ids = np.repeat([f'CASE{i:08d}' for i in range(case_count)], rows_per_case)[:rows]
+    scripts = np.array(['您好，请问是本人吗', '您的账单已逾期', '请问什么时候可以还款', '好的，感谢您的配合'])
+    replies = np.array(['是的', '我知道了', '下周还', '无识别', '无声音'])
+    df = pd.DataFrame({
+        '案件编号': case_ids,
+        'AI话术': scripts[rng.integers(0, len(scripts), rows)],
+        '解析命令': replies[rng.integers(0, len(replies), rows)],
+    })
+    df.loc[rng.random(rows) < 0.01, '解析命令'] = np.nan
+    return df
+
+
+def old_build(df):
+    case_num_list = df["案件编号"].unique()
+    prompts = []
+    for case_id in case_num_list:
+        extracted_data = df[df['案件编号'] == case_id][['AI话术', '解析命令']]
+        output_strings = extracted_data.apply(lambda row: f"客服: {row['AI话术']}，客户: {row['解析命令']}",
+                                              axis=1).tolist()
+        prompts.append("\n".join(output_strings))
+    return list(case_num_list), prompts
+
+
+def old_fill(df, case_num_list, results):
+    df["总结"] = [None] * len(df)
+    for i, case_id in enumerate(case_num_list):
+        df.loc[df["案件编号"] == case_id, "总结"] = results[i]
+
+
+def new_build(df):
+    return call_records.build_case_prompts(df)
+
+
+def new_fill(df, case_num_list, results):
+    call_records.fill_case_results(df, case_num_list, results, "总结")
+
+
+def measure(build, fill, df, repeat):
+    """返回 汇总耗时中位数(毫秒), 写回耗时中位数(毫秒), 汇总结果, 写回后的总结列"""
+    build_timings, fill_timings = [], []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        case_ids, prompts = build(frame)
+        build_timings.append((time.perf_counter() - start) * 1000)
+        results = [f'总结{i}' for i in range(len(case_ids))]
+        start = time.perf_counter()
+        fill(frame, case_ids, results)
+        fill_timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(build_timings), statistics.median(fill_timings), (case_ids, prompts), frame["总结"]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='chat_summary按案件汇总对话的耗时对比')
+    arg_parser.add_argument('--rows', type=int, default=200000, help='最大行数')
+    arg_parser.add_argument('--rows-per-case', type=int, default=10, help='每个案件的对话条数')
+    arg_parser.add_argument('--old-max-rows', type=int, default=25000, help='旧写法执行的最大行数')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='每项测试的执行次数')
+    args = arg_parser.parse_args()
+
+    sizes = []
+    rows = args.rows
+    while rows >= 1000 and len(sizes) < 5:
+        sizes.insert(0, rows)
+        rows //= 2
+
+    print(f"每个案件{args.rows_per_case}条对话, 执行次数: {args.repeat}")
+    print(f"{'行数':>8}{'案件数':>8}{'旧-汇总ms':>12}{'旧-写回ms':>12}{'新-汇总ms':>12}{'新-写回ms':>12}{'新-每千行ms':>14}")
+    for rows in sizes:
+        df = make_frame(rows, args.rows_per_case)
+        case_count = df['案件编号'].nunique()
+        new_build_ms, new_fill_ms, new_prompts, new_summary = measure(new_build, new_fill, df, args.repeat)
+
+        if rows <= args.old_max_rows:
+            old_build_ms, old_fill_ms, old_prompts, old_summary = measure(old_build, old_fill, df, 1)
+            old_cols = f"{old_build_ms:>12.1f}{old_fill_ms:>12.1f}"
+            # 确认两种写法的结果一致
+            if old_prompts != new_prompts or not old_summary.equals(new_summary.astype(object)):
+                print(f"  注意: {rows}行时新旧写法的结果不一致")
+        else:
+            old_cols = f"{'-':>12}{'-':>12}"
+
+        per_k_rows = (new_build_ms + new_fill_ms) / rows * 1000
+        print(f"{rows:>8}{case_count:>8}{old_cols}{new_build_ms:>12.1f}{new_fill_ms:>12.1f}{per_k_rows:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
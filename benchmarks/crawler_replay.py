@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬虫离线录制/回放基准测试
+
+所有爬虫的HTTP请求都经过crawlers.http_client的共享HTTPAdapter（异步引擎的请求也被转到这里），本脚本把它替换为：
+- 录制模式：正常访问网站，同时把每个响应保存到 benchmarks/fixtures/<数据源>.json
+- 回放模式：不访问网络，直接从fixture返回响应，统计每个爬虫的耗时、解析耗时、字节数和内存分配
+
+用法：
+    # 在线录制（数据源名称与/api/crawlers/batch一致，省略表示全部）
+    python benchmarks/crawler_replay.py record cnfin stock_index
+
+    # 把手工保存的页面加入fixture，例如仓库中的debug_list_page.html
+    python benchmarks/crawler_replay.py import chinapolicy http://www.chinapolicy.net/list.php?fid-40-page-1.htm debug_list_page.html --encoding gbk
+
+    # 离线回放并输出报告，可与基线对比，超过阈值时以非0状态码退出（用于CI）
+    python benchmarks/crawler_replay.py run --repeat 5 --baseline benchmarks/baseline.json
+    python benchmarks/crawler_replay.py run --save-baseline benchmarks/baseline.json
+
+回放时time.sleep不会真正等待（跳过的等待时间单独统计），爬虫写出的调试文件落在临时目录中。
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from crawlers import async_engine, http_client
+from crawlers.batch import CRAWLER_SOURCES
+from crawlers.result_cache import crawl_cache
+
+FIXTURE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'fixtures')
+
+# 与基线对比时，耗时增加超过该比例且超过最小绝对差值(毫秒)才视为退化，避免抖动误报
+DEFAULT_THRESHOLD = 0.25
+MIN_REGRESSION_MS = 10.0
+
+
+def fixture_path(name):
+    return os.path.join(FIXTURE_DIR, f'{name}.json')
+
+
+def load_fixture(name):
+    path = fixture_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_fixture(name, responses):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    fixture = {
+        'name': name,
+        'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'responses': responses,
+    }
+    with open(fixture_path(name), 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False, indent=1)
+
+
+def body_digest(body):
+    if not body:
+        return ''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha1(body).hexdigest()
+
+
+def strip_query(url):
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+
+
+def encode_response(method, url, request_body, status, reason, headers, content):
+    return {
+        'method': method,
+        'url': url,
+        'body_sha1': body_digest(request_body),
+        'status': status,
+        'reason': reason,
+        'headers': dict(headers),
+        'content': base64.b64encode(content or b'').decode('ascii'),
+    }
+
+
+class RecordingAdapter(HTTPAdapter):
+    """正常发送请求，同时保存每个响应（包括重定向的中间响应）"""
+
+    def __init__(self):
+        super().__init__(
+            pool_connections=http_client.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=http_client.HTTP_POOL_MAXSIZE,
+            max_retries=http_client.build_retry(),
+        )
+        self.responses = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        content = response.content
+        # 响应内容已被requests解压，去掉相关头，回放时原样返回
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+        with self._lock:
+            self.responses.append(encode_response(
+                request.method, request.url, request.body,
+                response.status_code, response.reason, headers, content,
+            ))
+        return response
+
+    def take(self):
+        with self._lock:
+            responses, self.responses = self.responses, []
+        return responses
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    从fixture返回响应，不访问网络
+
+    先按(方法, 完整URL, 请求体)匹配，找不到时忽略查询参数再匹配一次（时间戳等易变参数）。
+    同一请求录制了多次时按录制顺序返回，用完后重复返回最后一次。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.load([])
+
+    def load(self, responses):
+        with self._lock:
+            self._exact = defaultdict(list)
+            self._loose = defaultdict(list)
+            for item in responses:
+                self._exact[(item['method'], item['url'], item.get('body_sha1', ''))].append(item)
+                self._loose[(item['method'], strip_query(item['url']))].append(item)
+            self.reset_stats()
+
+    def reset_stats(self):
+        self.bytes = 0
+        self.requests = 0
+        self.misses = []
+
+    @staticmethod
+    def _pop(candidates):
+        return candidates.pop(0) if len(candidates) > 1 else candidates[0]
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests += 1
+            item = None
+            candidates = self._exact.get((request.method, request.url, body_digest(request.body)))
+            if candidates:
+                item = self._pop(candidates)
+            else:
+                candidates = self._loose.get((request.method, strip_query(request.url)))
+                if candidates:
+                    item = self._pop(candidates)
+            if item is None:
+                self.misses.append(f'{request.method} {request.url}')
+                raise requests.exceptions.ConnectionError(f'离线回放未找到响应: {request.method} {request.url}', request=request)
+
+            content = base64.b64decode(item['content'])
+            self.bytes += len(content)
+
+        response = requests.Response()
+        response.status_code = item['status']
+        response.reason = item.get('reason') or ''
+        response.headers = CaseInsensitiveDict(item['headers'])
+        response._content = content
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self):
+        pass
+
+
+async def adapter_transport(method, url, headers=None, params=None, json=None, data=None, cookies=None, timeout=None):
+    """异步引擎的传输层，同样经过共享HTTPAdapter，从而可以被录制和回放"""
+    def send():
+        session = http_client.new_session()
+        response = session.request(method, url, headers=headers, params=params, json=json, data=data,
+                                   cookies=cookies, timeout=timeout)
+        return async_engine.FetchResult(response.url, response.status_code, dict(response.headers), response.content)
+
+    return await asyncio.to_thread(send)
+
+
+class Instrumentation:
+    """统计解析耗时（HTML解析和JSON解码）以及被跳过的sleep时间"""
+
+    def __init__(self):
+        self.parse_seconds = 0.0
+        self.sleep_seconds = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def reset(self):
+        with self._lock:
+            self.parse_seconds = 0.0
+            self.sleep_seconds = 0.0
+
+    def _timed(self, func):
+        def wrapper(*args, **kwargs):
+            # 嵌套调用（如Response.json内部调用json.loads）只统计最外层
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+                if depth == 0:
+                    with self._lock:
+                        self.parse_seconds += time.perf_counter() - start
+        return wrapper
+
+    def _sleep(self, seconds):
+        with self._lock:
+            self.sleep_seconds += seconds
+
+    @contextlib.contextmanager
+    def installed(self):
+        patches = [
+            (BeautifulSoup, '__init__', self._timed(BeautifulSoup.__init__)),
+            (requests.Response, 'json', self._timed(requests.Response.json)),
+            (json, 'loads', self._timed(json.loads)),
+            (time, 'sleep', self._sleep),
+        ]
+        originals = [(target, attr, getattr(target, attr)) for target, attr, _ in patches]
+        for target, attr, replacement in patches:
+            setattr(target, attr, replacement)
+        try:
+            yield self
+        finally:
+            for target, attr, original in originals:
+                setattr(target, attr, original)
+
+
+@contextlib.contextmanager
+def crawler_sandbox(verbose=False):
+    """在临时目录中运行，屏蔽爬虫的print输出，避免调试文件覆盖仓库中的页面"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='crawler-replay-') as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            if verbose:
+                yield
+            else:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    yield
+        finally:
+            os.chdir(cwd)
+
+
+def run_source(name):
+    """执行一次爬虫，绕过结果缓存"""
+    crawl_cache.invalidate()
+    try:
+        CRAWLER_SOURCES[name]()
+        return None
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'
+
+
+def resolve_names(names):
+    if not names or names == ['all']:
+        return list(CRAWLER_SOURCES)
+    unknown = [name for name in names if name not in CRAWLER_SOURCES]
+    if unknown:
+        raise SystemExit(f'未知的数据源: {", ".join(unknown)}')
+    return names
+
+
+def cmd_record(args):
+    adapter = RecordingAdapter()
+    http_client.set_adapter(adapter)
+    async_engine.set_transport(adapter_transport)
+    for name in resolve_names(args.names):
+        with crawler_sandbox(args.verbose):
+            error = run_source(name)
+        responses = adapter.take()
+        save_fixture(name, responses)
+        status = f'出错 {error}' if error else '完成'
+        print(f'{name}: 录制{len(responses)}个响应，{status}')
+
+
+def cmd_import(args):
+    with open(args.file, 'rb') as f:
+        content = f.read()
+    if args.encoding:
+        content = content.decode('utf-8').encode(args.encoding)
+
+    fixture = load_fixture(args.name) or {'responses': []}
+    responses = [item for item in fixture['responses'] if not (item['method'] == 'GET' and item['url'] == args.url)]
+    headers = {'Content-Type': f'text/html; charset={args.encoding or "utf-8"}'}
+    responses.append(encode_response('GET', args.url, None, 200, 'OK', headers, content))
+    save_fixture(args.name, responses)
+    print(f'{args.name}: 已导入 {args.url} ({len(content)} 字节)')
+
+
+def measure_source(name, fixture, adapter, instrumentation, args):
+    wall_times, parse_times, sleep_times = [], [], []
+    error = None
+    for _ in range(args.repeat):
+        adapter.load(fixture['responses'])
+        instrumentation.reset()
+        with crawler_sandbox(args.verbose):
+            start = time.perf_counter()
+            error = run_source(name)
+            wall_times.append((time.perf_counter() - start) * 1000)
+        parse_times.append(instrumentation.parse_seconds * 1000)
+        sleep_times.append(instrumentation.sleep_seconds)
+
+    # 内存分配单独跑一次，tracemalloc会明显拖慢执行，不计入耗时
+    adapter.load(fixture['responses'])
+    with crawler_sandbox(args.verbose):
+        tracemalloc.start()
+        try:
+            run_source(name)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'wall_ms': round(statistics.median(wall_times), 2),
+        'parse_ms': round(statistics.median(parse_times), 2),
+        'requests': adapter.requests,
+        'bytes': adapter.bytes,
+        'alloc_peak_kb': round(peak / 1024, 1),
+        'skipped_sleep_s': round(statistics.median(sleep_times), 2),
+        'misses': len(set(adapter.misses)),
+        'error': error,
+    }
+
+
+def compare_with_baseline(results, baseline, threshold):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for key in ('wall_ms', 'parse_ms'):
+            old, new = previous.get(key), result.get(key)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > MIN_REGRESSION_MS:
+                regressions.append(f'{name}.{key}: {old} -> {new} (+{(new / old - 1) * 100 if old else 100:.0f}%)')
+    return regressions
+
+
+def cmd_run(args):
+    adapter = ReplayAdapter()
+    http_client.set_adapter(adapter)
+    async_engine.set_transport(adapter_transport)
+    instrumentation = Instrumentation()
+
+    results = {}
+    with instrumentation.installed():
+        for name in resolve_names(args.names):
+            fixture = load_fixture(name)
+            if not fixture:
+                if args.names:
+                    print(f'{name}: 没有fixture，跳过')
+                continue
+            results[name] = measure_source(name, fixture, adapter, instrumentation, args)
+
+    if not results:
+        print(f'{FIXTURE_DIR} 中没有可回放的fixture，请先执行record或import')
+        return 1
+
+    print(f"{'数据源':<26}{'耗时ms':>10}{'解析ms':>10}{'请求数':>8}{'字节数':>12}{'内存峰值KB':>12}{'跳过sleep秒':>12}{'未命中':>8}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['wall_ms']:>10.2f}{r['parse_ms']:>10.2f}{r['requests']:>8}{r['bytes']:>12}"
+              f"{r['alloc_peak_kb']:>12.1f}{r['skipped_sleep_s']:>12.2f}{r['misses']:>8}")
+        if r['error']:
+            print(f'  出错: {r["error"]}')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f'已保存基线: {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print('性能退化:')
+            for line in regressions:
+                print(f'  {line}')
+            return 1
+        print('与基线相比未发现性能退化')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫离线录制/回放基准测试')
+    parser.add_argument('-v', '--verbose', action='store_true', help='显示爬虫的输出和日志')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help='在线运行爬虫并录制响应')
+    record.add_argument('names', nargs='*', help='数据源名称，默认全部')
+
+    imported = subparsers.add_parser('import', help='把手工保存的页面加入fixture')
+    imported.add_argument('name', help='数据源名称')
+    imported.add_argument('url', help='页面URL')
+    imported.add_argument('file', help='页面文件(utf-8)')
+    imported.add_argument('--encoding', help='网站实际使用的编码，如gbk，回放时按该编码返回')
+
+    run = subparsers.add_parser('run', help='离线回放并统计性能')
+    run.add_argument('names', nargs='*', help='数据源名称，默认全部有fixture的数据源')
+    run.add_argument('--repeat', type=int, default=5, help='每个爬虫的执行次数，取中位数')
+    run.add_argument('--baseline', help='基线文件，超过阈值时返回非0状态码')
+    run.add_argument('--save-baseline', help='把本次结果保存为基线文件')
+    run.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='允许的耗时增长比例')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    commands = {'record': cmd_record, 'import': cmd_import, 'run': cmd_run}
+    return commands[args.command](args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
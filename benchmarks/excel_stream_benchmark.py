@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+chat_summary 读写表格的耗时和峰值内存对比
+
+生成合成的外呼记录表（含若干与处理无关的列），对比：
+1. 旧写法：pd.read_excel读取整个表格，to_excel写出两次（临时文件和./file/）
+2. 新写法：excel_stream.read_columns只读取需要的列，write_with_source逐行复制原表格并追加总结列
+
+每种写法在单独的子进程中执行，峰值内存取子进程的ru_maxrss。
+
+用法：python benchmarks/excel_stream_benchmark.py [--rows 100000] [--extra-columns 10]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def make_workbook(path, rows, extra_columns):
+    """生成合成表格，只在父进程中执行"""
+    import numpy as np
+    from openpyxl import Workbook
+
+    from chat_summary_benchmark import make_frame
+
+    df = make_frame(rows, 10)
+    rng = np.random.default_rng(1)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    header = list(df.columns) + [f'附加字段{i}' for i in range(extra_columns)]
+    ws.append(header)
+    extra = rng.integers(0, 10 ** 8, (rows, extra_columns)).astype(str)
+    for row, values in zip(df.itertuples(index=False, name=None), extra):
+        ws.append([None if isinstance(i, float) else i for i in row] + [f'备注{i}' for i in values])
+    wb.save(path)
+
+
+def run_case(case, src_path):
+    import pandas as pd
+
+    import call_records
+    import excel_stream
+
+    out_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    if case == 'old':
+        df = call_records.fill_unrecognized(pd.read_excel(src_path))
+    else:
+        df = call_records.fill_unrecognized(excel_stream.read_columns(src_path, call_records.SUMMARY_COLUMNS))
+    read_ms = (time.perf_counter() - start) * 1000
+
+    case_ids, _ = call_records.build_case_prompts(df)
+    call_records.fill_case_results(df, case_ids, [f'总结{i}' for i in range(len(case_ids))], '总结')
+
+    start = time.perf_counter()
+    if case == 'old':
+        df.to_excel(os.path.join(out_dir, 'a.xlsx'), index=False)
+        df.to_excel(os.path.join(out_dir, 'b.xlsx'), index=False)
+    else:
+        excel_stream.write_with_source(src_path, os.path.join(out_dir, 'a.xlsx'), df,
+                                       call_records.SUMMARY_RESULT_COLUMNS)
+    write_ms = (time.perf_counter() - start) * 1000
+    # Linux下ru_maxrss的单位是KB
+    print(json.dumps({'read_ms': read_ms, 'write_ms': write_ms,
+                      'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def measure(case, src_path):
+    output = subprocess.run([sys.executable, __file__, '--case', case, '--src', src_path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='chat_summary读写表格的耗时和峰值内存对比')
+    arg_parser.add_argument('--rows', type=int, default=100000, help='最大行数')
+    arg_parser.add_argument('--extra-columns', type=int, default=10, help='与处理无关的列数')
+    arg_parser.add_argument('--case', choices=('old', 'new'), help=argparse.SUPPRESS)
+    arg_parser.add_argument('--src', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.src)
+        return
+
+    sizes = [args.rows // 4, args.rows // 2, args.rows]
+    print(f"附加列数: {args.extra_columns}")
+    print(f"{'行数':>8}{'旧-读ms':>10}{'旧-写ms':>10}{'旧-峰值MB':>12}{'新-读ms':>10}{'新-写ms':>10}{'新-峰值MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in sizes:
+            src_path = os.path.join(tmp_dir, f'{rows}.xlsx')
+            make_workbook(src_path, rows, args.extra_columns)
+            old, new = measure('old', src_path), measure('new', src_path)
+            print(f"{rows:>8}{old['read_ms']:>10.0f}{old['write_ms']:>10.0f}{old['rss_mb']:>12.0f}"
+                  f"{new['read_ms']:>10.0f}{new['write_ms']:>10.0f}{new['rss_mb']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
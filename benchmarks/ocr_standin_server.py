@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地OCR替身服务
+
+模拟PaddleOCR服务的 /predict/ocr_system 接口，请求体为{'images': [base64]}，
+按images的顺序返回每张图片的识别结果（text、confidence、text_box_position）。
+
+替身不做真正的文字识别：图片中每个灰色横条视为一行文字，文字为"行<灰度>"，
+因此合成的长图可以精确比对识别结果。每张图片按像素数模拟推理耗时，
+--workers限制同时推理的图片数，模拟服务端的推理实例数。
+
+对比（--benchmark）：
+1. 旧写法：每个切片写临时JPEG，PIL重新编码，每次请求一个切片，每次新建连接，切片不重叠
+2. 分批：paddle_ocr.ocr_long_image，OCR_CONCURRENCY=1
+3. 分批并发：paddle_ocr.ocr_long_image，OCR_CONCURRENCY=--concurrency
+
+用法：
+    python benchmarks/ocr_standin_server.py [--port 19001] [--ms-per-mpx 40] [--workers 4]
+    python benchmarks/ocr_standin_server.py --benchmark [--height 30000] [--concurrency 4] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+from aiohttp import web
+from PIL import Image
+
+from _standin import start_in_thread
+
+# 横条的灰度取8的倍数，JPEG压缩后四舍五入可以还原
+GRAY_STEP = 8
+# 灰度不低于该值视为背景
+BACKGROUND = 230
+
+
+def recognize(img: Image.Image) -> list[dict]:
+    """识别一张图片中的灰色横条，返回与PaddleOCR相同格式的结果"""
+    img = img.convert('L')
+    column = np.asarray(img)[:, img.width // 2].astype(int)
+    dark = column < BACKGROUND
+    items = []
+    y = 0
+    while y < len(column):
+        if not dark[y]:
+            y += 1
+            continue
+        start = y
+        while y < len(column) and dark[y]:
+            y += 1
+        gray = round(float(np.median(column[start:y])) / GRAY_STEP) * GRAY_STEP
+        items.append({
+            'text': f'行{gray}',
+            'confidence': 0.99,
+            'text_box_position': [[0, start], [img.width, start], [img.width, y], [0, y]],
+        })
+    return items
+
+
+class StandinServer:
+
+    def __init__(self, ms_per_mpx=40.0, workers=4, reverse_delay=0.0):
+        """
+        :param reverse_delay: 第n个请求额外等待reverse_delay/n秒，同时到达的请求先到后返回，用于验证并发识别的结果顺序
+        """
+        self.ms_per_mpx = ms_per_mpx
+        self.reverse_delay = reverse_delay
+        self.semaphore = asyncio.Semaphore(max(1, workers))
+        # 收到的请求数和图片数
+        self.requests = 0
+        self.images = 0
+        # 按返回顺序记录每个请求是第几个到达的
+        self.completed = []
+        self.app = web.Application(client_max_size=256 * 1024 ** 2)
+        self.app.router.add_post('/predict/ocr_system', self.ocr_system)
+
+    async def _recognize(self, image_b64: str) -> list[dict]:
+        async with self.semaphore:
+            items, pixels = await asyncio.to_thread(self._recognize_sync, image_b64)
+            await asyncio.sleep(self.ms_per_mpx * pixels / 1e6 / 1000)
+        return items
+
+    @staticmethod
+    def _recognize_sync(image_b64: str):
+        img = Image.open(io.BytesIO(base64.b64decode(image_b64)))
+        return recognize(img), img.width * img.height
+
+    async def ocr_system(self, request):
+        body = await request.json()
+        images = body.get('images') or []
+        self.requests += 1
+        self.images += len(images)
+        seq = self.requests
+        if self.reverse_delay > 0:
+            await asyncio.sleep(self.reverse_delay / seq)
+        # 同一个请求中的图片依次推理，与PaddleOCR服务一致
+        results = [await self._recognize(i) for i in images]
+        self.completed.append(seq)
+        return web.json_response({'msg': '', 'results': results, 'status': '000'})
+
+
+def make_long_image(path, height, width=1080, line_height=32, line_gap=24):
+    """生成白底长图，每行文字用一个灰色横条代替，返回每行的文字"""
+    import cv2
+
+    img = np.full((height, width, 3), 255, np.uint8)
+    texts = []
+    for i, y in enumerate(range(line_gap, height - line_height, line_height + line_gap)):
+        gray = (i % 25 + 2) * GRAY_STEP
+        img[y:y + line_height, 40:width - 40] = gray
+        texts.append(f'行{gray}')
+    cv2.imwrite(path, img)
+    return texts
+
+
+def old_ocr_long_image(file_path):
+    """旧写法：切片写临时文件，每个切片单独请求"""
+    import cv2
+    import requests
+
+    import env
+    import paddle_ocr
+
+    slice_height = 3096
+    img = cv2.imread(file_path)
+    all_texts = []
+    for start_y in range(0, img.shape[0], slice_height):
+        with tempfile.NamedTemporaryFile(delete=True, suffix='.jpg') as temp_file:
+            cv2.imwrite(temp_file.name, img[start_y:start_y + slice_height, :])
+            response = requests.post(env.OCR_URL, json={'images': [paddle_ocr.img_to_base64(temp_file.name)]})
+            all_texts.extend(item['text'] for item in response.json()['results'][0])
+    return [all_texts]
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def benchmark(args):
+    os.environ['OCR_URL'] = f'http://127.0.0.1:{args.port}/predict/ocr_system'
+    os.environ['OCR_CONCURRENCY'] = str(args.concurrency)
+    import env
+    import paddle_ocr
+
+    server = StandinServer(args.ms_per_mpx, args.workers)
+    start_in_thread(server.app, args.port)
+
+    def run_new(concurrency):
+        env.OCR_CONCURRENCY = concurrency
+        return paddle_ocr.ocr_long_image(image_path)[1]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        image_path = os.path.join(tmp_dir, 'long.png')
+        expected = make_long_image(image_path, args.height)
+        old_ms, old_texts = timed(lambda: old_ocr_long_image(image_path), args.repeat)
+        batch_ms, batch_texts = timed(lambda: run_new(1), args.repeat)
+        concurrent_ms, concurrent_texts = timed(lambda: run_new(args.concurrency), args.repeat)
+
+    print(f"图片高度: {args.height}, 切片高度: {env.OCR_SLICE_HEIGHT}, 重叠: {env.OCR_SLICE_OVERLAP}, "
+          f"每批切片: {env.OCR_BATCH_SLICES}, 服务端推理实例: {args.workers}, 执行次数: {args.repeat}")
+    print(f"文字行数: {len(expected)}")
+    for name, ms, texts in (('旧写法', old_ms, old_texts),
+                            ('分批', batch_ms, batch_texts),
+                            (f'分批并发x{args.concurrency}', concurrent_ms, concurrent_texts)):
+        print(f"{name:<12}{ms:>10.0f}ms  识别行数{len(texts[0]):>6}  与原图一致: {texts == [expected]}")
+    print(f"服务端共收到请求{server.requests}个，图片{server.images}张")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='本地OCR替身服务')
+    arg_parser.add_argument('--port', type=int, default=19001)
+    arg_parser.add_argument('--ms-per-mpx', type=float, default=40, help='每百万像素的模拟推理耗时(毫秒)')
+    arg_parser.add_argument('--workers', type=int, default=4, help='同时推理的最大图片数')
+    arg_parser.add_argument('--benchmark', action='store_true', help='启动服务并对比长图OCR的各种写法')
+    arg_parser.add_argument('--height', type=int, default=30000, help='基准测试长图的高度(像素)')
+    arg_parser.add_argument('--concurrency', type=int, default=4, help='基准测试的并发请求数')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='每项测试的执行次数')
+    args = arg_parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args)
+        return
+
+    server = StandinServer(args.ms_per_mpx, args.workers)
+    print(f'OCR替身服务: http://127.0.0.1:{args.port}/predict/ocr_system')
+    web.run_app(server.app, host='127.0.0.1', port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTML解析耗时对比
+
+使用仓库中保存的调试页面，对比：
+1. 单次解析：html.parser 与 crawlers.html_parser.make_soup(lxml)
+2. 文章详情：旧写法（日期和正文各用html.parser解析一次）与新写法（lxml解析一次，共用soup）
+
+用法：python benchmarks/parse_benchmark.py [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bs4 import BeautifulSoup
+
+from crawlers.cnfin_crawler import CnfinCrawler
+from crawlers.html_parser import get_parser, make_soup
+
+FIXTURES = ['debug_article_page.html', 'debug_list_page.html', 'shenlanbao_debug.html']
+
+
+def load_fixture(name):
+    with open(os.path.join(ROOT_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def measure(func, repeat):
+    """执行repeat次，返回每次耗时(毫秒)的中位数和最小值"""
+    func()  # 预热
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def print_row(label, baseline, current):
+    speedup = baseline[0] / current[0] if current[0] else float('inf')
+    print(f"{label:<34}{baseline[0]:>10.2f}{baseline[1]:>10.2f}{current[0]:>10.2f}{current[1]:>10.2f}{speedup:>9.2f}x")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='HTML解析耗时对比')
+    arg_parser.add_argument('--repeat', type=int, default=20, help='每项测试的执行次数')
+    args = arg_parser.parse_args()
+
+    print(f"解析后端: {get_parser()}, 执行次数: {args.repeat}")
+    print(f"{'测试项':<34}{'旧-中位':>10}{'旧-最小':>10}{'新-中位':>10}{'新-最小':>10}{'加速':>10}")
+
+    crawler = CnfinCrawler()
+    for name in FIXTURES:
+        html = load_fixture(name)
+
+        baseline = measure(lambda: BeautifulSoup(html, 'html.parser'), args.repeat)
+        current = measure(lambda: make_soup(html), args.repeat)
+        print_row(f"解析 {name} ({len(html) // 1024}KB)", baseline, current)
+
+        def detail_old():
+            crawler.extract_date_from_article(BeautifulSoup(html, 'html.parser'))
+            crawler.parse_article_content(BeautifulSoup(html, 'html.parser'))
+
+        def detail_new():
+            soup = make_soup(html)
+            crawler.extract_date_from_article(soup)
+            crawler.parse_article_content(soup)
+
+        baseline = measure(detail_old, args.repeat)
+        current = measure(detail_new, args.repeat)
+        print_row(f"详情提取 {name}", baseline, current)
+
+        # 确认两种解析后端的提取结果一致
+        old_content = crawler.parse_article_content(BeautifulSoup(html, 'html.parser'))
+        new_content = crawler.parse_article_content(make_soup(html))
+        if old_content != new_content:
+            print(f"  注意: {name} 的正文提取结果与html.parser不一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF文本和表格提取的耗时对比
+
+生成合成的多页PDF（每页若干行文字和一个带边框的表格），对比：
+1. 文本串行：在当前进程中逐页extract_text
+2. 文本并行：pdf_common_parse.extract_information_from_pdf，按页码分段在进程池中提取
+3. 表格旧写法：每页find_tables()和extract_tables()各识别一次表格，不关闭文件
+4. 表格新写法：pdf_table_parse.extract_tables，每页只识别一次并释放页面缓存，按页码分段并行
+
+并行的加速比取决于CPU核数，单核机器上只能体现进程池的额外开销。
+
+用法：python benchmarks/pdf_parse_benchmark.py [--pages 200] [--workers 4] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def _page_stream(page_number, lines, rows, cols):
+    ops = ['BT', '/F1 10 Tf']
+    for i in range(lines):
+        ops.append(f'1 0 0 1 50 {780 - i * 14} Tm (Page {page_number} line {i} lorem ipsum dolor sit amet) Tj')
+    top = 780 - lines * 14 - 20
+    cell_w, cell_h = 100, 18
+    for r in range(rows):
+        for c in range(cols):
+            ops.append(f'1 0 0 1 {54 + c * cell_w} {top - (r + 1) * cell_h + 5} Tm (R{r}C{c}-{page_number}) Tj')
+    ops.append('ET')
+    # 表格边框
+    for r in range(rows + 1):
+        y = top - r * cell_h
+        ops.append(f'50 {y} m {50 + cols * cell_w} {y} l S')
+    for c in range(cols + 1):
+        x = 50 + c * cell_w
+        ops.append(f'{x} {top} m {x} {top - rows * cell_h} l S')
+    return '\n'.join(ops).encode('latin-1')
+
+
+def make_pdf(path, pages, lines=30, rows=8, cols=4):
+    """手工拼装一个只用Helvetica的PDF，不依赖额外的库"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for page_number in range(pages):
+        stream = _page_stream(page_number, lines, rows, cols)
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_id = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id)
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % i for i in kids), len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % i for i in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def serial_extract(pdf_path):
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return '\n'.join(page.extract_text() for page in pdf.pages)
+
+
+def old_page_tables(pdf_path):
+    import pdfplumber
+
+    pdf = pdfplumber.open(pdf_path)
+    results = []
+    for page in pdf.pages:
+        table_objects = page.find_tables()
+        text_tables = page.extract_tables()
+        results.append((len(table_objects), text_tables))
+    return results
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='PDF文本和表格提取的耗时对比')
+    arg_parser.add_argument('--pages', type=int, default=200, help='页数')
+    arg_parser.add_argument('--workers', type=int, default=4, help='进程池的进程数')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='每项测试的执行次数')
+    args = arg_parser.parse_args()
+
+    os.environ['PDF_PARSE_WORKERS'] = str(args.workers)
+    import pdf_common_parse
+    import pdf_table_parse
+    import pdf_workers
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, 'report.pdf')
+        make_pdf(pdf_path, args.pages)
+
+        serial_ms, expected = timed(lambda: serial_extract(pdf_path), args.repeat)
+        # 第一次调用包含启动子进程的时间，单独统计
+        start = time.perf_counter()
+        pdf_common_parse.extract_information_from_pdf(pdf_path)
+        warmup_ms = (time.perf_counter() - start) * 1000
+        parallel_ms, text = timed(lambda: pdf_common_parse.extract_information_from_pdf(pdf_path), args.repeat)
+        old_tables_ms, _ = timed(lambda: old_page_tables(pdf_path), args.repeat)
+        new_tables_ms, _ = timed(lambda: pdf_table_parse.extract_tables(pdf_path), args.repeat)
+
+    print(f"页数: {args.pages}, 进程数: {args.workers}, CPU核数: {os.cpu_count()}, 执行次数: {args.repeat}")
+    print(f"文本串行:      {serial_ms:>10.0f}ms")
+    print(f"文本并行(首次):{warmup_ms:>10.0f}ms")
+    print(f"文本并行:      {parallel_ms:>10.0f}ms  加速比{serial_ms / parallel_ms:.2f}  结果一致: {text == expected}")
+    print(f"表格旧写法:    {old_tables_ms:>10.0f}ms")
+    print(f"表格新写法:    {new_tables_ms:>10.0f}ms  加速比{old_tables_ms / new_tables_ms:.2f}")
+    executor = pdf_workers._get_executor()
+    if executor:
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
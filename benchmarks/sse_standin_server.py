@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地工作流SSE替身服务
+
+模拟工作流平台的 /v1/workflows/run 和 /v1/chat-messages 接口，支持blocking和streaming两种响应模式，
+用于在不消耗真实模型调用的情况下验证 workflow_stream 的增量解析、超时和取消。
+
+路径的第一段选择场景，例如 from_addr 为 http://127.0.0.1:19100/slow/ 时使用slow场景：
+    normal  正常逐段输出（不带场景前缀时也是normal）
+    slow    workflow_started之前等待较长时间，用于验证首个token超时
+    stall   输出一部分后停止输出，只发送ping，用于验证停滞超时和部分输出
+    error   输出一部分后返回error事件
+    failed  输出一部分后workflow_finished的status为failed
+    nodes   依次执行若干个不输出文本的节点（每个节点耗时--node-delay秒，期间只有ping），最后才输出文本
+    http500 直接返回500
+
+输出内容：输入text为"序号.内容"多行时逐行返回"序号, 标签-内容"（语义标签）；
+输入connectCot时返回总结；chat-messages返回对query的回复。
+
+用法：
+    python benchmarks/sse_standin_server.py [--port 19100] [--token-interval 0.05] [--first-token-delay 0.2] [--node-delay 1]
+    python benchmarks/sse_standin_server.py --selftest
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from aiohttp import ClientSession, web
+
+from _standin import start_in_thread
+
+SCENARIOS = ('normal', 'slow', 'stall', 'error', 'failed', 'nodes', 'http500')
+# nodes场景中不输出文本的节点数
+NODE_COUNT = 3
+
+
+def make_output(inputs: dict) -> tuple[str, str]:
+    """返回(输出变量名, 输出文本)"""
+    if 'connectCot' in inputs:
+        lines = [i for i in inputs['connectCot'].split('\n') if i]
+        return 'result', f'共{len(lines)}轮对话，客户表示会按时处理。'
+    text = inputs.get('text')
+    if text is not None:
+        labels = []
+        for line in text.split('\n'):
+            index, _, content = line.partition('.')
+            labels.append(f'{index}, 标签-{content}')
+        return 'text', '\n'.join(labels)
+    return 'text', json.dumps(inputs, ensure_ascii=False)
+
+
+def split_tokens(text: str, size: int = 4) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+
+class StandinServer:
+
+    def __init__(self, first_token_delay=0.2, token_interval=0.05, slow_delay=5.0, ping_interval=0.5, node_delay=1.0):
+        self.first_token_delay = first_token_delay
+        self.token_interval = token_interval
+        self.slow_delay = slow_delay
+        self.ping_interval = ping_interval
+        self.node_delay = node_delay
+        # 收到的取消请求，用于验证超时后客户端会取消生成
+        self.stopped = []
+        self.app = web.Application()
+        for prefix in ('', '/{scenario}'):
+            self.app.router.add_post(f'{prefix}/v1/workflows/run', self.workflow_run)
+            self.app.router.add_post(f'{prefix}/v1/chat-messages', self.chat_messages)
+            self.app.router.add_post(f'{prefix}/v1/workflows/tasks/{{task_id}}/stop', self.stop)
+            self.app.router.add_post(f'{prefix}/v1/chat-messages/{{task_id}}/stop', self.stop)
+
+    async def stop(self, request):
+        self.stopped.append(request.match_info['task_id'])
+        return web.json_response({'result': 'success'})
+
+    async def workflow_run(self, request):
+        return await self._run(request, chat=False)
+
+    async def chat_messages(self, request):
+        return await self._run(request, chat=True)
+
+    async def _run(self, request, chat):
+        scenario = request.match_info.get('scenario', 'normal')
+        if scenario not in SCENARIOS:
+            raise web.HTTPNotFound()
+        if scenario == 'http500':
+            return web.Response(status=500, text='internal error')
+
+        body = await request.json()
+        task_id = str(uuid.uuid4())
+        if chat:
+            output_key, text = 'answer', f"已收到[{body.get('query')}]，发送短信验证码"
+        else:
+            output_key, text = make_output(body.get('inputs') or {})
+
+        if body.get('response_mode') != 'streaming':
+            await asyncio.sleep(self.first_token_delay + self.token_interval * len(split_tokens(text)))
+            if chat:
+                return web.json_response({'event': 'message', 'task_id': task_id, 'answer': text})
+            return web.json_response({'task_id': task_id, 'data': {'status': 'succeeded', 'outputs': {output_key: text}}})
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+
+        try:
+            await self._stream(scenario, chat, task_id, output_key, text, response)
+        except ConnectionResetError:
+            # 客户端超时后断开连接
+            pass
+        return response
+
+    async def _stream(self, scenario, chat, task_id, output_key, text, response):
+        async def send(event: dict):
+            event['task_id'] = task_id
+            await response.write(f'data: {json.dumps(event, ensure_ascii=False)}\n\n'.encode('utf-8'))
+
+        async def wait(seconds):
+            # 等待期间按间隔发送ping，与真实服务一致
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(min(self.ping_interval, deadline - time.monotonic()))
+                await response.write(b'event: ping\n\n')
+
+        if scenario == 'slow':
+            # 工作流迟迟没有开始执行
+            await wait(self.slow_delay)
+        await send({'event': 'workflow_started', 'workflow_run_id': task_id, 'data': {}})
+        if scenario == 'nodes':
+            for i in range(NODE_COUNT):
+                node = {'id': f'node-{i}', 'node_type': 'llm', 'title': f'节点{i}'}
+                await send({'event': 'node_started', 'data': node})
+                await wait(self.node_delay)
+                await send({'event': 'node_finished', 'data': {**node, 'status': 'succeeded'}})
+        await wait(self.first_token_delay)
+        tokens = split_tokens(text)
+        for i, token in enumerate(tokens):
+            if scenario in ('stall', 'error', 'failed') and i == len(tokens) // 2:
+                if scenario == 'error':
+                    await send({'event': 'error', 'code': 'invalid_param', 'message': '模拟错误'})
+                    return
+                if scenario == 'failed':
+                    await send({'event': 'workflow_finished', 'workflow_run_id': task_id,
+                                'data': {'status': 'failed', 'error': '模拟节点失败', 'outputs': {}}})
+                    return
+                await wait(3600)
+            if chat:
+                await send({'event': 'message', 'answer': token})
+            else:
+                await send({'event': 'text_chunk', 'data': {'text': token}})
+            await asyncio.sleep(self.token_interval)
+
+        if chat:
+            await send({'event': 'workflow_finished', 'data': {'status': 'succeeded', 'outputs': {'answer': text}}})
+            await send({'event': 'message_end', 'conversation_id': str(uuid.uuid4()), 'metadata': {}})
+        else:
+            await send({'event': 'workflow_finished', 'workflow_run_id': task_id,
+                        'data': {'status': 'succeeded', 'outputs': {output_key: text}}})
+
+
+def selftest(port):
+    import workflow_stream
+
+    server = StandinServer(first_token_delay=0.2, token_interval=0.02, slow_delay=3.0, ping_interval=0.2)
+    start_in_thread(server.app, port)
+    headers = {'Authorization': 'Bearer app-standin'}
+
+    def workflow_url(scenario):
+        return f'http://127.0.0.1:{port}/{scenario}/v1/workflows/run'
+
+    def data(mode='streaming'):
+        return {'inputs': {'text': '1.还款\n2.不还\n3.无识别'}, 'response_mode': mode, 'user': str(uuid.uuid4())}
+
+    def report(name, func):
+        start = time.perf_counter()
+        try:
+            result = func()
+            outcome = f'成功 {json.dumps(result, ensure_ascii=False)[:80]}'
+        except workflow_stream.WorkflowStreamError as e:
+            outcome = f'{type(e).__name__}: {e}，已生成{e.partial!r}'
+        print(f'{name:<28}{(time.perf_counter() - start) * 1000:>8.0f}ms  {outcome}')
+
+    chunks = []
+    report('blocking', lambda: workflow_stream.post(workflow_url('normal'), headers, data('blocking')))
+    report('streaming', lambda: workflow_stream.post(workflow_url('normal'), headers, data(), on_chunk=chunks.append))
+    print(f'{"":<28}收到{len(chunks)}段文本')
+    report('streaming-首个token超时', lambda: workflow_stream.post(workflow_url('slow'), headers, data(), ttft_timeout=1))
+    report('streaming-停滞超时', lambda: workflow_stream.post(workflow_url('stall'), headers, data(), idle_timeout=1))
+    report('streaming-错误事件', lambda: workflow_stream.post(workflow_url('error'), headers, data()))
+    report('streaming-HTTP 500', lambda: workflow_stream.post(workflow_url('http500'), headers, data()))
+    chat_data = {'inputs': {}, 'query': '13800000000', 'response_mode': 'streaming', 'user': 'standin'}
+    report('chat-streaming', lambda: workflow_stream.post(
+        f'http://127.0.0.1:{port}/v1/chat-messages', headers, chat_data))
+
+    async def async_cases():
+        async with ClientSession() as session:
+            report_results = await asyncio.gather(*[
+                workflow_stream.apost(session, workflow_url('normal'), headers, data()) for _ in range(20)
+            ])
+            print(f'{"async-streaming x20":<28}{"":>10}成功{len(report_results)}个')
+            start = time.perf_counter()
+            try:
+                await workflow_stream.apost(session, workflow_url('stall'), headers, data(), idle_timeout=1)
+            except workflow_stream.WorkflowTimeout as e:
+                print(f'{"async-停滞超时":<28}{(time.perf_counter() - start) * 1000:>8.0f}ms  {e}，已生成{e.partial!r}')
+
+    asyncio.run(async_cases())
+    print(f'服务端收到取消请求{len(server.stopped)}个')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='本地工作流SSE替身服务')
+    arg_parser.add_argument('--port', type=int, default=19100)
+    arg_parser.add_argument('--first-token-delay', type=float, default=0.2, help='首个token前的等待时间(秒)')
+    arg_parser.add_argument('--token-interval', type=float, default=0.05, help='每段输出之间的间隔(秒)')
+    arg_parser.add_argument('--slow-delay', type=float, default=30, help='slow场景开始执行前的等待时间(秒)')
+    arg_parser.add_argument('--node-delay', type=float, default=1, help='nodes场景每个节点的执行时间(秒)')
+    arg_parser.add_argument('--selftest', action='store_true', help='启动服务并用workflow_stream验证各场景')
+    args = arg_parser.parse_args()
+
+    if args.selftest:
+        selftest(args.port)
+        return
+
+    server = StandinServer(args.first_token_delay, args.token_interval, args.slow_delay, node_delay=args.node_delay)
+    print(f'工作流替身服务: http://127.0.0.1:{args.port}/<场景>/v1/，场景: {", ".join(SCENARIOS)}')
+    web.run_app(server.app, host='127.0.0.1', port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    return conn
+
+
+class DiskStore:
+    """
+    SQLite磁盘缓存，服务重启后仍然有效，多个服务进程可以共用同一个文件
+    按namespace区分，每个namespace最多保留max_entries条，超出后按最近访问时间淘汰
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'expires_at REAL NOT NULL, accessed_at REAL NOT NULL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (namespace, accessed_at)')
+
+    def get(self, namespace: str, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?', (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None, 0
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key))
+                return None, 0
+            self._conn.execute(
+                'UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?', (now, namespace, key)
+            )
+        return json.loads(value), expires_at
+
+    def put(self, namespace: str, key: str, value, expires_at: float):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, data, expires_at, time.time())
+            )
+            # 超出容量时按最近访问时间淘汰
+            self._conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND key IN ('
+                'SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (namespace, namespace, self.max_entries)
+            )
+
+    def get_many(self, namespace: str, keys: list[str]) -> dict:
+        """
+        批量读取未过期的缓存，返回{key: value}
+        """
+        now = time.time()
+        result = {}
+        with self._lock:
+            # SQLite单条语句的参数个数有限，分批查询
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f'SELECT key, value FROM cache WHERE namespace = ? AND expires_at > ? '
+                    f'AND key IN ({",".join("?" * len(batch))})',
+                    (namespace, now, *batch)
+                ).fetchall()
+                result.update(rows)
+            self._conn.executemany(
+                'UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?',
+                [(now, namespace, key) for key in result]
+            )
+        return {key: json.loads(value) for key, value in result.items()}
+
+    def put_many(self, namespace: str, items: dict, expires_at: float):
+        now = time.time()
+        rows = [(namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now) for key, value in items.items()]
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+                self._conn.execute(
+                    'DELETE FROM cache WHERE namespace = ? AND key IN ('
+                    'SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                    (namespace, namespace, self.max_entries)
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key))
+
+
+class SizedStore:
+    """
+    SQLite磁盘缓存，按值的总字节数限制容量，超出后按最近访问时间淘汰，不过期
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sized_cache ('
+            'key TEXT PRIMARY KEY, label TEXT NOT NULL, value TEXT NOT NULL, '
+            'size INTEGER NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_sized_cache_accessed ON sized_cache (accessed_at)')
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM sized_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE sized_cache SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, label: str, value):
+        """
+        :param label: 值的类别，只用于日志和排查
+        """
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            logger.info(f'缓存值超过缓存容量，不缓存[{label}][{size}]')
+            return
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO sized_cache (key, label, value, size, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                    (key, label, data, size, time.time())
+                )
+                # 从最近访问的开始累计大小，累计超出容量的全部淘汰
+                self._conn.execute(
+                    'DELETE FROM sized_cache WHERE key IN ('
+                    'SELECT key FROM ('
+                    'SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS total FROM sized_cache'
+                    ') WHERE total > ?)',
+                    (self.max_bytes,)
+                )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM sized_cache').fetchone()[0]
+
+
+class _Call:
+    """一次正在进行的加载，等待者通过event获取结果"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class SingleFlight:
+    """
+    同一个键的并发加载只执行一次，其他调用等待并共用这次的结果
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func, timeout: float = None):
+        """
+        :param timeout: 等待其他调用加载的最长时间(秒)，超时后当前调用自己执行func，为None时一直等待
+        :return: (func的结果, 是否由当前调用执行func)，执行func的调用抛出异常时，等待者得到None
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = _Call()
+
+        if not owner:
+            if call.event.wait(timeout):
+                return call.value, False
+            logger.info(f'等待并发加载超时[{key}][{timeout}秒]，自行加载')
+            return func(), True
+
+        try:
+            call.value = func()
+            return call.value, True
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
@@ -0,0 +1,192 @@
+import io
+import logging
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CASE_COLUMN = '案件编号'
+COMMAND_COLUMN = '解析命令'
+SCRIPT_COLUMN = 'AI话术'
+# 语义标签和对话总结需要从表格中读取的列
+LABEL_COLUMNS = [COMMAND_COLUMN]
+SUMMARY_COLUMNS = [CASE_COLUMN, SCRIPT_COLUMN, COMMAND_COLUMN]
+# 追加到原表格右侧的结果列，标签来源为"缓存"或"请求"
+LABEL_RESULT_COLUMNS = ["序号", "大模型-解析命令", "标签来源"]
+SUMMARY_RESULT_COLUMNS = ["总结"]
+# 每行"序号."和换行占用的token数上限，序号不超过6位
+LINE_OVERHEAD_TOKENS = 4
+
+_tokeniser = None
+
+
+def drop_unrecognized(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    删除解析命令为空或未识别的行
+    """
+    df = df[df[COMMAND_COLUMN].notna()]
+    return df[df[COMMAND_COLUMN] != "nomatch:out-of-voca"]
+
+
+def fill_unrecognized(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    解析命令为空时填"无声音"，未识别时填"无识别"
+    """
+    df[COMMAND_COLUMN] = df[COMMAND_COLUMN].replace(np.nan, "无声音")
+    df[COMMAND_COLUMN] = df[COMMAND_COLUMN].replace("nomatch:out-of-voca", "无识别")
+    return df
+
+
+def _get_tokeniser():
+    global _tokeniser
+    if _tokeniser is None:
+        import tiktoken
+        _tokeniser = tiktoken.get_encoding('cl100k_base')
+    return _tokeniser
+
+
+def count_tokens(texts: list[str]) -> list[int]:
+    """
+    按cl100k_base计算每段文本的token数
+    """
+    return [len(i) for i in _get_tokeniser().encode_ordinary_batch(texts)]
+
+
+def label_slices(df: pd.DataFrame, output_len: int = None, token_budget: int = None,
+                 max_rows: int = None) -> list[pd.DataFrame]:
+    """
+    切分记录，每片调用一次语义标签工作流
+    未设置token_budget时按output_len行切分；
+    设置后按顺序装填，每片的提示词不超过token_budget个token，行数不超过max_rows
+    """
+    if not token_budget:
+        return [df.iloc[i:i + output_len] for i in range(0, len(df), output_len)]
+
+    texts = df[COMMAND_COLUMN].map(str)
+    # 重复的解析命令很多，只对不同的文本计算token数
+    unique_texts = texts.unique().tolist()
+    row_tokens = texts.map(dict(zip(unique_texts, count_tokens(unique_texts)))).to_numpy() + LINE_OVERHEAD_TOKENS
+
+    slices = []
+    start = 0
+    used = 0
+    for i, tokens in enumerate(row_tokens):
+        rows = i - start
+        if rows and (used + tokens > token_budget or (max_rows and rows >= max_rows)):
+            slices.append(df.iloc[start:i])
+            start, used = i, 0
+        if tokens > token_budget:
+            logger.warning(f'单行解析命令超出token预算，单独请求[第{i + 1}行][{tokens}>{token_budget}]')
+        used += tokens
+    if start < len(df):
+        slices.append(df.iloc[start:])
+    return slices
+
+
+def label_prompt(df_slice: pd.DataFrame) -> str:
+    """
+    将解析命令与从1开始的序号配对，每行一条
+    """
+    promopt_str_list = [f"{i}.{j}" for i, j in zip(range(1, len(df_slice) + 1), df_slice[COMMAND_COLUMN])]
+    return "\n".join(promopt_str_list)
+
+
+def parse_label_text(text: str) -> pd.DataFrame:
+    """
+    解析工作流返回的"序号,标签"文本，格式不对时抛出异常
+    """
+    ret_df = pd.read_csv(io.StringIO(text), sep=",", header=None)
+    # 修改列名
+    return ret_df.rename(columns={0: "序号", 1: "大模型-解析命令"})
+
+
+def normalize_utterance(text) -> str:
+    """
+    规范化解析命令作为标签缓存的键，全角半角、大小写、多余空白和句末标点不影响标签
+    """
+    text = ' '.join(unicodedata.normalize('NFKC', str(text)).lower().split())
+    return text.rstrip('。.!！~～ ')
+
+
+def utterance_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    每行解析命令规范化后的文本，重复的文本只规范化一次
+    """
+    texts = df[COMMAND_COLUMN].map(str)
+    unique_texts = texts.unique().tolist()
+    return texts.map(dict(zip(unique_texts, map(normalize_utterance, unique_texts))))
+
+
+def unique_misses(df: pd.DataFrame, keys: pd.Series, cached: dict) -> pd.DataFrame:
+    """
+    需要请求工作流的记录：没有缓存标签，且同一文本只保留第一次出现的行
+    """
+    return df[~keys.isin(list(cached)) & ~keys.duplicated()]
+
+
+def collect_labels(df_slices: list[pd.DataFrame], texts: list[str], keys: pd.Series) -> dict:
+    """
+    按工作流返回的序号把标签对应回每片中的记录
+    :return: {规范化的解析命令: 标签}，序号不对的行不返回
+    """
+    labels = {}
+    for df_slice, text in zip(df_slices, texts):
+        slice_keys = keys.loc[df_slice.index].tolist()
+        ret_df = parse_label_text(text)
+        for index, label in zip(ret_df["序号"], ret_df["大模型-解析命令"]):
+            try:
+                position = int(index) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= position < len(slice_keys) and isinstance(label, str):
+                labels[slice_keys[position]] = label
+    return labels
+
+
+def slice_positions(df_slices: list[pd.DataFrame]) -> pd.Series:
+    """
+    每行记录在切分结果中的位置，格式为"片序号-行序号"，片序号从0开始，行序号从1开始
+    """
+    return pd.concat([
+        pd.Series([f"{j}-{i}" for i in range(1, len(df_slice) + 1)], index=df_slice.index, dtype=object)
+        for j, df_slice in enumerate(df_slices)
+    ]) if df_slices else pd.Series(dtype=object)
+
+
+def fill_labels(df: pd.DataFrame, keys: pd.Series, cached: dict, fresh: dict, positions: pd.Series,
+                strip: bool = False) -> pd.DataFrame:
+    """
+    把缓存的和本次请求得到的标签拼到原始记录右侧，标签来源列标明标签来自缓存还是本次请求
+    :param positions: 每行的序号，与不使用缓存、所有记录都请求时的切分位置一致，见slice_positions
+    :param strip: 是否去掉标签两端的空白
+    """
+    ret_df = df.copy()
+    source = pd.Series(np.where(keys.isin(list(cached)), "缓存", "请求"), index=keys.index)
+    labels = keys.map({**cached, **fresh})
+    if strip:
+        labels = labels.str.strip()
+    ret_df["序号"] = positions
+    ret_df["大模型-解析命令"] = labels
+    ret_df["标签来源"] = source
+    return ret_df
+
+
+def build_case_prompts(df: pd.DataFrame) -> tuple[list, list[str]]:
+    """
+    按案件编号汇总对话，每条记录一行，格式为"客服: xxx，客户: xxx"
+    只分组一次，字符串拼接按列进行
+    :return: (案件编号列表, 对应的对话文本列表)，按案件编号首次出现的顺序
+    """
+    # 与f-string一致，空值输出为nan
+    lines = '客服: ' + df[SCRIPT_COLUMN].map(str) + '，客户: ' + df[COMMAND_COLUMN].map(str)
+    prompts = lines.groupby(df[CASE_COLUMN], sort=False).agg('\n'.join)
+    return prompts.index.tolist(), prompts.tolist()
+
+
+def fill_case_results(df: pd.DataFrame, case_ids: list, results: list, column: str):
+    """
+    把每个案件的结果写回该案件的所有行
+    """
+    df[column] = df[CASE_COLUMN].map(dict(zip(case_ids, results)))
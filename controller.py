@@ -5,10 +5,10 @@ import json
 import logging
 import asyncio
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-import numpy as np
 import pandas as pd
-from aiohttp import ClientSession,ClientError
+from aiohttp import ClientError
 
 import mplfinance
 import os
@@ -16,8 +16,6 @@ import pandas
 import random
 import re
 import requests
-import site
-import subprocess
 import tempfile
 import threading
 import tiktoken
@@ -31,14 +29,21 @@ from newspaper import Article
 from openpyxl.worksheet.worksheet import Worksheet
 from pandas import DataFrame
 from readabilipy.simple_json import plain_content, extract_text_blocks_as_plain_text
-from readabilipy.utils import chdir
 
+import article_cache
+import batch_jobs
+import call_records
 import env
+import excel_stream
+import label_cache
 import lmjj_agent
 import paddle_ocr
+import parse_cache
 import pdf_common_parse
 import pdf_table_parse
+import readability_pool
 import word_reader
+import workflow_stream
 import excel_to_json
 from docx.shared import Pt
 from docx.oxml.ns import qn
@@ -55,6 +60,16 @@ logger = logging.getLogger(__name__)
 tokeniser = tiktoken.get_encoding('cl100k_base')
 
 
+def _bing_concurrency(value) -> int:
+    """
+    并发数超出[1, BING_MAX_CONCURRENCY]时参数校验失败，返回400
+    """
+    value = int(value)
+    if not 1 <= value <= env.BING_MAX_CONCURRENCY:
+        raise ValueError(f'concurrency应在1到{env.BING_MAX_CONCURRENCY}之间')
+    return value
+
+
 @bp.route('/bing_news_search', methods=['POST', 'GET', ])
 def bing_news_search():
     # https://learn.microsoft.com/en-us/bing/search-apis/bing-news-search/reference/endpoints
@@ -72,6 +87,8 @@ def bing_news_search():
     parser.add_argument('sort_by',
                         location='args', type=str, required=False, default='Date',
                         choices=['Date', 'Relevance', ])
+    parser.add_argument('concurrency',
+                        location='args', type=_bing_concurrency, required=False, default=5)
     args = parser.parse_args()
 
     article_count = args.get('article_count')
@@ -79,11 +96,13 @@ def bing_news_search():
     freshness = args.get('freshness')
     q = args.get('q')
     sort_by = args.get('sort_by')
+    concurrency = min(max(1, args.get('concurrency')), env.BING_MAX_CONCURRENCY)
 
     logger.info(
         f'必应新闻搜索'
         f'article_count[{article_count}]'
         f'q[{q}]'
+        f'concurrency[{concurrency}]'
     )
 
     cc = 'CN'
@@ -105,10 +124,7 @@ def bing_news_search():
         "textFormat": "HTML",
     }
 
-    url = f'https://api.bing.microsoft.com/v7.0/news/search'
-    response = requests.get(url, headers=env.bind_search_headers, params=params, verify=False)
-    response.raise_for_status()
-    response_json: dict = response.json()
+    response_json: dict = article_cache.get_search(params, lambda: _bing_news_search(params)) or {}
 
     value: list[dict] = response_json.get('value')
     if not value:
@@ -119,27 +135,19 @@ def bing_news_search():
         )
         raise Exception('必应新闻搜索-结果异常')
 
-    articles = []
-    urls = []
     for item in value:
         logger.info(
             f'必应新闻搜索-news-item'
             f'[{item}]'
         )
 
-        category = item.get('category')
-        date_published = item.get('datePublished')
-        description = item.get('description')
-        image = item.get('image')
-        name = item.get('name')
-        provider = item.get('provider')
-        url = item.get('url')
-
-        article_json = extract_article(url)
-        if not article_json:
-            # 跳过无效的网页链接
-            continue
-
+    articles = []
+    urls = []
+    for url, article_json in extract_articles_concurrently(
+            urls=[item.get('url') for item in value],
+            article_count=article_count,
+            concurrency=concurrency,
+    ):
         article = render_template(
             title=article_json.get('title'),
             authors=article_json.get('byline'),
@@ -150,10 +158,6 @@ def bing_news_search():
         # 记录有效链接
         urls.append(url)
 
-        if len(articles) >= article_count:
-            # collected enough articles already
-            break
-
     result = '\n\n\n'.join(articles)
 
     tokens = calc_tokens(result)
@@ -170,6 +174,76 @@ def bing_news_search():
     }
 
 
+def _bing_news_search(params: dict) -> dict:
+    url = f'https://api.bing.microsoft.com/v7.0/news/search'
+    response = requests.get(url, headers=env.bind_search_headers, params=params, verify=False,
+                            timeout=env.ARTICLE_FETCH_TIMEOUT)
+    response.raise_for_status()
+    response_json: dict = response.json()
+    if not response_json.get('value'):
+        # 结果为空时不缓存
+        logger.error(f'必应新闻搜索-结果为空[{response_json}]')
+        return None
+    return response_json
+
+
+def extract_articles_concurrently(urls: list[str], article_count: int, concurrency: int,
+                                  timeout: float = None) -> list[tuple[str, dict]]:
+    """
+    并发抓取并提取文章，最多同时进行 concurrency 个
+    按传入顺序（必应排名）返回前 article_count 篇有效文章，凑够后取消剩余任务
+    :param timeout: 总时限(秒)，默认为BING_ARTICLES_TIMEOUT，到时按排名返回已提取的文章，不再等待进行中的任务
+    :return: [(url, article_json), ...]
+    """
+    timeout = env.BING_ARTICLES_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    results: dict[int, None | dict] = {}
+    collected = []
+    pending = {}
+    next_idx = 0
+    # 已按排名顺序确认完毕的位置
+    prefix = 0
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        while len(collected) < article_count:
+            while next_idx < len(urls) and len(pending) < concurrency:
+                pending[executor.submit(extract_article, urls[next_idx])] = next_idx
+                next_idx += 1
+            if not pending:
+                break
+
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                # 排名靠前的文章还在抓取，跳过它们，按排名补上已经提取完成的文章
+                logger.error(f'抓取文章超时[{timeout}秒]，进行中[{[urls[i] for i in sorted(pending.values())]}]')
+                for idx in sorted(results):
+                    if len(collected) >= article_count:
+                        break
+                    if results[idx]:
+                        collected.append((urls[idx], results[idx]))
+                break
+            for future in done:
+                idx = pending.pop(future)
+                try:
+                    results[idx] = future.result()
+                except Exception:
+                    logger.error(f'提取网页-失败[{urls[idx]}]', exc_info=True)
+                    results[idx] = None
+
+            # 排名靠前的都有结果后才能确定输出顺序
+            while prefix in results and len(collected) < article_count:
+                article_json = results.pop(prefix)
+                if article_json:
+                    collected.append((urls[prefix], article_json))
+                prefix += 1
+    finally:
+        # 已经凑够文章或超时，未开始的任务直接取消，不等待进行中的任务
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return collected
+
+
 def calc_tokens(text):
     tokens = len(tokeniser.encode(text))
     k_tokens = round(tokens / 1000.0)
@@ -222,13 +296,20 @@ def render_template(
 
 
 def extract_article(url: str) -> None | dict:
+    """
+    提取文章，按规范化URL缓存提取结果，提取失败不缓存
+    """
+    return article_cache.get_article(url, lambda: _extract_article(url))
+
+
+def _extract_article(url: str) -> None | dict:
     h = {
         'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
         'Cache-Control': 'no-cache',
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
     }
     try:
-        resp = requests.get(url=url, headers=h, proxies=None, verify=False)
+        resp = requests.get(url=url, headers=h, proxies=None, verify=False, timeout=env.ARTICLE_FETCH_TIMEOUT)
     except Exception as e:
         logger.error(
             f'访问网页-失败'
@@ -262,43 +343,17 @@ def extract_article(url: str) -> None | dict:
     content_digests = False
     node_indexes = False
 
-    with tempfile.NamedTemporaryFile(encoding='utf-8', delete=False, mode='w') as temp_html:
-        temp_html.write(html)
-        temp_html.close()
-
-    html_path = temp_html.name
-    article_json_path = f'{html_path}.article.json'
-    logger.info(
-        f'html_path[{html_path}]'
-        f'article_json_path[{article_json_path}]'
-    )
-
-    def find_module_path(module_name):
-        for package_path in site.getsitepackages():
-            potential_path = os.path.join(package_path, module_name)
-            if os.path.exists(potential_path):
-                return potential_path
-        raise Exception()
-
-    js_dir = os.path.join(find_module_path('readabilipy'), 'javascript')
-    with chdir(js_dir):
-        try:
-            subprocess.check_call(["node", "ExtractArticle.js", "-i", html_path, "-o", article_json_path])
-        except Exception as e:
-            logger.error(
-                f'提取网页-失败'
-                f'[ExtractArticle.js]'
-                f'[{url}]'
-                f'[{html}]',
-                exc_info=True
-            )
-            return None
-
-    with open(article_json_path, encoding='utf-8') as f:
-        input_json = json.loads(f.read())
-
-    os.remove(html_path)
-    os.remove(article_json_path)
+    try:
+        input_json = readability_pool.extract(html)
+    except Exception as e:
+        logger.error(
+            f'提取网页-失败'
+            f'[readability_pool]'
+            f'[{url}]'
+            f'[{html}]',
+            exc_info=True
+        )
+        return None
 
     article_json = {
         "title": None,
@@ -910,7 +965,8 @@ def parse_pdf_table():
         remote_addr=remote_addr
     )
 
-    return {'text': pdf_table_parse.extract_tables(file_path)}
+    text = parse_cache.parse('pdf_table', pdf_table_parse.PARSER_VERSION, file_path, pdf_table_parse.extract_tables)
+    return {'text': text}
 
 
 @bp.route('/read_word_v3', methods=['POST', 'GET', ])
@@ -954,14 +1010,9 @@ def read_word_v3():
         tenant_id=tenant_id,
         remote_addr=remote_addr
     )
-    doc: Document = Document(file_path)
-    all_text = []
-    for para in doc.paragraphs:
-        text = para.text
-        if text:
-            all_text.append(text)
-    # join all texts
-    return {'text': '\n'.join(all_text)}
+    # 相同内容的文件直接使用缓存的解析结果
+    text = parse_cache.parse('word_paragraphs', word_reader.PARSER_VERSION, file_path, word_reader.read_paragraphs)
+    return {'text': text}
 
 
 @bp.route('/read_word_v4', methods=['POST', 'GET', ])
@@ -1002,33 +1053,13 @@ def read_word_v4():
         'text_5': '',
         'text_6': '',
     }
-    idx = 1
-    while True:
-        head = file_info.find("tenant_id='")
-        if head < 0:
-            break
-        head += + len("tenant_id='")
-        tail = head + 36
-        tenant_id = file_info[head:tail]
-
-        head = file_info.find("related_id='")
-        head += + len("related_id='")
-        tail = head + 36
-        file_id = file_info[head:tail]
-
-        file_path = lmjj_agent.file_download_by_tenant(
-            app_code=app_code,
-            file_id=file_id,
-            tenant_id=tenant_id,
-            remote_addr=remote_addr
-        )
-        t = word_reader.read_text_and_tables_from_word(file_path)
-
+    # 并发下载和解析所有文件
+    file_ids = list(lmjj_agent.iter_file_ids(file_info))
+    texts = lmjj_agent.download_files(app_code, file_ids, remote_addr,
+                                      parse=word_reader.read_text_and_tables_from_word)
+    for idx, t in enumerate(texts, 1):
         data[f'text_{idx}'] = t
 
-        idx += 1
-        file_info = file_info[tail:]
-
     return data
 
 
@@ -1123,12 +1154,11 @@ def issue_coupon():
             'bankName': bank_name,
         },
         'query': mobile_no,
-        "response_mode": "blocking",
+        "response_mode": env.WORKFLOW_RESPONSE_MODE,
         "user": str(uuid.uuid4())
     }
     url = f'{base_url}/chat-messages'
-    resp = requests.post(url=url, headers=h, json=data, verify=False)
-    resp_json: dict = resp.json()
+    resp_json: dict = workflow_stream.post(url, h, data, verify=False)
     answer: str = resp_json.get('answer')
 
     logger.info(f'发券-手机号码校验结果[{mobile_no}][{bank_name}][{answer}]')
@@ -1150,16 +1180,11 @@ def issue_coupon():
                 'bankName': bank_name,
             },
             'query': mobile_no,
-            "response_mode": "blocking",
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
             "user": str(uuid.uuid4())
         }
         try:
-            _resp = requests.post(url=url, headers=_h, json=_data, verify=False)
-            try:
-                result = _resp.json()
-            except BaseException:
-                pass
-            result = result if result else _resp.text
+            result = workflow_stream.post(url, _h, _data, verify=False)
             logger.info(f'发券-调用发券结果[{mobile_no}][{bank_name}][{result}]')
         except Exception:
             logger.exception(f'发券-调用发券异常[{mobile_no}][{bank_name}]')
@@ -1248,44 +1273,11 @@ def get_ocr_result_v2():
         tenant_id=tenant_id,
         remote_addr=remote_addr
     )
-    slice_height = 3096
-    import cv2
-    img = cv2.imread(file_path)
-    height, width, _ = img.shape
-
-    # 初始化结果列表
-    all_texts = []
-
-    # 计算需要切割的行数
-    num_slices = height // slice_height + (height % slice_height > 0)
-
-    for i in range(num_slices):
-        # 计算当前切片的起始坐标
-        start_y = i * slice_height
-        end_y = min((i + 1) * slice_height, height)
-
-        # 切割图片
-        sliced_img = img[start_y:end_y, :]
-        # 保存或直接使用切片进行OCR，这里以保存为例（实际应用中可能直接处理图像数据）
-        try:
-            # 使用上下文管理器确保文件在使用完毕后自动关闭和删除
-            with tempfile.NamedTemporaryFile(delete=True, suffix=".jpg", mode='w+b') as temp_file:
-                cv2.imwrite(temp_file.name, sliced_img)
-                temp_file.flush()  # 确保数据写入磁盘
-
-                # 重新定位文件指针到开始位置，以便读取
-                temp_file.seek(0)
-
-                response_text, texts = paddle_ocr.ocr(temp_file.name)
-                all_texts.extend(texts[0])
-                logger.info(f'get_ocr_result[{file_path}][{response_text}][{texts}]')
-        except Exception as e:
-            logger.error(f'Error processing slice {i}: {e}')
-            # 如果发生异常，确保资源被释放，这里由于使用了上下文管理器，文件会被自动关闭和删除
-
+    # 切片在内存中编码并分批发送，相邻切片重叠，避免切断的文字丢失
+    response_text, texts = paddle_ocr.ocr_long_image(file_path)
     return {
         "response_text": response_text,
-        "texts": [all_texts]
+        "texts": texts
     }
 
 @bp.route('/common_pdf_parse', methods=['POST', 'GET', ])
@@ -1321,7 +1313,9 @@ def common_pdf_parse():
         remote_addr=remote_addr
     )
 
-    return {'text': pdf_common_parse.extract_information_from_pdf(file_path)}
+    text = parse_cache.parse('pdf_text', pdf_common_parse.PARSER_VERSION, file_path,
+                             pdf_common_parse.extract_information_from_pdf)
+    return {'text': text}
 
 
 @bp.route('/convert_to_word', methods=['POST'])
@@ -1412,33 +1406,15 @@ def read_excel():
         'text_5': '',
         'text_6': '',
     }
-    idx = 1
-    while True:
-        head = file_info.find("tenant_id='")
-        if head < 0:
-            break
-        head += + len("tenant_id='")
-        tail = head + 36
-        tenant_id = file_info[head:tail]
-
-        head = file_info.find("related_id='")
-        head += + len("related_id='")
-        tail = head + 36
-        file_id = file_info[head:tail]
-
-        file_path = lmjj_agent.file_download_by_tenant(
-            app_code=app_code,
-            file_id=file_id,
-            tenant_id=tenant_id,
-            remote_addr=remote_addr
-        )
-        t = excel_to_json.read_excel(file_path)
-
+    # 并发下载和解析所有文件，相同内容的文件直接使用缓存的解析结果
+    file_ids = list(lmjj_agent.iter_file_ids(file_info))
+    texts = lmjj_agent.download_files(
+        app_code, file_ids, remote_addr,
+        parse=lambda path: parse_cache.parse('excel_json', excel_to_json.PARSER_VERSION, path, excel_to_json.read_excel)
+    )
+    for idx, t in enumerate(texts, 1):
         data[f'text_{idx}'] = t
 
-        idx += 1
-        file_info = file_info[tail:]
-
     return data
 
 
@@ -1470,10 +1446,12 @@ async def semantic_label():
     file_info: str = args.get('file_info')
     from_addr: str = args.get('from_addr')
     output_len: int = args.get('output_len')
+    token_budget: int = args.get('token_budget') or env.SEMANTIC_LABEL_TOKEN_BUDGET
     sleep_time: int = args.get('sleep_time')
     app_key: str = args.get('app_key')
     remote_addr: str = from_addr if from_addr else request.remote_addr
-    logger.info(f'semantic_label[{app_code}][{file_info}][{remote_addr}][{output_len}][{sleep_time}][{app_key}]')
+    logger.info(f'semantic_label[{app_code}][{file_info}][{remote_addr}][{output_len}][{token_budget}][{sleep_time}]'
+                f'[{app_key}]')
     base_url = from_addr + "v1"
     headers = {'Authorization': f'Bearer {app_key}'}
     url = f'{base_url}/workflows/run'
@@ -1489,97 +1467,58 @@ async def semantic_label():
     #     'url_6': '',
     # }
 
-    df_list = []
-    while True:
-        head = file_info.find("tenant_id='")
-        if head < 0:
-            break
-        head += + len("tenant_id='")
-        tail = head + 36
-        tenant_id = file_info[head:tail]
-
-        head = file_info.find("related_id='")
-        head += + len("related_id='")
-        tail = head + 36
-        file_id = file_info[head:tail]
-
-        file_path = lmjj_agent.file_download_by_tenant(
-            app_code=app_code,
-            file_id=file_id,
-            tenant_id=tenant_id,
-            remote_addr=remote_addr
-        )
-        df = pd.read_excel(file_path)
-        df = df[df["解析命令"].notna()]
-        df = df[df["解析命令"] != "nomatch:out-of-voca"]
-        # df["解析命令"]这一列 删除 空值 "nomatch:out-of-voca" 的行
-        # df["解析命令"] = df["解析命令"].replace(np.nan, "无声音")
-        # df["解析命令"] = df["解析命令"].replace("nomatch:out-of-voca", "无识别")
-        df_list.append(df)
-        file_info = file_info[tail:]
-    # 只解析第一个文件
-    df = df_list[0]
-    # 定义异步请求函数
-    async def send_post_request(session, url, headers, data):
-        async with session.post(url=url, headers=headers, json=data, ssl=True) as response:
-            if response.status != 200:
-                logger.error(f"Failed to post to {url} with status code {response.status},{response.text}")
-                return ""
-            return await response.json()
+    # 只解析第一个文件，其他文件不再下载
+    file_path, = lmjj_agent.download_files(app_code, list(lmjj_agent.iter_file_ids(file_info))[:1], remote_addr)
+    # 只读取解析命令列，df["解析命令"]这一列 删除 空值 "nomatch:out-of-voca" 的行
+    df = call_records.drop_unrecognized(excel_stream.read_columns(file_path, call_records.LABEL_COLUMNS))
     # 创建异步任务列表
     tasks = []
-    # 切分数据
-    df1_slice_list = [df.iloc[i:i+output_len] for i in range(0,len(df),output_len)]
-    # 使用同一个session来复用TCP连接
+    # 按每秒请求数和最大并发数限速，代替逐个sleep
+    limiter = async_request.build_rate_limiter(args.get('rps'), args.get('max_in_flight'), sleep_time)
+    # 已缓存标签的解析命令和本次重复出现的解析命令不再请求
+    keys = call_records.utterance_keys(df)
+    workflow = label_cache.workflow_key(from_addr, app_key)
+    cached = label_cache.lookup(workflow, keys.unique().tolist())
+    miss_df = call_records.unique_misses(df, keys, cached)
+    logger.info(f'语义标签缓存[共{len(df)}行][命中{keys.isin(list(cached)).sum()}行][待请求{len(miss_df)}行]')
+    # 切分数据，设置了token预算时按token数装填
+    df1_slice_list = call_records.label_slices(miss_df, output_len, token_budget, env.SEMANTIC_LABEL_MAX_ROWS)
     # df1_slice_list = df1_slice_list[:1]
-    async with ClientSession() as session:
-        # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
-        for index, df1_slice in enumerate(df1_slice_list):
-            promopt_str_list = [f"{i}.{j}" for i, j in zip(range(1, output_len + 1), df1_slice["解析命令"])]
-            promopt_str = "\n".join(promopt_str_list)
-            data = {
-                "inputs": {
-                    "text": promopt_str
-                },
-                "response_mode": "blocking",
-                "user": str(uuid.uuid4())
-            }
-            logger.info(f'异步请求第{index+1}个')
-            task = asyncio.ensure_future(send_post_request(session, url, headers, data))
-            tasks.append(task)
-            time.sleep(sleep_time)
-            # if (index+1) % 10 == 0:
-            #     time.sleep(120)
+    # 所有请求共享应用级的连接池
+    # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
+    for index, df1_slice in enumerate(df1_slice_list):
+        promopt_str = call_records.label_prompt(df1_slice)
+        data = {
+            "inputs": {
+                "text": promopt_str
+            },
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
+            "user": str(uuid.uuid4())
+        }
+        logger.info(f'异步请求第{index+1}个')
+        task = asyncio.ensure_future(limiter.run(async_request.send_post_request, url, headers, data, ""))
+        tasks.append(task)
 
-        # 等待所有请求完成
-        responses = await asyncio.gather(*tasks)
+    # 等待所有请求完成
+    responses = await asyncio.gather(*tasks)
 
     # 汇总结果
     result = {'responses': responses}
     logger.info(f'异步请求结果:{result}')
     # 使用pd解析ret的text
     ret_text_list = [i["data"]["outputs"]["text"] for i in result["responses"]]
-    ret_df_list = [pd.read_csv(io.StringIO(i), sep=",", header=None) for i in ret_text_list]
-    # 修改列名，添加序号，并且给序号列添加前缀
-    ret_df_list = [i.rename(columns={0: "序号", 1: "大模型-解析命令"}) for i in ret_df_list]
-    # 给序号列的元素添加前缀,前缀为 在ret_df_list中的位置
-    for j, i in enumerate(ret_df_list):
-        i["序号"] = i["序号"].apply(lambda x: f"{j}-{x}")
-        i["大模型-解析命令"] = i["大模型-解析命令"].apply(lambda x: x.strip())
-    # 把ret_df_list合并成一个df
-    ret_df2 = pd.concat(ret_df_list)
-    # 把df1_slice_list合并成一个
-    ret_df1 = pd.concat(df1_slice_list)
-    # 把ret_df2和ret_df1的index列重置
-    ret_df2.reset_index(drop=True, inplace=True)
-    ret_df1 = ret_df1.reset_index(drop=True)
-    # 把ret_df2和ret_df1合并成一个
-    ret_df = pd.concat([ret_df1, ret_df2], axis=1)
+    # 按序号对应回解析命令，保存到缓存后拼到原始记录右侧
+    fresh = call_records.collect_labels(df1_slice_list, ret_text_list, keys)
+    label_cache.store(workflow, fresh)
+    # 序号按所有记录都请求时的切分位置填写，与不使用缓存时一致
+    positions = call_records.slice_positions(
+        call_records.label_slices(df, output_len, token_budget, env.SEMANTIC_LABEL_MAX_ROWS))
+    ret_df = call_records.fill_labels(df, keys, cached, fresh, positions, strip=True)
     tmp_filename = f'识别对话详情-大模型-{str(uuid.uuid4())}.xlsx'
     tmp_filepath = f'{tempfile.gettempdir()}/{tmp_filename}'
     try:
-        #保存ret_df，防止中文乱码
-        ret_df.to_excel(tmp_filepath, index=False)
+        # 逐行复制原表格，在右侧追加标签列
+        excel_stream.write_with_source(file_path, tmp_filepath, ret_df, call_records.LABEL_RESULT_COLUMNS)
     except Exception:
         logger.error(f'临时文件生成失败[{tmp_filepath}]', exc_info=True)
         return {
@@ -1618,105 +1557,67 @@ async def semantic_label_v2():
     file_info: str = args.get('file_info')
     from_addr: str = args.get('from_addr')
     output_len: int = args.get('output_len')
+    token_budget: int = args.get('token_budget') or env.SEMANTIC_LABEL_TOKEN_BUDGET
     sleep_time: int = args.get('sleep_time')
     app_key: str = args.get('app_key')
     remote_addr: str = from_addr if from_addr else request.remote_addr
-    logger.info(f'semantic_label[{app_code}][{file_info}][{remote_addr}][{output_len}][{sleep_time}][{app_key}]')
+    logger.info(f'semantic_label[{app_code}][{file_info}][{remote_addr}][{output_len}][{token_budget}][{sleep_time}]'
+                f'[{app_key}]')
     base_url = from_addr + "v1"
     headers = {'Authorization': f'Bearer {app_key}'}
     url = f'{base_url}/workflows/run'
     logger.info(f'外呼语义标签,  api_key:{app_key}, base_url:{base_url}')
-    df_list = []
-    while True:
-        head = file_info.find("tenant_id='")
-        if head < 0:
-            break
-        head += + len("tenant_id='")
-        tail = head + 36
-        tenant_id = file_info[head:tail]
-
-        head = file_info.find("related_id='")
-        head += + len("related_id='")
-        tail = head + 36
-        file_id = file_info[head:tail]
-
-        file_path = lmjj_agent.file_download_by_tenant(
-            app_code=app_code,
-            file_id=file_id,
-            tenant_id=tenant_id,
-            remote_addr=remote_addr
-        )
-        df = pd.read_excel(file_path)
-        # df = df[df["解析命令"].notna()]
-        # df = df[df["解析命令"] != "nomatch:out-of-voca"]
-        # df["解析命令"]这一列 删除 空值 "nomatch:out-of-voca" 的行
-        df["解析命令"] = df["解析命令"].replace(np.nan, "无声音")
-        df["解析命令"] = df["解析命令"].replace("nomatch:out-of-voca", "无识别")
-
-        df_list.append(df)
-        file_info = file_info[tail:]
-    # 只解析第一个文件
-    df = df_list[0]
-    # 定义异步请求函数
-    async def send_post_request(session, url, headers, data):
-        async with session.post(url=url, headers=headers, json=data, ssl=True) as response:
-            if response.status != 200:
-                logger.error(f"Failed to post to {url} with status code {response.status},{response.text}")
-                return ""
-            return await response.json()
+    # 只解析第一个文件，其他文件不再下载
+    file_path, = lmjj_agent.download_files(app_code, list(lmjj_agent.iter_file_ids(file_info))[:1], remote_addr)
+    df = call_records.fill_unrecognized(excel_stream.read_columns(file_path, call_records.LABEL_COLUMNS))
     # 创建异步任务列表
     tasks = []
-    # 切分数据
-    df1_slice_list = [df.iloc[i:i+output_len] for i in range(0,len(df),output_len)]
-    # 使用同一个session来复用TCP连接
+    # 按每秒请求数和最大并发数限速，代替逐个sleep
+    limiter = async_request.build_rate_limiter(args.get('rps'), args.get('max_in_flight'), sleep_time)
+    # 已缓存标签的解析命令和本次重复出现的解析命令不再请求
+    keys = call_records.utterance_keys(df)
+    workflow = label_cache.workflow_key(from_addr, app_key)
+    cached = label_cache.lookup(workflow, keys.unique().tolist())
+    miss_df = call_records.unique_misses(df, keys, cached)
+    logger.info(f'语义标签缓存[共{len(df)}行][命中{keys.isin(list(cached)).sum()}行][待请求{len(miss_df)}行]')
+    # 切分数据，设置了token预算时按token数装填
+    df1_slice_list = call_records.label_slices(miss_df, output_len, token_budget, env.SEMANTIC_LABEL_MAX_ROWS)
     # df1_slice_list = df1_slice_list[:1]
-    async with ClientSession() as session:
-        # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
-        for index, df1_slice in enumerate(df1_slice_list):
-            promopt_str_list = [f"{i}.{j}" for i, j in zip(range(1, output_len + 1), df1_slice["解析命令"])]
-            promopt_str = "\n".join(promopt_str_list)
-            data = {
-                "inputs": {
-                    "text": promopt_str
-                },
-                "response_mode": "blocking",
-                "user": str(uuid.uuid4())
-            }
-            logger.info(f'异步请求第{index+1}个')
-            task = asyncio.ensure_future(send_post_request(session, url, headers, data))
-            tasks.append(task)
-            time.sleep(sleep_time)
-            # if (index+1) % 10 == 0:
-            #     time.sleep(120)
+    # 所有请求共享应用级的连接池
+    # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
+    for index, df1_slice in enumerate(df1_slice_list):
+        promopt_str = call_records.label_prompt(df1_slice)
+        data = {
+            "inputs": {
+                "text": promopt_str
+            },
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
+            "user": str(uuid.uuid4())
+        }
+        logger.info(f'异步请求第{index+1}个')
+        task = asyncio.ensure_future(limiter.run(async_request.send_post_request, url, headers, data, ""))
+        tasks.append(task)
 
-        # 等待所有请求完成
-        responses = await asyncio.gather(*tasks)
+    # 等待所有请求完成
+    responses = await asyncio.gather(*tasks)
 
     # 汇总结果
     result = {'responses': responses}
     logger.info(f'异步请求结果:{result}')
     # 使用pd解析ret的text
     ret_text_list = [i["data"]["outputs"]["text"] for i in result["responses"]]
-    ret_df_list = [pd.read_csv(io.StringIO(i), sep=",", header=None) for i in ret_text_list]
-    # 修改列名，添加序号，并且给序号列添加前缀
-    ret_df_list = [i.rename(columns={0: "序号", 1: "大模型-解析命令"}) for i in ret_df_list]
-    # 给序号列的元素添加前缀,前缀为 在ret_df_list中的位置
-    for j, i in enumerate(ret_df_list):
-        i["序号"] = i["序号"].apply(lambda x: f"{j}-{x}")
-    # 把ret_df_list合并成一个df
-    ret_df2 = pd.concat(ret_df_list)
-    # 把df1_slice_list合并成一个
-    ret_df1 = pd.concat(df1_slice_list)
-    # 把ret_df2和ret_df1的index列重置
-    ret_df2.reset_index(drop=True, inplace=True)
-    ret_df1 = ret_df1.reset_index(drop=True)
-    # 把ret_df2和ret_df1合并成一个
-    ret_df = pd.concat([ret_df1, ret_df2], axis=1)
+    # 按序号对应回解析命令，保存到缓存后拼到原始记录右侧
+    fresh = call_records.collect_labels(df1_slice_list, ret_text_list, keys)
+    label_cache.store(workflow, fresh)
+    # 序号按所有记录都请求时的切分位置填写，与不使用缓存时一致
+    positions = call_records.slice_positions(
+        call_records.label_slices(df, output_len, token_budget, env.SEMANTIC_LABEL_MAX_ROWS))
+    ret_df = call_records.fill_labels(df, keys, cached, fresh, positions)
     tmp_filename = f'识别对话详情-大模型-{str(uuid.uuid4())}.xlsx'
     tmp_filepath = f'{tempfile.gettempdir()}/{tmp_filename}'
     try:
-        #保存ret_df，防止中文乱码
-        ret_df.to_excel(tmp_filepath, index=False)
+        # 逐行复制原表格，在右侧追加标签列
+        excel_stream.write_with_source(file_path, tmp_filepath, ret_df, call_records.LABEL_RESULT_COLUMNS)
     except Exception:
         logger.error(f'临时文件生成失败[{tmp_filepath}]', exc_info=True)
         return {
@@ -1775,87 +1676,32 @@ async def chat_summary():
     #     'url_6': '',
     # }
 
-    df_list = []
-    while True:
-        head = file_info.find("tenant_id='")
-        if head < 0:
-            break
-        head += + len("tenant_id='")
-        tail = head + 36
-        tenant_id = file_info[head:tail]
-
-        head = file_info.find("related_id='")
-        head += + len("related_id='")
-        tail = head + 36
-        file_id = file_info[head:tail]
-
-        file_path = lmjj_agent.file_download_by_tenant(
-            app_code=app_code,
-            file_id=file_id,
-            tenant_id=tenant_id,
-            remote_addr=remote_addr
-        )
-        df = pd.read_excel(file_path)
-        df["解析命令"] = df["解析命令"].replace(np.nan, "无声音")
-        df["解析命令"] = df["解析命令"].replace("nomatch:out-of-voca", "无识别")
-        df_list.append(df)
-        file_info = file_info[tail:]
-    # 只解析第一个文件
-    df = df_list[0]
-    # 定义异步请求函数
-    async def send_post_request(session, url, headers, data):
-        try:
-            async with session.post(url=url, headers=headers, json=data, ssl=True) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to post to {url} with status code {response.status},{response.text}")
-                    return {
-                        "data":
-                            {"outputs":
-                                 {"result": "本次总结请求出错"}}}
-                return await response.json()
-        except asyncio.exceptions.TimeoutError:
-            logger.error(f"Failed to post to {url} with status code {response.status},{response.text}")
-            return {
-                "data":
-                    {"outputs":
-                         {"result": "本次总结请求出错"}}}
+    # 只解析第一个文件，其他文件不再下载
+    file_path, = lmjj_agent.download_files(app_code, list(lmjj_agent.iter_file_ids(file_info))[:1], remote_addr)
+    df = call_records.fill_unrecognized(excel_stream.read_columns(file_path, call_records.SUMMARY_COLUMNS))
     # 创建异步任务列表
     tasks = []
-    # 切分一次需要的数据
-    case_num_list = df["案件编号"].unique()
-    # 用前几个测试
-    # case_num_list = case_num_list[:50]
-    promopt_str_dict = {}
-    for case_id in case_num_list:
-        extracted_data = df[df['案件编号'] == case_id][['AI话术', '解析命令']]
-        # 将提取的数据转换为字符串格式，每条记录一行
-        output_strings = extracted_data.apply(lambda row: f"客服: {row['AI话术']}，客户: {row['解析命令']}",
-                                              axis=1).tolist()
-        promopt_str = "\n".join(output_strings)
-        promopt_str_dict[case_id] = promopt_str
-    # 使用同一个session来复用TCP连接
-    # df1_slice_list = df1_slice_list[:1]
-    promopt_str_dict_values = [promopt_str_dict[case_id] for case_id in case_num_list]
-
-    async with ClientSession() as session:
-        # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
-        for index, promopt_str in enumerate(promopt_str_dict_values):
-            data = {
-                "inputs": {
-                    "connectCot": promopt_str
-                },
-                "response_mode": "blocking",
-                "user": str(uuid.uuid4())
-            }
-            logger.info(f'异步请求第{index+1}个')
-            task = asyncio.ensure_future(send_post_request(session, url, headers, data))
-            tasks.append(task)
-            time.sleep(sleep_time)
-            # if (index+1) % 10 == 0:
-            #     time.sleep(120)
+    # 按每秒请求数和最大并发数限速，代替逐个sleep
+    limiter = async_request.build_rate_limiter(args.get('rps'), args.get('max_in_flight'), sleep_time)
+    # 按案件编号汇总对话，每条记录一行
+    case_num_list, promopt_str_dict_values = call_records.build_case_prompts(df)
+
+    # 所有请求共享应用级的连接池
+    # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
+    for index, promopt_str in enumerate(promopt_str_dict_values):
+        data = {
+            "inputs": {
+                "connectCot": promopt_str
+            },
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
+            "user": str(uuid.uuid4())
+        }
+        logger.info(f'异步请求第{index+1}个')
+        task = asyncio.ensure_future(limiter.run(async_request.send_post_request, url, headers, data))
+        tasks.append(task)
 
-        # 等待所有请求完成
-        responses = await asyncio.gather(*tasks)
+    # 等待所有请求完成
+    responses = await asyncio.gather(*tasks)
 
     # 汇总结果
     result = {'responses': responses}
@@ -1866,18 +1712,14 @@ async def chat_summary():
             ret_text_list.append(i["data"]["outputs"]["result"])
         except Exception:
             ret_text_list.append("本次总结请求出错")
-    # 给df增加一列，名为总结的空列
-    df["总结"] = [None] * len(df)
     # 把ret_text_list 按照case_num_list的顺序 依据case_id 添加到对应的df["总结"]列
-    for i, case_id in enumerate(case_num_list):
-        df.loc[df["案件编号"] == case_id, "总结"] = ret_text_list[i]
+    call_records.fill_case_results(df, case_num_list, ret_text_list, call_records.SUMMARY_RESULT_COLUMNS[0])
     tmp_filename = f'识别对话总结-{str(uuid.uuid4())}.xlsx'
     tmp_filepath = f'{tempfile.gettempdir()}/{tmp_filename}'
 
     try:
-        #保存ret_df，防止中文乱码
-        df.to_excel(tmp_filepath, index=False)
-        df.to_excel(f"./file/{tmp_filename}", index=False, encoding='utf-8')
+        # 逐行复制原表格，在右侧追加总结列
+        excel_stream.write_with_source(file_path, tmp_filepath, df, call_records.SUMMARY_RESULT_COLUMNS)
     except Exception:
         logger.error(f'临时文件生成失败[{tmp_filepath}]', exc_info=True)
         return {
@@ -1905,6 +1747,10 @@ async def activate_sleeping_users():
                         location='json', type=str, required=False)
     parser.add_argument('sleep_time',
                         location='json', type=int, required=False)
+    parser.add_argument('rps',
+                        location='json', type=float, required=False)
+    parser.add_argument('max_in_flight',
+                        location='json', type=int, required=False)
     args = parser.parse_args()
 
     app_code: str = args.get('app_code')
@@ -1923,28 +1769,27 @@ async def activate_sleeping_users():
 
     # 创建异步任务列表
     tasks = []
-    async with ClientSession() as session:
-        # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
-        for index, df_row_i in enumerate(df.values):
-            data = {
-                "inputs": {
-                    "info": f"手机号：{df_row_i[0]},姓名：{df_row_i[1]}",
-                    "bill": f"{df_row_i[2]}"
-                },
-                "query": "1",
-                "response_mode": "blocking",
-                "conversation_id": "",
-                "user": str(uuid.uuid4())
-            }
-            logger.info(f'异步请求第{index + 1}个,{data}')
-            task = asyncio.ensure_future(async_request.send_post_request(session, url, headers, data))
-            tasks.append(task)
-            time.sleep(sleep_time)
-            # if (index+1) % 10 == 0:
-            #     time.sleep(120)
-
-            # 等待所有请求完成
-        responses = await asyncio.gather(*tasks)
+    # 按每秒请求数和最大并发数限速，代替逐个sleep
+    limiter = async_request.build_rate_limiter(args.get('rps'), args.get('max_in_flight'), sleep_time)
+    # 所有请求共享应用级的连接池
+    # 将 df 解析命令  列取出，使用zip 与1-100序号配对后输出字符串
+    for index, df_row_i in enumerate(df.values):
+        data = {
+            "inputs": {
+                "info": f"手机号：{df_row_i[0]},姓名：{df_row_i[1]}",
+                "bill": f"{df_row_i[2]}"
+            },
+            "query": "1",
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
+            "conversation_id": "",
+            "user": str(uuid.uuid4())
+        }
+        logger.info(f'异步请求第{index + 1}个,{data}')
+        task = asyncio.ensure_future(limiter.run(async_request.send_post_request, url, headers, data))
+        tasks.append(task)
+
+    # 等待所有请求完成
+    responses = await asyncio.gather(*tasks)
     # 汇总结果
     result = {'responses': responses}
     logger.info(f'异步请求结果:{result}')
@@ -1974,6 +1819,121 @@ async def activate_sleeping_users():
     return download_result
 
 
+@bp.route('/batch_jobs/<kind>', methods=['POST'])
+def submit_batch_job(kind):
+    """
+    提交批量任务，立即返回任务ID，任务在后台执行并按请求保存检查点
+    kind: semantic_label、semantic_label_v2、chat_summary，参数与对应接口一致
+    """
+    req_text = request.data.decode('utf-8')
+    logger.info(
+        f'submit_batch_job'
+        f'[{kind}]'
+        f'[{req_text}]'
+    )
+    try:
+        args: dict = json.loads(req_text)
+    except Exception:
+        logger.error(
+            f'submit_batch_job'
+            f'[请求参数不是正确的JSON]',
+            exc_info=True
+        )
+        return {
+            'error': '请求参数不是正确的JSON',
+        }
+
+    params = {i: args.get(i) for i in ('app_code', 'file_info', 'from_addr', 'app_key', 'output_len',
+                                       'token_budget', 'sleep_time', 'rps', 'max_in_flight')}
+    params['remote_addr'] = params['from_addr'] if params['from_addr'] else request.remote_addr
+    try:
+        result = batch_jobs.submit(kind, params)
+    except batch_jobs.BatchJobError as e:
+        return {
+            'error': str(e),
+        }
+    result['error'] = ''
+    return result
+
+
+@bp.route('/batch_jobs/<job_id>', methods=['GET'])
+def batch_job_status(job_id):
+    """
+    查询批量任务状态，status为finished时result为上传后的文件信息
+    status为interrupted表示执行任务的服务进程已退出，需要调用恢复接口继续执行
+    """
+    try:
+        return batch_jobs.get_status(job_id)
+    except batch_jobs.BatchJobError as e:
+        return {
+            'error': str(e),
+        }
+
+
+@bp.route('/batch_jobs/<job_id>/resume', methods=['POST'])
+def resume_batch_job(job_id):
+    """
+    继续执行失败或中断的批量任务，已完成的请求不会重复执行
+    """
+    try:
+        return batch_jobs.resume(job_id)
+    except batch_jobs.BatchJobError as e:
+        return {
+            'error': str(e),
+        }
+
+@bp.route('/workflow_stream', methods=['POST'])
+def workflow_stream_proxy():
+    """
+    以streaming模式调用工作流，把生成的文本逐段以SSE转发给调用方
+    传query时调用chat-messages，否则调用workflows/run
+    事件：{"event": "text", "text": ...}、{"event": "finished", "result": ...}、{"event": "error", "error": ..., "partial": ...}
+    """
+    parser = reqparse.RequestParser()
+    parser.add_argument('from_addr',
+                        location='json', type=str, required=True)
+    parser.add_argument('app_key',
+                        location='json', type=str, required=True)
+    parser.add_argument('inputs',
+                        location='json', type=dict, required=False, default={})
+    parser.add_argument('query',
+                        location='json', type=str, required=False)
+    parser.add_argument('ttft_timeout',
+                        location='json', type=float, required=False)
+    args = parser.parse_args()
+
+    from_addr: str = args.get('from_addr')
+    query: str = args.get('query')
+    headers = {'Authorization': f"Bearer {args.get('app_key')}"}
+    data = {
+        "inputs": args.get('inputs'),
+        "response_mode": "streaming",
+        "user": str(uuid.uuid4())
+    }
+    if query:
+        data['query'] = query
+        url = f'{from_addr}v1/chat-messages'
+    else:
+        url = f'{from_addr}v1/workflows/run'
+    logger.info(f'工作流流式转发[{url}]')
+
+    def sse(event: dict) -> str:
+        return f'data: {json.dumps(event, ensure_ascii=False)}\n\n'
+
+    def generate():
+        collector = workflow_stream.StreamCollector(url, ttft_timeout=args.get('ttft_timeout'))
+        try:
+            for chunk in workflow_stream.iter_text(url, headers, data, collector):
+                yield sse({'event': 'text', 'text': chunk})
+        except (workflow_stream.WorkflowStreamError, requests.exceptions.RequestException) as e:
+            logger.error(f'工作流流式转发-失败[{url}][{e}]')
+            yield sse({'event': 'error', 'error': str(e), 'partial': getattr(e, 'partial', collector.partial)})
+            return
+        yield sse({'event': 'finished', 'result': collector.result})
+
+    # 调用方断开连接时生成器被关闭，iter_text会取消上游生成
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 
 # 调度器管理API
 @bp.route('/scheduler/status', methods=['GET'])
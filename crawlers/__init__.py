@@ -1,4 +1,6 @@
-from flask import Blueprint
+import time
+
+from flask import Blueprint, request
 
 from .financial_news_crawler import financial_news_bp
 from .cnfin_crawler import cnfin_bp
@@ -22,6 +24,7 @@ from .ndrc_policy_crawler import ndrc_policy_bp
 from .chinapolicy_crawler import chinapolicy_bp
 from .stock_index_crawler import stock_index_bp
 from .tthuangli_crawler import tthuangli_bp
+from .batch import parse_source_names, run_batch
 
 # 创建爬虫模块的主蓝图
 crawlers_bp = Blueprint('crawlers', __name__)
@@ -174,6 +177,11 @@ def list_crawlers():
             'name': '天天黄历-所有信息',
             'endpoint': '/api/crawlers/tthuangli/all_info',
             'description': '获取天天黄历网站的所有信息（日期、宜忌、五行穿衣指南）'
+        },
+        {
+            'name': '多数据源并发爬取',
+            'endpoint': '/api/crawlers/batch',
+            'description': '并发执行多个爬虫（names传数据源列表或all），按数据源返回结果及耗时'
         }
     ]
     
@@ -181,4 +189,51 @@ def list_crawlers():
         'status': 'success',
         'message': '成功获取爬虫列表',
         'data': crawlers
-    } 
\ No newline at end of file
+    }
+
+
+@crawlers_bp.route('/batch', methods=['GET', 'POST'])
+def crawl_batch():
+    """
+    并发执行多个爬虫
+
+    参数（GET查询参数或POST JSON）:
+        names: 数据源名称列表或逗号分隔的字符串，"all"表示全部，名称同各爬虫的url前缀
+        timeout: 单个数据源的超时时间(秒)，正数，整批总时限为timeout * ceil(数据源数 / 并发数)
+        max_workers: 最大并发数，正整数
+        use_cache: 是否使用爬虫结果缓存，true或false，默认true
+
+    参数不合法或数据源未知时返回400
+    """
+    params = request.get_json(silent=True) or {}
+    names = params.get('names', request.args.get('names', 'all'))
+    timeout = params.get('timeout', request.args.get('timeout'))
+    max_workers = params.get('max_workers', request.args.get('max_workers'))
+    use_cache = params.get('use_cache', request.args.get('use_cache', True))
+
+    source_names, unknown = parse_source_names(names)
+    if unknown:
+        return {
+            'status': 'error',
+            'message': f'未知的数据源: {", ".join(unknown)}',
+            'data': None
+        }, 400
+
+    start = time.monotonic()
+    try:
+        results = run_batch(source_names, timeout=timeout, max_workers=max_workers, use_cache=use_cache)
+    except ValueError as e:
+        return {
+            'status': 'error',
+            'message': f'参数错误: {e}',
+            'data': None
+        }, 400
+    elapsed = round(time.monotonic() - start, 3)
+
+    failed = [name for name, item in results.items() if item['status'] != 'success']
+    return {
+        'status': 'success' if not failed else 'partial_success',
+        'message': f'完成{len(results)}个数据源的爬取，失败或超时{len(failed)}个',
+        'elapsed': elapsed,
+        'data': results
+    }
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬虫异步抓取引擎
+
+- 基于aiohttp，一个事件循环可以同时驱动大量列表页和详情页请求
+- 总并发数和每个主机的并发数分别限制，避免对单个网站造成压力
+- 详情页请求可按主机使用令牌桶限速，代替在请求前sleep的做法
+- 同步的crawl()通过run_sync()把acrawl()提交到后台常驻事件循环执行，
+  所有线程中的同步调用共享同一个事件循环和连接池
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import aiohttp
+import charset_normalizer
+import requests
+import yarl
+
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
+# 同时进行的最大请求数
+ASYNC_CONCURRENCY = int(os.getenv('CRAWLER_ASYNC_CONCURRENCY', 100))
+# 每个主机同时进行的最大请求数
+ASYNC_PER_HOST = int(os.getenv('CRAWLER_ASYNC_PER_HOST', 4))
+# DNS缓存时间(秒)
+ASYNC_DNS_TTL = int(os.getenv('CRAWLER_ASYNC_DNS_TTL', 300))
+# 限速请求每个主机每秒发放的令牌数
+HOST_RATE = float(os.getenv('CRAWLER_HOST_RATE', 1))
+# 每个主机令牌桶的容量，即允许的突发请求数
+HOST_BURST = int(os.getenv('CRAWLER_HOST_BURST', 2))
+
+RETRY_METHODS = ('GET', 'HEAD')
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# 与aiohttp默认值一致
+MAX_REDIRECTS = 10
+
+
+class FetchResult:
+    """一次请求的结果，接口与requests.Response的常用部分保持一致"""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.content = content or b''
+        self.encoding = requests.utils.get_encoding_from_headers(self.headers)
+
+    @property
+    def text(self):
+        encoding = self.encoding
+        if not encoding:
+            # 与requests一致，未声明编码时自动检测
+            best = charset_normalizer.from_bytes(self.content).best()
+            encoding = best.encoding if best else 'utf-8'
+        return self.content.decode(encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+# 可替换的传输层，签名与AsyncFetchEngine._aiohttp_transport一致，用于离线录制/回放
+_transport = None
+
+
+def set_transport(transport):
+    """
+    替换异步引擎的传输层
+
+    Args:
+        transport: async函数(method, url, **kwargs) -> FetchResult，为None时恢复aiohttp
+
+    Returns:
+        原来的传输层
+    """
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
+
+class TokenBucket:
+    """令牌桶，按固定速率发放令牌，桶满时最多允许burst个请求同时发出"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                # 只有等待令牌的协程在睡眠，其他主机的请求不受影响
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """按主机划分的令牌桶"""
+
+    def __init__(self, rate=HOST_RATE, burst=HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+
+    async def acquire(self, url):
+        if self.rate <= 0:
+            return
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+
+
+class AsyncFetchEngine:
+    """绑定到一个事件循环的抓取引擎"""
+
+    def __init__(self, concurrency=ASYNC_CONCURRENCY, per_host=ASYNC_PER_HOST, timeout=http_client.HTTP_TIMEOUT,
+                 retries=http_client.HTTP_RETRIES, backoff_factor=http_client.HTTP_BACKOFF_FACTOR):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = HostRateLimiter()
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=ASYNC_DNS_TTL,
+            )
+            # 会话本身不保存cookie，避免不同爬虫互相影响；重定向过程中设置的cookie由每次请求单独的CookieJar保存
+            self._session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+
+    async def _aiohttp_transport(self, method, url, headers=None, params=None, json=None, data=None,
+                                 cookies=None, timeout=None):
+        """
+        自行跟随重定向：部分网站在302响应中设置会话cookie，后续跳转需要带上，
+        因此每次请求使用一个单独的CookieJar，请求结束后丢弃
+        """
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        jar = aiohttp.CookieJar(unsafe=True)
+        for _ in range(MAX_REDIRECTS + 1):
+            request_cookies = dict(cookies or {})
+            request_cookies.update({k: v.value for k, v in jar.filter_cookies(yarl.URL(url)).items()})
+            async with session.request(method, url, headers=headers, params=params, json=json, data=data,
+                                       cookies=request_cookies, timeout=client_timeout,
+                                       allow_redirects=False) as response:
+                content = await response.read()
+                jar.update_cookies(response.cookies, response.url)
+                location = response.headers.get('Location')
+                if response.status not in REDIRECT_STATUSES or not location:
+                    return FetchResult(str(response.url), response.status, dict(response.headers), content)
+                url = str(response.url.join(yarl.URL(location)))
+            # 跳转地址中已包含查询参数
+            params = None
+            if response.status == 303 or (response.status in (301, 302) and method.upper() == 'POST'):
+                # 与浏览器和aiohttp一致，改为不带请求体的GET
+                method, json, data = 'GET', None, None
+        raise aiohttp.TooManyRedirects(response.request_info, response.history, message=f'超过{MAX_REDIRECTS}次重定向')
+
+    async def fetch(self, method, url, headers=None, params=None, json=None, data=None, cookies=None, timeout=None,
+                    polite=False):
+        """
+        发送请求，连接错误及429/5xx响应按http_client相同的策略重试(仅GET/HEAD)
+
+        Args:
+            polite: 是否按主机令牌桶限速，批量抓取同一网站的详情页时使用
+
+        Returns:
+            FetchResult，重试耗尽后返回最后一次响应
+        """
+        timeout = timeout if timeout else self.timeout
+        transport = _transport or self._aiohttp_transport
+        retries = self.retries if method.upper() in RETRY_METHODS else 0
+
+        for attempt in range(retries + 1):
+            if polite:
+                await self.rate_limiter.acquire(url)
+            try:
+                result = await transport(method, url, headers=headers, params=params, json=json, data=data,
+                                         cookies=cookies, timeout=timeout)
+                if result.status_code not in http_client.RETRY_STATUS_FORCELIST or attempt == retries:
+                    return result
+            except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.RequestException):
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def get(self, url, **kwargs):
+        return await self.fetch('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.fetch('POST', url, **kwargs)
+
+    async def fetch_text(self, url, encoding=None, **kwargs):
+        """
+        GET请求网页，状态码不是200或请求出错时返回None
+
+        Args:
+            encoding: 网页编码，为None时按响应头或自动检测
+        """
+        try:
+            result = await self.get(url, **kwargs)
+        except Exception as e:
+            logger.error(f'获取页面出错: {url}, 错误: {str(e)}')
+            return None
+        if result.status_code != 200:
+            logger.error(f'获取页面失败: {url}, 状态码: {result.status_code}')
+            return None
+        if encoding:
+            result.encoding = encoding
+        return result.text
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+_engines = weakref.WeakKeyDictionary()
+
+
+def get_engine():
+    """获取当前事件循环的抓取引擎，aiohttp会话不能跨事件循环使用"""
+    loop = asyncio.get_running_loop()
+    engine = _engines.get(loop)
+    if engine is None:
+        engine = _engines[loop] = AsyncFetchEngine()
+    return engine
+
+
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def _get_background_loop():
+    global _loop, _loop_thread
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                _loop_thread = threading.Thread(target=loop.run_forever, name='crawler-async-engine', daemon=True)
+                _loop_thread.start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    在后台常驻事件循环中执行协程并等待结果，供同步的crawl()使用
+
+    Args:
+        coro: 协程对象
+        timeout: 等待超时时间(秒)，为None时一直等待
+    """
+    loop = _get_background_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError('不能在异步引擎的事件循环中调用同步接口，请直接await对应的异步方法')
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+async def gather_limited(coros, limit=None):
+    """
+    并发执行多个协程，按传入顺序返回结果；单个协程出错时对应位置返回异常对象
+
+    Args:
+        limit: 同时执行的最大数量，为None时不限制（仍受引擎的主机并发限制）
+    """
+    if limit:
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(coro):
+            async with semaphore:
+                return await coro
+
+        coros = [run(coro) for coro in coros]
+    return await asyncio.gather(*coros, return_exceptions=True)
+
+
+async def fetch_in_order(items, fetch, accept=None, limit=None):
+    """
+    并发获取详情页，结果按items的顺序返回
+
+    每轮只并发请求还差的数量，凑够limit个符合条件的结果后停止，
+    在大多数情况下只需要一轮请求的耗时，又不会多请求用不到的详情页。
+
+    Args:
+        items: 列表项
+        fetch: async函数，参数为列表项，返回详情
+        accept: 函数(列表项, 详情) -> bool，判断结果是否可用，默认详情不为None即可用
+        limit: 需要的结果数量，为None时获取全部
+
+    Returns:
+        list: [(列表项, 详情), ...]，只包含可用的结果
+    """
+    accept = accept or (lambda item, detail: detail is not None)
+    items = list(items)
+    limit = len(items) if limit is None else limit
+    results = []
+    position = 0
+    while position < len(items) and len(results) < limit:
+        window = items[position:position + limit - len(results)]
+        position += len(window)
+        details = await asyncio.gather(*[fetch(item) for item in window], return_exceptions=True)
+        for item, detail in zip(window, details):
+            if isinstance(detail, Exception):
+                logger.error(f'获取详情出错: {detail}')
+                continue
+            if accept(item, detail) and len(results) < limit:
+                results.append((item, detail))
+    return results
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多数据源并发爬取
+
+把各个爬虫的crawl()放到有界线程池中并发执行，每个数据源单独计时和超时，
+总耗时接近最慢的数据源而不是所有数据源耗时之和。
+排队等待的数据源受整批的总时限约束，不会因为前面的爬虫卡住而无限等待。
+"""
+
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .chinapolicy_crawler import ChinaPolicyCrawler
+from .cnfin_crawler import CnfinCrawler
+from .cnfin_risk_crawler import CnfinRiskCrawler
+from .cs_company_crawler import CSCompanyCrawler
+from .east_money_crawler import EastMoneyCrawler
+from .east_money_focus_crawler import EastMoneyFocusCrawler
+from .east_money_lczx_crawler import EastMoneyLczxCrawler
+from .eastmoney_antifraud_crawler import CCTVAntifraudCrawler
+from .eastmoney_international_crawler import EastmoneyInternationalCrawler
+from .financial_news_crawler import FinancialNewsCrawler
+from .huanqiu_world_crawler import HuanqiuWorldCrawler
+from .ndrc_policy_crawler import NDRCPolicyCrawler
+from .people_health_crawler import PeopleHealthCrawler
+from .people_science_crawler import PeopleScienceCrawler
+from .people_society_crawler import PeopleSocietyCrawler
+from .shenlanbao_crawler import ShenlanbaoCrawler
+from .sina_finance_crawler import SinaFinanceCrawler
+from .sina_stock_crawler import SinaStockCrawler
+from .sohu_finance_crawler import SohuFinanceCrawler
+from .sohu_policy_crawler import SohuPolicyCrawler
+from .stock_index_crawler import StockIndexCrawler
+from .tthuangli_crawler import TthuangliCrawler
+from .result_cache import crawl_cache
+
+# 单个数据源的默认超时时间(秒)
+BATCH_SOURCE_TIMEOUT = float(os.getenv('CRAWLER_BATCH_SOURCE_TIMEOUT', 60))
+# 并发执行的最大爬虫数量
+BATCH_MAX_WORKERS = int(os.getenv('CRAWLER_BATCH_MAX_WORKERS', 8))
+
+# 数据源名称与蓝图的url_prefix保持一致
+CRAWLER_SOURCES = {
+    'financial_news': lambda: FinancialNewsCrawler().crawl(),
+    'cnfin': lambda: CnfinCrawler().crawl(),
+    'east_money': lambda: EastMoneyCrawler().crawl(),
+    'east_money_focus': lambda: EastMoneyFocusCrawler().crawl(),
+    'east_money_lczx': lambda: EastMoneyLczxCrawler().crawl(),
+    'sina_finance': lambda: SinaFinanceCrawler().crawl(),
+    'sina_stock': lambda: SinaStockCrawler().crawl(),
+    'shenlanbao': lambda: ShenlanbaoCrawler().crawl(),
+    'cs_company': lambda: CSCompanyCrawler().crawl(),
+    'sohu_policy': lambda: SohuPolicyCrawler().crawl(),
+    'eastmoney_antifraud': lambda: CCTVAntifraudCrawler().crawl(),
+    'cnfin_risk': lambda: CnfinRiskCrawler().crawl(),
+    'sohu_finance': lambda: SohuFinanceCrawler().get_latest_news(),
+    'eastmoney_international': lambda: EastmoneyInternationalCrawler().crawl(),
+    'huanqiu_world': lambda: HuanqiuWorldCrawler().crawl(),
+    'people_health': lambda: PeopleHealthCrawler().crawl(),
+    'people_society': lambda: PeopleSocietyCrawler().crawl(),
+    'people_science': lambda: PeopleScienceCrawler().crawl(),
+    'ndrc_policy': lambda: NDRCPolicyCrawler().crawl(),
+    'chinapolicy': lambda: ChinaPolicyCrawler().crawl(),
+    'stock_index': lambda: StockIndexCrawler().crawl(),
+    'tthuangli': lambda: TthuangliCrawler().get_all_info(),
+}
+
+# 缓存键与单独调用爬虫接口时不同的数据源，未列出的数据源以名称为缓存键
+# chinapolicy接口按days缓存，默认days=1
+CRAWLER_CACHE_KEYS = {
+    'chinapolicy': 'chinapolicy:1',
+}
+
+
+def positive_float(value, name):
+    """把参数转换为正数，无法转换或不大于0时抛出ValueError"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name}必须是正数: {value!r}')
+    if not math.isfinite(number) or number <= 0:
+        raise ValueError(f'{name}必须是正数: {value!r}')
+    return number
+
+
+def positive_int(value, name):
+    """把参数转换为正整数，无法转换或不大于0时抛出ValueError"""
+    if isinstance(value, bool):
+        raise ValueError(f'{name}必须是正整数: {value!r}')
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name}必须是正整数: {value!r}')
+    if number != float(value) or number <= 0:
+        raise ValueError(f'{name}必须是正整数: {value!r}')
+    return number
+
+
+def parse_bool(value, name):
+    """解析布尔参数，支持true/false、1/0、yes/no"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ('true', '1', 'yes'):
+            return True
+        if text in ('false', '0', 'no'):
+            return False
+    raise ValueError(f'{name}必须是true或false: {value!r}')
+
+
+def parse_source_names(names):
+    """
+    解析数据源列表，支持"all"、逗号分隔的字符串或列表
+
+    Returns:
+        tuple: (有效的数据源名称列表, 未知的数据源名称列表)
+    """
+    if not names or names == 'all' or names == ['all']:
+        return list(CRAWLER_SOURCES), []
+    if isinstance(names, str):
+        names = names.split(',')
+
+    valid, unknown = [], []
+    for name in names:
+        name = str(name).strip()
+        if not name or name in valid:
+            continue
+        if name in CRAWLER_SOURCES:
+            valid.append(name)
+        else:
+            unknown.append(name)
+    return valid, unknown
+
+
+def run_batch(names, timeout=None, max_workers=None, use_cache=True):
+    """
+    并发执行多个爬虫
+
+    Args:
+        names: 数据源名称列表
+        timeout: 单个数据源的超时时间(秒)，从该数据源开始执行时计时
+        max_workers: 最大并发数
+        use_cache: 是否使用爬虫结果缓存，与单独调用各爬虫接口共享
+
+    整批的总时限为timeout * ceil(数据源数 / 并发数)，从提交时计时，
+    到时仍在执行或还未开始执行的数据源都记为超时
+
+    Returns:
+        dict: 以数据源名称为键，值包含status(success/error/timeout)、elapsed和data
+
+    Raises:
+        ValueError: timeout、max_workers或use_cache不合法
+    """
+    timeout = positive_float(timeout, 'timeout') if timeout is not None else BATCH_SOURCE_TIMEOUT
+    max_workers = positive_int(max_workers, 'max_workers') if max_workers is not None else BATCH_MAX_WORKERS
+    max_workers = min(max_workers, len(names) or 1)
+    use_cache = parse_bool(use_cache, 'use_cache')
+
+    started = {}
+    results = {}
+
+    def run(name):
+        started[name] = time.monotonic()
+        if use_cache:
+            return crawl_cache.get(CRAWLER_CACHE_KEYS.get(name, name), CRAWLER_SOURCES[name])
+        return CRAWLER_SOURCES[name]()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crawler-batch')
+    try:
+        submitted = time.monotonic()
+        total_timeout = timeout * math.ceil(len(names) / max_workers)
+        batch_deadline = submitted + total_timeout
+        futures = {executor.submit(run, name): name for name in names}
+        pending = set(futures)
+        while pending:
+            # 等到最早一个正在执行的数据源超时或整批到达总时限为止
+            now = time.monotonic()
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            wait_time = max(0, min(deadlines + [batch_deadline]) - now)
+            done, pending = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = futures[future]
+                elapsed = time.monotonic() - started.get(name, now)
+                try:
+                    results[name] = {
+                        'status': 'success',
+                        'elapsed': round(elapsed, 3),
+                        'data': future.result(),
+                    }
+                except Exception as e:
+                    results[name] = {
+                        'status': 'error',
+                        'elapsed': round(elapsed, 3),
+                        'message': f'爬取过程中出错: {str(e)}',
+                        'data': None,
+                    }
+
+            now = time.monotonic()
+            for future in list(pending):
+                name = futures[future]
+                if name in started and (now - started[name] >= timeout or now >= batch_deadline):
+                    # 线程无法强制终止，超时的爬虫在后台自然结束，结果丢弃
+                    pending.discard(future)
+                    results[name] = {
+                        'status': 'timeout',
+                        'elapsed': round(now - started[name], 3),
+                        'message': f'爬取超时({timeout}秒)',
+                        'data': None,
+                    }
+                elif name not in started and now >= batch_deadline:
+                    # 前面的爬虫占满了线程，到总时限仍未开始执行
+                    future.cancel()
+                    pending.discard(future)
+                    results[name] = {
+                        'status': 'timeout',
+                        'elapsed': 0,
+                        'message': f'等待执行超时，整批总时限{total_timeout}秒',
+                        'data': None,
+                    }
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # 按请求顺序输出
+    return {name: results[name] for name in names if name in results}
@@ -1,5 +1,7 @@
-import requests
-from bs4 import BeautifulSoup
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
+import asyncio
 import datetime
 import re
 import os
@@ -27,11 +29,15 @@ class ChinaPolicyCrawler:
             'Referer': self.base_url
         }
     
-    def get_html(self, url):
-        """获取网页HTML内容"""
+    def get_html(self, url, polite=False):
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url, polite))
+    
+    async def aget_html(self, url, polite=False):
+        """获取网页HTML内容（异步），polite为True时按主机令牌桶限速"""
         try:
             logger.info(f"开始请求URL: {url}")
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = await get_engine().get(url, headers=self.headers, timeout=15, polite=polite)
             # 使用GBK编码来解析中文
             response.encoding = 'gbk'
             if response.status_code == 200:
@@ -58,7 +64,7 @@ class ChinaPolicyCrawler:
         except Exception as e:
             logger.error(f"保存调试HTML出错: {str(e)}")
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             logger.info("使用最直接的方法查找所有文章链接...")
             
@@ -378,7 +384,7 @@ class ChinaPolicyCrawler:
         except Exception as e:
             logger.error(f"保存调试HTML出错: {str(e)}")
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             logger.info("开始解析文章内容")
             
@@ -446,8 +452,12 @@ class ChinaPolicyCrawler:
             return f"解析文章内容出错: {e}"
     
     def get_article_detail(self, url):
-        """获取文章详情，包括标题和内容"""
-        html = self.get_html(url)
+        """获取文章详情，包括标题和内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详情，包括标题和内容（异步）"""
+        html = await self.aget_html(url, polite=True)
         if not html:
             return None
         
@@ -489,6 +499,10 @@ class ChinaPolicyCrawler:
             return False
     
     def crawl(self, days=1):
+        """爬取中国政策网 (chinapolicy.net) 最近days天内的政策解读新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl(days=days))
+    
+    async def acrawl(self, days=1):
         """
         爬取中国政策网 (chinapolicy.net) 最近days天内的政策解读新闻
         
@@ -505,7 +519,7 @@ class ChinaPolicyCrawler:
         logger.info(f"开始请求URL: {list_url}")
         
         try:
-            response = requests.get(list_url, headers=self.headers, timeout=10)
+            response = await get_engine().get(list_url, headers=self.headers, timeout=10)
             response.encoding = 'gbk'  # 设置编码
             html_content = response.text
             logger.info(f"成功获取页面内容，长度: {len(html_content)}")
@@ -522,27 +536,30 @@ class ChinaPolicyCrawler:
             articles.sort(key=lambda x: x.get('date', ''), reverse=True)
             logger.info("已按日期排序文章")
             
-            # 获取最近days天内发布的文章，最多返回2条
-            recent_articles = []
+            # 筛选最近days天内发布的文章，最多返回2条
+            candidates = []
             for article in articles:
                 logger.info(f"检查文章: {article['title']}, 日期: {article['date']}")
                 if self.is_recent_article(article['date'], days):
-                    # 获取文章详情
-                    article_detail = self.get_article_detail(article['url'])
-                    
-                    article_info = {
-                        'title': article['title'],
-                        'url': article['url'],
-                        'date': article['date'],
-                        'content': article_detail['content'] if article_detail else "无法获取文章内容"
-                    }
-                    recent_articles.append(article_info)
-                    logger.info(f"添加最近文章: {article['title']}")
-                    
+                    candidates.append(article)
                     # 最多返回2条
-                    if len(recent_articles) >= 2:
+                    if len(candidates) >= 2:
                         break
             
+            # 并发获取文章详情，结果与列表顺序一致
+            details = await asyncio.gather(*[self.aget_article_detail(article['url']) for article in candidates])
+            
+            recent_articles = []
+            for article, article_detail in zip(candidates, details):
+                article_info = {
+                    'title': article['title'],
+                    'url': article['url'],
+                    'date': article['date'],
+                    'content': article_detail['content'] if article_detail else "无法获取文章内容"
+                }
+                recent_articles.append(article_info)
+                logger.info(f"添加最近文章: {article['title']}")
+            
             if not recent_articles:
                 logger.info(f"未找到{days}天内发布的新闻")
             else:
@@ -569,9 +586,8 @@ def chinapolicy_news():
         JSON: 包含新闻信息的列表，格式为 {data, message, status}
     """
     days = request.args.get('days', 1, type=int)
-    crawler = ChinaPolicyCrawler()
     print(f"开始爬取中国政策网内容...")
-    articles = crawler.crawl(days)
+    articles = crawl_cache.get(f'chinapolicy:{days}', lambda: ChinaPolicyCrawler().crawl(days))
     
     result = {
         "data": articles,
@@ -1,5 +1,8 @@
-import requests
-from bs4 import BeautifulSoup
+from . import http_client
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
+import asyncio
 import time
 import datetime
 import re
@@ -39,7 +42,7 @@ class CnfinCrawler:
             print("开始自动刷新中国金融信息网Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -118,18 +121,17 @@ class CnfinCrawler:
         return self.base_url + '/' + url
     
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
             # 标准化URL
             url = self.normalize_url(url)
             
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.get(url, headers=self.headers, timeout=15)
+            # 带上cookies请求
+            response = await get_engine().get(url, headers=self.headers, cookies=self.cookies or None, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -145,7 +147,7 @@ class CnfinCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找目标元素
             target_ul = soup.select_one('ul.cjmh-gdxw-cont')
@@ -195,7 +197,7 @@ class CnfinCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 首先查找页面中的日期元素
             date_patterns = [
@@ -227,7 +229,7 @@ class CnfinCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 尝试在页面中查找文章正文容器
             content_element = None
@@ -293,13 +295,19 @@ class CnfinCrawler:
             return f"解析文章内容出错: {e}"
     
     def get_article_detail(self, url):
-        """获取文章详情，包括日期和内容"""
-        html = self.get_html(url)
+        """获取文章详情，包括日期和内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详情，包括日期和内容（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
-        date = self.extract_date_from_article(html)
-        content = self.parse_article_content(html)
+        # 只解析一次，日期和正文共用同一个soup
+        soup = make_soup(html)
+        date = self.extract_date_from_article(soup)
+        content = self.parse_article_content(soup)
         
         return {
             'date': date,
@@ -307,17 +315,21 @@ class CnfinCrawler:
         }
     
     def crawl(self):
-        """爬取中国金融信息网的新闻"""
+        """爬取中国金融信息网的新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """爬取中国金融信息网的新闻（异步）"""
         try:
             # 获取网站首页HTML
-            homepage_html = self.get_html(self.list_url)
+            homepage_html = await self.aget_html(self.list_url)
             
             # 如果获取失败，尝试刷新Cookie
             if not homepage_html:
                 print("初次获取列表页失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取列表页...")
-                    homepage_html = self.get_html(self.list_url)
+                    homepage_html = await self.aget_html(self.list_url)
             
             if not homepage_html:
                 return {
@@ -344,7 +356,7 @@ class CnfinCrawler:
             
             # 如果pub_time为空或格式不对，尝试获取文章详情中的日期
             if not pub_time or len(pub_time) < 10:
-                article_detail_temp = self.get_article_detail(first_article['url'])
+                article_detail_temp = await self.aget_article_detail(first_article['url'])
                 if article_detail_temp and article_detail_temp.get('date'):
                     pub_time = article_detail_temp.get('date')
                     print(f"从文章详情中获取到的发布时间: {pub_time}")
@@ -378,14 +390,14 @@ class CnfinCrawler:
                 # 如果解析出错，继续获取文章详情
             
             # 获取第一篇文章的详情
-            article_detail = self.get_article_detail(first_article['url'])
+            article_detail = await self.aget_article_detail(first_article['url'])
             
             # 如果获取详情失败，尝试刷新Cookie后重试
             if not article_detail or not article_detail.get('content') or article_detail.get('content') == "无法获取文章内容":
                 print("获取文章详情失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取文章详情...")
-                    article_detail = self.get_article_detail(first_article['url'])
+                    article_detail = await self.aget_article_detail(first_article['url'])
             
             if not article_detail:
                 return {
@@ -426,6 +438,5 @@ cnfin_bp = Blueprint('cnfin', __name__)
 @cnfin_bp.route('/cnfin_news', methods=['GET'])
 def get_cnfin_news():
     """获取中国金融信息网的最新新闻"""
-    crawler = CnfinCrawler()
-    result = crawler.crawl()
+    result = crawl_cache.get('cnfin', lambda: CnfinCrawler().crawl())
     return result 
\ No newline at end of file
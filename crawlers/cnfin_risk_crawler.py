@@ -5,14 +5,16 @@
 中国金融网风险揭示新闻爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+import asyncio
 import json
 import re
 import time
 from datetime import datetime, timedelta
 from flask import Blueprint, jsonify
 import random
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 
 # 创建蓝图
 cnfin_risk_bp = Blueprint('cnfin_risk', __name__)
@@ -40,22 +42,26 @@ class CnfinRiskCrawler:
         }
     
     def get_news_list(self):
+        """获取风险揭示列表页的新闻，同步接口，见aget_news_list"""
+        return run_sync(self.aget_news_list())
+    
+    async def aget_news_list(self):
         """
         获取风险揭示列表页的新闻
         """
         try:
             # 添加随机延迟
-            time.sleep(random.uniform(0.5, 1))
+            await asyncio.sleep(random.uniform(0.5, 1))
             
             # 发送请求获取列表页
-            response = requests.get(self.list_url, headers=self.headers, timeout=15)
+            response = await get_engine().get(self.list_url, headers=self.headers, timeout=15)
             response.encoding = 'utf-8'
             
             if response.status_code != 200:
                 return []
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 获取新闻列表
             news_items = []
@@ -158,6 +164,10 @@ class CnfinRiskCrawler:
             return []
     
     def get_article_detail(self, url):
+        """获取文章详情，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
         """
         获取文章详情
         """
@@ -166,17 +176,17 @@ class CnfinRiskCrawler:
         
         try:
             # 添加随机延迟
-            time.sleep(random.uniform(0.5, 1))
+            await asyncio.sleep(random.uniform(0.5, 1))
             
             # 发送请求获取详情页
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = await get_engine().get(url, headers=self.headers, timeout=15)
             response.encoding = 'utf-8'
             
             if response.status_code != 200:
                 return None
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取文章内容
             article_info = {}
@@ -323,11 +333,15 @@ class CnfinRiskCrawler:
             return False
     
     def get_latest_news(self):
+        """获取最新的一条新闻，同步接口，见aget_latest_news"""
+        return run_sync(self.aget_latest_news())
+    
+    async def aget_latest_news(self):
         """
         获取最新的一条新闻
         """
         try:
-            news_list = self.get_news_list()
+            news_list = await self.aget_news_list()
             
             if not news_list:
                 return None
@@ -344,7 +358,7 @@ class CnfinRiskCrawler:
             
             # 获取文章详情
             if 'url' in latest_news and latest_news['url']:
-                article_detail = self.get_article_detail(latest_news['url'])
+                article_detail = await self.aget_article_detail(latest_news['url'])
                 
                 if article_detail:
                     # 整合信息
@@ -367,11 +381,15 @@ class CnfinRiskCrawler:
             return None
     
     def crawl(self):
+        """执行爬虫，获取最新的风险揭示新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
         """
         执行爬虫，获取最新的风险揭示新闻
         """
         try:
-            latest_news = self.get_latest_news()
+            latest_news = await self.aget_latest_news()
             
             if not latest_news:
                 # 如果没有找到当天发布的新闻，返回空数据
@@ -397,8 +415,7 @@ class CnfinRiskCrawler:
 def get_cnfin_risk_news():
     """获取中国金融网风险揭示新闻"""
     try:
-        crawler = CnfinRiskCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('cnfin_risk', lambda: CnfinRiskCrawler().crawl())
         return jsonify(result)
     except Exception as e:
         return jsonify({
@@ -5,8 +5,11 @@
 中证网公司要闻爬虫
 """
 
-import requests
-from bs4 import BeautifulSoup
+from . import http_client
+from .async_engine import fetch_in_order, get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
+import asyncio
 import json
 import re
 import time
@@ -48,7 +51,7 @@ class CSCompanyCrawler:
             print("开始自动刷新中证网Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -107,16 +110,16 @@ class CSCompanyCrawler:
         # 使用更安全的方式处理反斜杠，保留必要的转义字符
         return text.replace('\\\\', '\\').replace('\\"', '"').replace('\\n', '\n')
 
-    def get_html(self, url):
-        """获取网页HTML内容"""
+    def get_html(self, url, polite=False):
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url, polite))
+    
+    async def aget_html(self, url, polite=False):
+        """获取网页HTML内容（异步），polite为True时按主机令牌桶限速"""
         try:
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.get(url, headers=self.headers, timeout=15)
+            # 带上cookies请求
+            response = await get_engine().get(url, headers=self.headers, cookies=self.cookies or None, timeout=15,
+                                              polite=polite)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -132,7 +135,7 @@ class CSCompanyCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         try:
             # 针对中证网特定的文章内容区域选择器
@@ -177,12 +180,16 @@ class CSCompanyCrawler:
             return f"解析文章内容出错: {str(e)}"
 
     def get_article_detail(self, url, title=None, article_date=None):
-        """获取文章详情"""
-        html = self.get_html(url)
+        """获取文章详情，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url, title, article_date))
+    
+    async def aget_article_detail(self, url, title=None, article_date=None):
+        """获取文章详情（异步）"""
+        html = await self.aget_html(url, polite=True)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         # 如果没有传入标题
         if not title:
@@ -205,7 +212,7 @@ class CSCompanyCrawler:
             else:
                 article_date = datetime.now().strftime("%Y-%m-%d")
         
-        content = self.extract_article_content(html)
+        content = self.extract_article_content(soup)
         
         return {
             'title': title,
@@ -215,12 +222,16 @@ class CSCompanyCrawler:
         }
 
     def parse_latest_articles(self, count=2):
-        """解析中证网公司要闻页面的最新n篇文章"""
-        html = self.get_html(self.url)
+        """解析中证网公司要闻页面的最新n篇文章，同步接口，见aparse_latest_articles"""
+        return run_sync(self.aparse_latest_articles(count))
+    
+    async def aparse_latest_articles(self, count=2):
+        """解析中证网公司要闻页面的最新n篇文章（异步）"""
+        html = await self.aget_html(self.url)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         try:
             # 找到所有具有日期信息的新闻条目
@@ -312,7 +323,11 @@ class CSCompanyCrawler:
             return False
 
     def crawl(self):
-        """执行爬虫，获取中证网公司要闻页面的过去24小时内最新两篇文章，内容长度必须大于200字"""
+        """执行爬虫，获取中证网公司要闻页面的过去24小时内最新两篇文章，内容长度必须大于200字，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """执行爬虫，获取中证网公司要闻页面的过去24小时内最新两篇文章，内容长度必须大于200字（异步）"""
         try:
             # 计算时间范围用于显示
             now = datetime.now()
@@ -320,14 +335,14 @@ class CSCompanyCrawler:
             time_range = f"{time_24h_ago.strftime('%Y-%m-%d %H:%M')} 至 {now.strftime('%Y-%m-%d %H:%M')}"
             
             # 尝试从列表页获取最新文章信息
-            articles_info = self.parse_latest_articles(count=10)  # 获取10篇，以便有更多文章可筛选
+            articles_info = await self.aparse_latest_articles(count=10)  # 获取10篇，以便有更多文章可筛选
             
             # 如果获取失败，尝试刷新Cookie并重试
             if not articles_info:
                 print("初次获取文章列表失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取文章列表...")
-                    articles_info = self.parse_latest_articles(count=10)
+                    articles_info = await self.aparse_latest_articles(count=10)
             
             # 如果列表页解析失败，使用硬编码备选方案
             if not articles_info:
@@ -348,13 +363,9 @@ class CSCompanyCrawler:
                     "data": None
                 }
             
-            # 收集符合内容长度要求的文章
-            valid_articles = []
-            
-            # 获取每篇文章的详情，并筛选内容长度大于200字的文章
-            for article_info in recent_articles:
+            async def fetch_detail(article_info):
                 # 获取文章详情
-                article_detail = self.get_article_detail(
+                article_detail = await self.aget_article_detail(
                     article_info['url'], 
                     article_info['title'],
                     article_info['date']
@@ -363,22 +374,31 @@ class CSCompanyCrawler:
                 # 如果获取详情失败，尝试刷新Cookie后重试
                 if not article_detail or not article_detail.get('content') or article_detail.get('content') == "无法获取文章内容":
                     print("获取文章详情失败，尝试刷新Cookie...")
-                    if self.refresh_cookies():
+                    if await asyncio.to_thread(self.refresh_cookies):
                         print("使用刷新后的Cookie重新获取文章详情...")
-                        article_detail = self.get_article_detail(
+                        article_detail = await self.aget_article_detail(
                             article_info['url'], 
                             article_info['title'],
                             article_info['date']
                         )
-                
+                return article_detail
+            
+            def is_valid(article_info, article_detail):
                 if not article_detail or not article_detail.get('content'):
-                    continue
-                
+                    return False
                 # 检查内容长度是否大于200字
-                content_length = len(article_detail['content'])
-                if content_length < 200:
+                if len(article_detail['content']) < 200:
                     print(f"文章 '{article_detail['title']}' 内容长度不足200字，跳过")
-                    continue
+                    return False
+                return True
+            
+            # 并发获取文章详情，最多收集2篇内容长度大于200字的文章
+            fetched = await fetch_in_order(recent_articles, fetch_detail, accept=is_valid, limit=2)
+            
+            # 收集符合内容长度要求的文章
+            valid_articles = []
+            for article_info, article_detail in fetched:
+                content_length = len(article_detail['content'])
                 
                 # 移除所有内容中的反斜杠
                 title = self.remove_backslashes(article_detail['title'])
@@ -396,10 +416,6 @@ class CSCompanyCrawler:
                 }
                 
                 valid_articles.append(result)
-                
-                # 最多收集2篇符合条件的文章
-                if len(valid_articles) >= 2:
-                    break
             
             # 如果没有符合条件的文章，返回空
             if not valid_articles:
@@ -432,8 +448,7 @@ class CSCompanyCrawler:
 def get_cs_company_article():
     """获取中证网公司要闻页面的最新文章"""
     try:
-        crawler = CSCompanyCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('cs_company', lambda: CSCompanyCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -1,5 +1,8 @@
-import requests
-from bs4 import BeautifulSoup
+from . import http_client
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
+import asyncio
 import json
 import re
 import time
@@ -37,7 +40,7 @@ class EastMoneyCrawler:
             print("开始自动刷新东方财富网Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -96,7 +99,11 @@ class EastMoneyCrawler:
         return text.replace('\\', '')
     
     def get_api_data(self, page_index=1, page_size=20):
-        """获取API数据"""
+        """获取API数据，同步接口，见aget_api_data"""
+        return run_sync(self.aget_api_data(page_index, page_size))
+    
+    async def aget_api_data(self, page_index=1, page_size=20):
+        """获取API数据（异步）"""
         try:
             # 请求参数
             params = {
@@ -114,13 +121,8 @@ class EastMoneyCrawler:
                 '_': str(int(time.time() * 1000))
             }
             
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.get(self.api_url, headers=self.headers, params=params)
+            # 带上cookies请求
+            response = await get_engine().get(self.api_url, headers=self.headers, params=params, cookies=self.cookies or None)
             
             if response.status_code == 200:
                 # API返回的是JSONP格式，需要提取JSON部分
@@ -142,8 +144,12 @@ class EastMoneyCrawler:
             return None
     
     def parse_article_list(self):
-        """解析文章列表，获取前5条文章标题、链接和发布时间"""
-        api_data = self.get_api_data()
+        """解析文章列表，获取前5条文章标题、链接和发布时间，同步接口，见aparse_article_list"""
+        return run_sync(self.aparse_article_list())
+    
+    async def aparse_article_list(self):
+        """解析文章列表，获取前5条文章标题、链接和发布时间（异步）"""
+        api_data = await self.aget_api_data()
         if not api_data or api_data.get('code') != '1':
             return None
         
@@ -184,15 +190,14 @@ class EastMoneyCrawler:
         return article_links
     
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.get(url, headers=self.headers, timeout=15)
+            # 带上cookies请求
+            response = await get_engine().get(url, headers=self.headers, cookies=self.cookies or None, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -207,7 +212,7 @@ class EastMoneyCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找文章内容区域 - 首先查找 mainleft 下的 txtinfos
             mainleft = soup.find('div', class_='mainleft')
@@ -305,8 +310,12 @@ class EastMoneyCrawler:
             return f"解析文章内容出错: {e}"
     
     def get_article_detail(self, url):
-        """获取文章详情，包括日期和内容"""
-        html = self.get_html(url)
+        """获取文章详情，包括日期和内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详情，包括日期和内容（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
@@ -326,17 +335,21 @@ class EastMoneyCrawler:
         }
     
     def crawl(self):
-        """获取东方财富网评论精华文章"""
+        """获取东方财富网评论精华文章，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """获取东方财富网评论精华文章（异步）"""
         try:
             # 解析文章列表
-            article_links = self.parse_article_list()
+            article_links = await self.aparse_article_list()
             
             # 如果获取失败，尝试刷新Cookie后重试
             if not article_links:
                 print("初次获取文章列表失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取文章列表...")
-                    article_links = self.parse_article_list()
+                    article_links = await self.aparse_article_list()
             
             if not article_links:
                 return {
@@ -404,14 +417,14 @@ class EastMoneyCrawler:
                 # 发生错误时继续获取详情
             
             # 获取文章详情
-            article_detail = self.get_article_detail(first_article['url'])
+            article_detail = await self.aget_article_detail(first_article['url'])
             
             # 如果获取详情失败，尝试刷新Cookie后重试
             if not article_detail or not article_detail.get('content') or article_detail.get('content') == "无法获取文章内容":
                 print("获取文章详情失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取文章详情...")
-                    article_detail = self.get_article_detail(first_article['url'])
+                    article_detail = await self.aget_article_detail(first_article['url'])
             
             if not article_detail:
                 return {
@@ -444,6 +457,5 @@ class EastMoneyCrawler:
 @east_money_bp.route('/east_money_news', methods=['GET'])
 def get_east_money_news():
     """获取东方财富网的最新新闻"""
-    crawler = EastMoneyCrawler()
-    result = crawler.crawl()
+    result = crawl_cache.get('east_money', lambda: EastMoneyCrawler().crawl())
     return result 
\ No newline at end of file
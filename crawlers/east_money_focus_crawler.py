@@ -1,5 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
 import json
 import os
 import datetime
@@ -30,9 +31,13 @@ class EastMoneyFocusCrawler:
         return text.replace('\\', '')
     
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = await get_engine().get(url, headers=self.headers, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -42,11 +47,15 @@ class EastMoneyFocusCrawler:
             return None
     
     def parse_focus_article(self, html):
-        """解析焦点页面，获取newsGuid下的第一个a标签内容"""
+        """解析焦点页面，获取newsGuid下的第一个a标签内容，同步接口，见aparse_focus_article"""
+        return run_sync(self.aparse_focus_article(html))
+    
+    async def aparse_focus_article(self, html):
+        """解析焦点页面，获取newsGuid下的第一个a标签内容（异步）"""
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找class为newsGuid的div
             news_guid_div = soup.find('div', class_='newsGuid')
@@ -98,9 +107,9 @@ class EastMoneyFocusCrawler:
             # 如果以上方法都无法获取标题，尝试从URL中提取标题或使用页面标题
             if not title:
                 # 从文章页面获取标题
-                article_html = self.get_html(first_a.get('href', ''))
+                article_html = await self.aget_html(first_a.get('href', ''))
                 if article_html:
-                    article_soup = BeautifulSoup(article_html, 'html.parser')
+                    article_soup = make_soup(article_html)
                     article_title = article_soup.find('title')
                     if article_title:
                         title = article_title.text.strip()
@@ -129,7 +138,7 @@ class EastMoneyFocusCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找可能包含日期的元素
             date_div = soup.find('div', class_='time')
@@ -168,7 +177,7 @@ class EastMoneyFocusCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 东方财富网特定结构：
             # 1. 通常文章内容在id为ContentBody的div中
@@ -256,13 +265,19 @@ class EastMoneyFocusCrawler:
             return f"解析文章内容出错: {e}"
     
     def get_article_detail(self, url):
-        """获取文章详情，包括日期和内容"""
-        html = self.get_html(url)
+        """获取文章详情，包括日期和内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详情，包括日期和内容（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
-        date = self.extract_date_from_article(html)
-        content = self.parse_article_content(html)
+        # 只解析一次，日期和正文共用同一个soup
+        soup = make_soup(html)
+        date = self.extract_date_from_article(soup)
+        content = self.parse_article_content(soup)
         
         return {
             'date': date,
@@ -270,16 +285,20 @@ class EastMoneyFocusCrawler:
         }
     
     def crawl(self):
-        """爬取东方财富网焦点文章"""
-        html = self.get_html(self.list_url)
+        """爬取东方财富网焦点文章，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """爬取东方财富网焦点文章（异步）"""
+        html = await self.aget_html(self.list_url)
         if not html:
             return {"status": "error", "message": "获取焦点页面失败", "data": []}
         
-        article = self.parse_focus_article(html)
+        article = await self.aparse_focus_article(html)
         if not article:
             return {"status": "error", "message": "解析焦点文章失败", "data": []}
         
-        detail = self.get_article_detail(article['url'])
+        detail = await self.aget_article_detail(article['url'])
         if not detail:
             return {"status": "error", "message": "获取文章详情失败", "data": []}
         
@@ -313,6 +332,5 @@ east_money_focus_bp = Blueprint('east_money_focus', __name__)
 @east_money_focus_bp.route('/east_money_focus', methods=['GET'])
 def get_east_money_focus():
     """获取东方财富网焦点文章"""
-    crawler = EastMoneyFocusCrawler()
-    result = crawler.crawl()
+    result = crawl_cache.get('east_money_focus', lambda: EastMoneyFocusCrawler().crawl())
     return result 
\ No newline at end of file
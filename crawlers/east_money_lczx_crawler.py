@@ -1,5 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
 import json
 import re
 import time
@@ -31,7 +32,11 @@ class EastMoneyLczxCrawler:
         return text.replace('\\', '')
     
     def get_api_data(self, page_index=1, page_size=20):
-        """获取API数据"""
+        """获取API数据，同步接口，见aget_api_data"""
+        return run_sync(self.aget_api_data(page_index, page_size))
+    
+    async def aget_api_data(self, page_index=1, page_size=20):
+        """获取API数据（异步）"""
         try:
             # 请求参数
             params = {
@@ -49,7 +54,7 @@ class EastMoneyLczxCrawler:
                 '_': str(int(time.time() * 1000))
             }
             
-            response = requests.get(self.api_url, headers=self.headers, params=params)
+            response = await get_engine().get(self.api_url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 # API返回的是JSONP格式，需要提取JSON部分
@@ -70,8 +75,12 @@ class EastMoneyLczxCrawler:
             return None
     
     def parse_article_list(self):
-        """解析文章列表，获取最新的文章标题、链接和发布时间"""
-        api_data = self.get_api_data()
+        """解析文章列表，获取最新的文章标题、链接和发布时间，同步接口，见aparse_article_list"""
+        return run_sync(self.aparse_article_list())
+    
+    async def aparse_article_list(self):
+        """解析文章列表，获取最新的文章标题、链接和发布时间（异步）"""
+        api_data = await self.aget_api_data()
         if not api_data or api_data.get('code') != '1':
             return None
         
@@ -107,9 +116,13 @@ class EastMoneyLczxCrawler:
         return article_links
     
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = await get_engine().get(url, headers=self.headers, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -123,7 +136,7 @@ class EastMoneyLczxCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找文章内容区域 - 首先查找常见内容区
             content_element = None
@@ -205,8 +218,12 @@ class EastMoneyLczxCrawler:
             return f"解析文章内容出错: {e}"
     
     def get_article_detail(self, url, pub_time=None):
-        """获取文章详情，包括日期和内容"""
-        html = self.get_html(url)
+        """获取文章详情，包括日期和内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url, pub_time))
+    
+    async def aget_article_detail(self, url, pub_time=None):
+        """获取文章详情，包括日期和内容（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
@@ -224,7 +241,7 @@ class EastMoneyLczxCrawler:
                 date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]} 00:00:00"
             else:
                 # 如果URL中没有日期，尝试从HTML中提取
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = make_soup(html)
                 date_element = soup.select_one('.time, .date, .Article_time, .article-time, .article-meta')
                 if date_element:
                     date_text = date_element.get_text(strip=True)
@@ -274,8 +291,12 @@ class EastMoneyLczxCrawler:
             return False
     
     def crawl(self):
-        """执行爬虫，获取理财资讯最新文章"""
-        article_links = self.parse_article_list()
+        """执行爬虫，获取理财资讯最新文章，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """执行爬虫，获取理财资讯最新文章（异步）"""
+        article_links = await self.aparse_article_list()
         if not article_links:
             return {"status": "error", "message": "获取或解析列表页失败", "data": []}
         
@@ -307,7 +328,7 @@ class EastMoneyLczxCrawler:
                 pass
             
             # 获取文章详情
-            detail = self.get_article_detail(first_article['url'], first_article.get('pub_time'))
+            detail = await self.aget_article_detail(first_article['url'], first_article.get('pub_time'))
             if detail:
                 # 移除所有内容中的反斜杠
                 title = self.remove_backslashes(first_article['title'])
@@ -358,6 +379,5 @@ east_money_lczx_bp = Blueprint('east_money_lczx', __name__)
 @east_money_lczx_bp.route('/east_money_lczx_news', methods=['GET'])
 def get_east_money_lczx_news():
     """获取东方财富网理财资讯的最新文章"""
-    crawler = EastMoneyLczxCrawler()
-    result = crawler.crawl()
+    result = crawl_cache.get('east_money_lczx', lambda: EastMoneyLczxCrawler().crawl())
     return result 
\ No newline at end of file
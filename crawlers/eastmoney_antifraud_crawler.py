@@ -5,20 +5,21 @@
 CCTV反诈新闻爬虫
 """
 
+import asyncio
 import requests
+from . import http_client
+from .result_cache import crawl_cache
 import json
 import time
 from datetime import datetime, timedelta
 from flask import Blueprint, jsonify
 import re
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 import urllib.parse
 import random
 import os
 import pickle
 import logging
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 from fake_useragent import UserAgent
 import threading
 
@@ -115,37 +116,18 @@ class CCTVAntifraudCrawler:
             'pageSize': '20'  # 搜索结果数量
         }
         
-        # 新闻缓存
-        self.news_cache = {}
-        self.cache_expiry = 900  # 缓存有效期15分钟
-        self.last_cache_time = 0
+        # 新闻缓存有效期15分钟，缓存由所有实例共享
+        self.cache_expiry = 900
         
         # 初始化logger
         self.logger = logger
     
     def get_session(self):
         """
-        获取或创建一个带有重试机制的requests.Session对象
+        获取或创建一个使用公共连接池的会话对象，重试策略由http_client统一配置
         """
         if not hasattr(thread_local, "session"):
-            session = requests.Session()
-            
-            # 配置重试策略
-            retry_strategy = Retry(
-                total=5,  # 总共重试5次
-                backoff_factor=0.5,  # 重试间隔 = {backoff factor} * (2 ** ({number of previous retries}))
-                status_forcelist=[429, 500, 502, 503, 504],  # 遇到这些状态码时重试
-                allowed_methods=["GET", "POST", "HEAD"]  # 允许重试的HTTP方法
-            )
-            
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
-            
-            # 设置cookies
-            if self.cookies:
-                session.cookies.update(self.cookies)
-                
+            session = http_client.new_session(cookies=self.cookies)
             thread_local.session = session
             
         return thread_local.session
@@ -254,27 +236,16 @@ class CCTVAntifraudCrawler:
         self.current_backup_url_index += 1
         return backup_url
     
-    def check_cache_valid(self):
+    def search_antifraud_news(self):
         """
-        检查缓存是否有效
+        搜索反诈相关新闻，结果在共享缓存中保留cache_expiry秒
         """
-        if not self.news_cache:
-            return False
-            
-        current_time = time.time()
-        if (current_time - self.last_cache_time) > self.cache_expiry:
-            return False
-            
-        return True
-        
-    def search_antifraud_news(self):
+        return crawl_cache.get('eastmoney_antifraud:search', self._search_antifraud_news, ttl=self.cache_expiry)
+
+    def _search_antifraud_news(self):
         """
         搜索反诈相关新闻 - 优化版，减少日志输出
         """
-        # 先检查缓存
-        if self.check_cache_valid():
-            return self.news_cache.get("news_items", [])
-            
         # 初始化重试计数器
         retry_count = 0
         base_sleep_time = 1  # 基础等待时间(秒)
@@ -322,7 +293,7 @@ class CCTVAntifraudCrawler:
                         continue
                     
                     # 解析HTML内容
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     
                     # 找到所有的新闻条目（li class='image'）
                     li_elements = soup.find_all('li', class_='image')
@@ -471,10 +442,6 @@ class CCTVAntifraudCrawler:
                     # 按发布时间排序（最新的在前）
                     news_items.sort(key=lambda x: x['publish_time'], reverse=True)
                     
-                    # 更新缓存
-                    self.news_cache["news_items"] = news_items
-                    self.last_cache_time = time.time()
-                    
                     return news_items
                 else:
                     # 不再输出警告日志
@@ -530,7 +497,7 @@ class CCTVAntifraudCrawler:
                 url = f"https://{url}" if not url.startswith('//') else f"https:{url}"
             
             # 直接使用session提高连接复用效率
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 减少重试次数，加快失败返回
             max_retries = 2
@@ -557,7 +524,7 @@ class CCTVAntifraudCrawler:
                         if response.encoding == 'ISO-8859-1':
                             response.encoding = 'utf-8'
                         
-                        soup = BeautifulSoup(response.text, 'html.parser')
+                        soup = make_soup(response.text)
                         
                         # 移除导航栏、广告和无关内容
                         for nav in soup.find_all(['nav', 'header']):
@@ -768,7 +735,7 @@ class CCTVAntifraudCrawler:
                         continue
                     
                     # 解析HTML内容
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     
                     # 查找反诈新闻条目
                     news_items = []
@@ -963,10 +930,6 @@ class CCTVAntifraudCrawler:
                         # 按时间排序，最新的在前
                         news_items.sort(key=lambda x: x['publish_time'], reverse=True)
                         
-                        # 更新缓存
-                        self.news_cache["backup_news_items"] = news_items
-                        self.last_cache_time = time.time()
-                        
                         # 移除日志输出
                         # if logger.isEnabledFor(logging.INFO):
                         #     logger.info(f"从备用URL共解析到{len(news_items)}条反诈新闻")
@@ -1091,6 +1054,14 @@ class CCTVAntifraudCrawler:
             # self.logger.error(traceback.format_exc())
             return {"status": "error", "message": f"爬取失败: {str(e)}", "data": []}
 
+    async def acrawl(self):
+        """
+        执行爬取任务（异步）
+
+        该爬虫依赖线程内会话保存的cookie和多级备用来源，仍使用同步请求，放到线程中执行，不阻塞事件循环
+        """
+        return await asyncio.to_thread(self.crawl)
+
 @eastmoney_antifraud_bp.route('/eastmoney_antifraud_article', methods=['GET'])
 def get_eastmoney_antifraud_article():
     """
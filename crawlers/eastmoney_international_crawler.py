@@ -5,11 +5,12 @@
 东方财富网国际经济栏目爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
 import json
 import re
 import time
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from flask import Blueprint
 from datetime import datetime
 
@@ -55,7 +56,11 @@ class EastmoneyInternationalCrawler:
         }
     
     def get_latest_news(self):
-        """获取最新文章列表"""
+        """获取最新文章列表，同步接口，见aget_latest_news"""
+        return run_sync(self.aget_latest_news())
+    
+    async def aget_latest_news(self):
+        """获取最新文章列表（异步）"""
         try:
             # 生成当前时间戳
             timestamp = int(time.time() * 1000)
@@ -77,14 +82,11 @@ class EastmoneyInternationalCrawler:
             }
             
             # 发送请求
-            session = requests.Session()
-            for key, value in self.cookies.items():
-                session.cookies.set(key, value)
-            
-            response = session.get(
+            response = await get_engine().get(
                 self.api_url,
                 headers=self.headers,
                 params=params,
+                cookies=self.cookies,
                 timeout=10
             )
             
@@ -143,16 +145,16 @@ class EastmoneyInternationalCrawler:
             return None
     
     def get_article_content(self, url):
-        """获取文章详细内容"""
+        """获取文章详细内容，同步接口，见aget_article_content"""
+        return run_sync(self.aget_article_content(url))
+    
+    async def aget_article_content(self, url):
+        """获取文章详细内容（异步）"""
         try:
             if not url:
                 return None
                 
             # 发送请求
-            session = requests.Session()
-            for key, value in self.cookies.items():
-                session.cookies.set(key, value)
-            
             headers = {
                 'User-Agent': self.headers['User-Agent'],
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -160,13 +162,13 @@ class EastmoneyInternationalCrawler:
                 'Referer': self.base_url
             }
             
-            response = session.get(url, headers=headers, timeout=10)
+            response = await get_engine().get(url, headers=headers, cookies=self.cookies, timeout=10)
             
             if response.status_code != 200:
                 return None
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取标题
             title = ""
@@ -248,10 +250,14 @@ class EastmoneyInternationalCrawler:
         return text.replace('\\', '')
     
     def crawl(self):
-        """抓取文章主函数"""
+        """抓取文章主函数，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """抓取文章主函数（异步）"""
         try:
             # 获取当天最新文章
-            latest_news = self.get_latest_news()
+            latest_news = await self.aget_latest_news()
             if not latest_news:
                 return {
                     "status": "success",
@@ -270,7 +276,7 @@ class EastmoneyInternationalCrawler:
                     "data": {}
                 }
             
-            article_detail = self.get_article_content(article_url)
+            article_detail = await self.aget_article_content(article_url)
             if not article_detail:
                 # 再次验证日期是否是当天
                 article_date = latest_news.get('date', '')
@@ -324,8 +330,7 @@ class EastmoneyInternationalCrawler:
 def get_eastmoney_international():
     """获取东方财富网国际经济最新文章接口"""
     try:
-        crawler = EastmoneyInternationalCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('eastmoney_international', lambda: EastmoneyInternationalCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -1,5 +1,6 @@
-import requests
-from bs4 import BeautifulSoup
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
 import time
 import datetime
 import re
@@ -51,7 +52,11 @@ class FinancialNewsCrawler:
         return text.replace('\\', '')
     
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
             # 添加随机的查询参数，避免缓存
             random_param = f"nocache={int(time.time() * 1000)}"
@@ -60,13 +65,10 @@ class FinancialNewsCrawler:
             else:
                 full_url = f"{url}?{random_param}"
                 
-            response = requests.get(
+            response = await get_engine().get(
                 full_url, 
                 headers=self.headers, 
-                timeout=15,
-                # 禁用会话缓存
-                verify=True,
-                allow_redirects=True
+                timeout=15
             )
             response.encoding = 'utf-8'
             if response.status_code == 200:
@@ -81,7 +83,7 @@ class FinancialNewsCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找指定的列表元素
             list_elem = soup.select_one(self.list_selector)
@@ -226,7 +228,7 @@ class FinancialNewsCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 1. 首先检查常见的日期容器
             for selector in self.date_selectors:
@@ -327,7 +329,7 @@ class FinancialNewsCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找文章内容区域
             content_element = None
@@ -413,13 +415,19 @@ class FinancialNewsCrawler:
             return f"解析文章内容出错: {e}"
     
     def get_article_detail(self, url):
-        """获取文章详情，包括标题、日期和内容"""
-        html = self.get_html(url)
+        """获取文章详情，包括标题、日期和内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详情，包括标题、日期和内容（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
-        date = self.extract_date_from_article(html)
-        content = self.parse_article_content(html)
+        # 只解析一次，日期和正文共用同一个soup
+        soup = make_soup(html)
+        date = self.extract_date_from_article(soup)
+        content = self.parse_article_content(soup)
         
         return {
             'date': date,
@@ -451,8 +459,12 @@ class FinancialNewsCrawler:
             return False
     
     def crawl(self):
-        """执行爬虫，获取最新的一条当天发布的新闻"""
-        html = self.get_html(self.list_url)
+        """执行爬虫，获取最新的一条当天发布的新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """执行爬虫，获取最新的一条当天发布的新闻（异步）"""
+        html = await self.aget_html(self.list_url)
         if not html:
             return {"status": "error", "message": "获取列表页失败", "data": []}
         
@@ -463,7 +475,7 @@ class FinancialNewsCrawler:
         results = []
         # 检查所有文章，直到找到一篇今天发布的
         for article in article_links:
-            detail = self.get_article_detail(article['url'])
+            detail = await self.aget_article_detail(article['url'])
             if detail:
                 # 移除所有内容中的反斜杠
                 title = self.remove_backslashes(article['title'])
@@ -502,8 +514,7 @@ financial_news_bp = Blueprint('financial_news', __name__)
 @financial_news_bp.route('/financial_news', methods=['GET'])
 def get_financial_news():
     """获取中国金融新闻网的最新新闻"""
-    crawler = FinancialNewsCrawler()
-    result = crawler.crawl()
+    result = crawl_cache.get('financial_news', lambda: FinancialNewsCrawler().crawl())
     return result
 
 # 测试代码
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬虫公共HTML解析
+
+统一使用lxml作为BeautifulSoup的解析后端，比html.parser快数倍；lxml不可用时回退到html.parser。
+同一页面只解析一次，解析得到的soup可以直接传给各个提取方法共享。
+"""
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.element import Tag
+
+PREFERRED_PARSER = 'lxml'
+FALLBACK_PARSER = 'html.parser'
+
+_parser = None
+
+
+def get_parser():
+    """获取可用的解析后端名称"""
+    global _parser
+    if _parser is None:
+        try:
+            BeautifulSoup('', PREFERRED_PARSER)
+            _parser = PREFERRED_PARSER
+        except FeatureNotFound:
+            _parser = FALLBACK_PARSER
+    return _parser
+
+
+def make_soup(markup):
+    """
+    解析HTML，返回BeautifulSoup对象
+
+    Args:
+        markup: HTML字符串，或已经解析好的BeautifulSoup/Tag对象（原样返回，不会重复解析）
+    """
+    if isinstance(markup, Tag):
+        return markup
+    return BeautifulSoup(markup, get_parser())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬虫公共HTTP客户端
+
+所有爬虫共享同一组按主机划分的keep-alive连接池，避免每次请求都重新进行DNS解析、TCP握手和TLS握手。
+连接池大小、超时时间和重试策略均可通过环境变量配置。
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 缓存的主机连接池数量（每个主机一个连接池）
+HTTP_POOL_CONNECTIONS = int(os.getenv('CRAWLER_HTTP_POOL_CONNECTIONS', 32))
+# 每个主机连接池中保持的最大连接数
+HTTP_POOL_MAXSIZE = int(os.getenv('CRAWLER_HTTP_POOL_MAXSIZE', 16))
+# 未显式指定timeout时使用的默认超时时间(秒)
+HTTP_TIMEOUT = float(os.getenv('CRAWLER_HTTP_TIMEOUT', 15))
+# 连接错误及5xx/429响应的重试次数
+HTTP_RETRIES = int(os.getenv('CRAWLER_HTTP_RETRIES', 2))
+# 重试间隔 = backoff_factor * (2 ** (重试次数 - 1))
+HTTP_BACKOFF_FACTOR = float(os.getenv('CRAWLER_HTTP_BACKOFF_FACTOR', 0.3))
+
+RETRY_STATUS_FORCELIST = [429, 500, 502, 503, 504]
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def build_retry():
+    """构造公共重试策略"""
+    return Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=["GET", "HEAD"],
+        # 重试耗尽后返回最后一次响应，由调用方自行判断状态码
+        raise_on_status=False,
+    )
+
+
+def get_adapter():
+    """获取进程内共享的HTTPAdapter，连接池保存在其中"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=build_retry(),
+                )
+    return _adapter
+
+
+def set_adapter(adapter):
+    """
+    替换共享的HTTPAdapter，之后创建的会话都会使用新的adapter，用于离线录制/回放
+
+    Returns:
+        原来的adapter，可用于恢复
+    """
+    global _adapter
+    with _adapter_lock:
+        previous, _adapter = _adapter, adapter
+    return previous
+
+
+class PooledSession(requests.Session):
+    """
+    挂载共享连接池的会话
+
+    每个会话拥有独立的cookie，但底层连接在所有会话之间复用。
+    close()只清理cookie，不会关闭共享连接池。
+    """
+
+    def __init__(self):
+        super().__init__()
+        adapter = get_adapter()
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = HTTP_TIMEOUT
+        return super().request(method, url, **kwargs)
+
+    def close(self):
+        self.cookies.clear()
+
+
+def new_session(cookies=None):
+    """
+    创建一个使用共享连接池的会话，用于需要保持cookie的场景
+
+    Args:
+        cookies: 初始cookie字典
+    """
+    session = PooledSession()
+    if cookies:
+        session.cookies.update(cookies)
+    return session
+
+
+def request(method, url, **kwargs):
+    """发送一次无状态请求，cookie不会在请求之间保留"""
+    session = PooledSession()
+    return session.request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
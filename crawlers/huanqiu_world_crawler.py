@@ -5,12 +5,14 @@
 环球网国际新闻爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+import asyncio
 import json
 import re
 import time
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from flask import Blueprint
 
 # 创建蓝图
@@ -62,7 +64,11 @@ class HuanqiuWorldCrawler:
             return False
     
     def get_latest_news(self):
-        """获取过去24小时内的最新两条新闻"""
+        """获取过去24小时内的最新两条新闻，同步接口，见aget_latest_news"""
+        return run_sync(self.aget_latest_news())
+    
+    async def aget_latest_news(self):
+        """获取过去24小时内的最新两条新闻（异步）"""
         try:
             # 设置请求参数 - 增加数量以提高找到符合条件文章的概率
             params = {
@@ -72,7 +78,7 @@ class HuanqiuWorldCrawler:
             }
             
             # 发送请求
-            response = requests.get(
+            response = await get_engine().get(
                 self.api_url,
                 headers=self.headers,
                 params=params,
@@ -134,15 +140,19 @@ class HuanqiuWorldCrawler:
             return ""
     
     def get_article_detail(self, url):
-        """获取文章详细内容"""
+        """获取文章详细内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详细内容（异步）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = await get_engine().get(url, headers=self.headers, timeout=10, polite=True)
             
             if response.status_code != 200:
                 return None
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取文章内容
             content = ""
@@ -168,7 +178,7 @@ class HuanqiuWorldCrawler:
                 content_match = re.search(r'<textarea class="article-content">(.*?)</textarea>', response.text, re.DOTALL)
                 if content_match:
                     html_content = content_match.group(1)
-                    soup_content = BeautifulSoup(html_content, 'html.parser')
+                    soup_content = make_soup(html_content)
                     paragraphs = soup_content.find_all('p')
                     for p in paragraphs:
                         text = p.get_text(strip=True)
@@ -181,7 +191,11 @@ class HuanqiuWorldCrawler:
             return None
     
     def crawl(self):
-        """爬取文章主函数"""
+        """爬取文章主函数，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """爬取文章主函数（异步）"""
         try:
             # 计算时间范围用于显示
             now = datetime.now()
@@ -189,7 +203,7 @@ class HuanqiuWorldCrawler:
             time_range = f"{time_24h_ago.strftime('%Y-%m-%d %H:%M')} 至 {now.strftime('%Y-%m-%d %H:%M')}"
             
             # 获取过去24小时内最新文章
-            latest_articles = self.get_latest_news()
+            latest_articles = await self.aget_latest_news()
             if not latest_articles:
                 return {
                     "status": "success",
@@ -198,11 +212,12 @@ class HuanqiuWorldCrawler:
                     "time_range": time_range
                 }
             
-            # 获取文章详情
+            # 并发获取文章详情，结果与文章列表顺序一致
+            contents = await asyncio.gather(*[self.aget_article_detail(article.get('url'))
+                                              for article in latest_articles])
             results = []
-            for article in latest_articles:
+            for article, article_content in zip(latest_articles, contents):
                 article_url = article.get('url')
-                article_content = self.get_article_detail(article_url)
                 
                 # 整合信息
                 result = {
@@ -233,8 +248,7 @@ class HuanqiuWorldCrawler:
 def get_huanqiu_world_news():
     """获取环球网国际新闻过去24小时内的最新文章接口"""
     try:
-        crawler = HuanqiuWorldCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('huanqiu_world', lambda: HuanqiuWorldCrawler().crawl())
         return result
     except Exception as e:
         return {
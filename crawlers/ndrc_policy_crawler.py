@@ -5,10 +5,11 @@
 国家发改委政策解读爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
 import json
 from datetime import datetime
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from flask import Blueprint
 
 # 创建蓝图
@@ -42,10 +43,14 @@ class NDRCPolicyCrawler:
         self.cookies = {}
     
     def get_todays_news(self):
-        """获取当天的政策解读新闻"""
+        """获取当天的政策解读新闻，同步接口，见aget_todays_news"""
+        return run_sync(self.aget_todays_news())
+    
+    async def aget_todays_news(self):
+        """获取当天的政策解读新闻（异步）"""
         try:
             # 发送请求获取页面内容
-            response = requests.get(
+            response = await get_engine().get(
                 self.base_url,
                 headers=self.headers,
                 cookies=self.cookies,
@@ -60,7 +65,7 @@ class NDRCPolicyCrawler:
                 return []
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 查找符合要求的新闻列表
             news_list = soup.select('.list .u-list li')
@@ -110,9 +115,13 @@ class NDRCPolicyCrawler:
             return []
     
     def get_article_detail(self, url):
-        """获取文章详细内容"""
+        """获取文章详细内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
+        """获取文章详细内容（异步）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = await get_engine().get(url, headers=self.headers, timeout=10)
             
             # 设置正确的编码
             response.encoding = 'utf-8'
@@ -121,7 +130,7 @@ class NDRCPolicyCrawler:
                 return None
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取文章内容
             content = ""
@@ -146,10 +155,14 @@ class NDRCPolicyCrawler:
             return None
     
     def crawl(self):
-        """爬取文章主函数"""
+        """爬取文章主函数，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """爬取文章主函数（异步）"""
         try:
             # 获取当天最新文章
-            latest_articles = self.get_todays_news()
+            latest_articles = await self.aget_todays_news()
             if not latest_articles:
                 return {
                     "status": "success",
@@ -161,7 +174,7 @@ class NDRCPolicyCrawler:
             results = []
             for article in latest_articles:
                 article_url = article.get('url')
-                article_content = self.get_article_detail(article_url)
+                article_content = await self.aget_article_detail(article_url)
                 
                 # 整合信息
                 result = {
@@ -190,8 +203,7 @@ class NDRCPolicyCrawler:
 def get_ndrc_policy_news():
     """获取国家发改委政策解读最新文章接口"""
     try:
-        crawler = NDRCPolicyCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('ndrc_policy', lambda: NDRCPolicyCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -5,12 +5,13 @@
 人民网健康栏目爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
 import json
 import re
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from flask import Blueprint
 
 # 创建蓝图
@@ -41,11 +42,15 @@ class PeopleHealthCrawler:
         self.cookies = {}
     
     def get_topic_news(self):
-        """获取首页topicNews下的大标题"""
+        """获取首页topicNews下的大标题，同步接口，见aget_topic_news"""
+        return run_sync(self.aget_topic_news())
+    
+    async def aget_topic_news(self):
+        """获取首页topicNews下的大标题（异步）"""
         try:
             # 发送请求
             print(f"正在获取人民网健康首页: {self.base_url}")
-            response = requests.get(
+            response = await get_engine().get(
                 self.base_url,
                 headers=self.headers,
                 timeout=10
@@ -60,7 +65,7 @@ class PeopleHealthCrawler:
             response.encoding = 'utf-8'
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 查找topicNews区域下的大标题
             # 可能有多种选择器，根据实际HTML结构调整
@@ -120,7 +125,11 @@ class PeopleHealthCrawler:
             return None
     
     def get_article_detail(self, article_url):
-        """获取文章详细内容"""
+        """获取文章详细内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(article_url))
+    
+    async def aget_article_detail(self, article_url):
+        """获取文章详细内容（异步）"""
         if not article_url:
             return None
             
@@ -128,7 +137,7 @@ class PeopleHealthCrawler:
             print(f"正在获取文章详情: {article_url}")
             
             # 发送请求
-            response = requests.get(
+            response = await get_engine().get(
                 article_url,
                 headers=self.headers,
                 timeout=15
@@ -143,7 +152,7 @@ class PeopleHealthCrawler:
             response.encoding = 'utf-8'
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取文章详情
             article_data = {}
@@ -214,10 +223,14 @@ class PeopleHealthCrawler:
             return None
     
     def crawl(self):
-        """爬取文章主函数"""
+        """爬取文章主函数，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """爬取文章主函数（异步）"""
         try:
             # 获取topicNews大标题
-            topic_news = self.get_topic_news()
+            topic_news = await self.aget_topic_news()
             
             if not topic_news:
                 return {
@@ -228,7 +241,7 @@ class PeopleHealthCrawler:
             
             # 获取文章详情
             article_url = topic_news.get('url')
-            article_detail = self.get_article_detail(article_url)
+            article_detail = await self.aget_article_detail(article_url)
             
             # 整合信息
             result = topic_news
@@ -262,8 +275,7 @@ class PeopleHealthCrawler:
 def get_people_health_topic():
     """获取人民网健康首页大标题接口"""
     try:
-        crawler = PeopleHealthCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('people_health', lambda: PeopleHealthCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -5,12 +5,13 @@
 人民网科普版块爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
 import json
 import re
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from flask import Blueprint
 
 # 创建蓝图
@@ -41,11 +42,15 @@ class PeopleScienceCrawler:
         self.cookies = {}
     
     def get_main_headline(self):
-        """获取首页mainNews下的大标题"""
+        """获取首页mainNews下的大标题，同步接口，见aget_main_headline"""
+        return run_sync(self.aget_main_headline())
+    
+    async def aget_main_headline(self):
+        """获取首页mainNews下的大标题（异步）"""
         try:
             # 发送请求
             print(f"正在获取人民网科普版块首页: {self.base_url}")
-            response = requests.get(
+            response = await get_engine().get(
                 self.base_url,
                 headers=self.headers,
                 timeout=10
@@ -60,7 +65,7 @@ class PeopleScienceCrawler:
             response.encoding = 'utf-8'
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 查找首页mainNews下的大标题
             main_news = soup.select_one('.mainNews') or soup.select_one('#mainNews')
@@ -140,7 +145,11 @@ class PeopleScienceCrawler:
             return None
     
     def get_article_detail(self, article_url):
-        """获取文章详细内容"""
+        """获取文章详细内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(article_url))
+    
+    async def aget_article_detail(self, article_url):
+        """获取文章详细内容（异步）"""
         if not article_url:
             return None
             
@@ -148,7 +157,7 @@ class PeopleScienceCrawler:
             print(f"正在获取文章详情: {article_url}")
             
             # 发送请求
-            response = requests.get(
+            response = await get_engine().get(
                 article_url,
                 headers=self.headers,
                 timeout=15
@@ -163,7 +172,7 @@ class PeopleScienceCrawler:
             response.encoding = 'utf-8'
             
             # 解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取文章详情
             article_data = {}
@@ -266,10 +275,14 @@ class PeopleScienceCrawler:
             return None
     
     def crawl(self):
-        """爬取文章主函数"""
+        """爬取文章主函数，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """爬取文章主函数（异步）"""
         try:
             # 获取首页大标题
-            headline = self.get_main_headline()
+            headline = await self.aget_main_headline()
             
             if not headline:
                 return {
@@ -280,7 +293,7 @@ class PeopleScienceCrawler:
             
             # 获取文章详情
             article_url = headline.get('url')
-            article_detail = self.get_article_detail(article_url)
+            article_detail = await self.aget_article_detail(article_url)
             
             # 整合信息
             result = headline
@@ -314,8 +327,7 @@ class PeopleScienceCrawler:
 def get_people_science_headline():
     """获取人民网科普版块首页大标题接口"""
     try:
-        crawler = PeopleScienceCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('people_science', lambda: PeopleScienceCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+爬虫结果缓存
+
+- 按数据源设置TTL，TTL内直接返回缓存结果
+- 并发请求同一数据源时只执行一次爬取，其余请求等待并共享结果
+- 缓存过期后的一段时间内先返回旧结果，同时在后台刷新（stale-while-revalidate），时长按数据源设置
+- 按自然日更新的数据源，缓存键带上当天日期，过了零点不再返回前一天的结果
+"""
+
+import copy
+import datetime
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存有效期(秒)
+CRAWLER_CACHE_TTL = float(os.getenv('CRAWLER_CACHE_TTL', 300))
+# 默认过期后仍可返回旧结果并后台刷新的时长(秒)
+CRAWLER_CACHE_STALE_TTL = float(os.getenv('CRAWLER_CACHE_STALE_TTL', 1800))
+
+# 各数据源的缓存有效期，可通过环境变量 CRAWLER_CACHE_TTL_<数据源名称大写> 覆盖
+CRAWLER_CACHE_TTL_OVERRIDES = {
+    'stock_index': 60,
+    'eastmoney_antifraud': 900,
+    'tthuangli': 3600,
+}
+
+# 各数据源过期后可返回旧结果的时长，可通过环境变量 CRAWLER_CACHE_STALE_TTL_<数据源名称大写> 覆盖
+# 行情数据过期后不返回旧结果
+CRAWLER_CACHE_STALE_TTL_OVERRIDES = {
+    'stock_index': 0,
+    'sina_stock': 0,
+}
+
+# 按自然日更新的数据源，缓存在本地时间零点失效
+CRAWLER_CACHE_DAILY_SOURCES = {
+    'tthuangli',
+}
+
+
+def is_cacheable(result):
+    """只缓存成功的结果，失败或为空的结果下次请求重新爬取"""
+    if result is None:
+        return False
+    if isinstance(result, dict) and (result.get('status') == 'error' or 'error' in result):
+        return False
+    if isinstance(result, list) and not result:
+        return False
+    return True
+
+
+class _Entry:
+    def __init__(self, value):
+        self.value = value
+        self.loaded_at = time.monotonic()
+
+
+class _InFlight:
+    """一次正在进行的爬取，等待者通过event获取结果"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+
+    def __init__(self, default_ttl=CRAWLER_CACHE_TTL, stale_ttl=CRAWLER_CACHE_STALE_TTL, ttl_overrides=None,
+                 stale_ttl_overrides=None, daily_sources=None):
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttl_overrides = ttl_overrides or {}
+        self.stale_ttl_overrides = stale_ttl_overrides or {}
+        self.daily_sources = set(daily_sources or ())
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def source_of(key):
+        """缓存键形如"数据源名称"或"数据源名称:参数"，返回数据源名称"""
+        return key.split(':', 1)[0]
+
+    def ttl_for(self, key):
+        """按数据源名称取TTL"""
+        name = self.source_of(key)
+        env_ttl = os.getenv(f'CRAWLER_CACHE_TTL_{name.upper()}')
+        if env_ttl is not None:
+            return float(env_ttl)
+        return self.ttl_overrides.get(name, self.default_ttl)
+
+    def stale_ttl_for(self, key):
+        """按数据源名称取过期后可返回旧结果的时长"""
+        name = self.source_of(key)
+        env_ttl = os.getenv(f'CRAWLER_CACHE_STALE_TTL_{name.upper()}')
+        if env_ttl is not None:
+            return float(env_ttl)
+        return self.stale_ttl_overrides.get(name, self.stale_ttl)
+
+    def dated_key(self, key):
+        """按自然日更新的数据源，缓存键加上当天日期，前一天的结果不会再命中"""
+        if self.source_of(key) in self.daily_sources:
+            return f'{key}@{datetime.date.today().isoformat()}'
+        return key
+
+    def get(self, key, loader, ttl=None):
+        """
+        获取缓存结果，未命中时调用loader爬取
+
+        Args:
+            key: 缓存键
+            loader: 无参函数，返回爬取结果
+            ttl: 缓存有效期(秒)，默认按数据源配置，小于等于0时不缓存
+        """
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        if ttl <= 0:
+            return loader()
+        stale_ttl = self.stale_ttl_for(key)
+        key = self.dated_key(key)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                age = now - entry.loaded_at
+                if age < ttl:
+                    return copy.deepcopy(entry.value)
+                if age < ttl + stale_ttl:
+                    # 先返回旧结果，后台刷新
+                    if key not in self._inflight:
+                        flight = self._inflight[key] = _InFlight()
+                        threading.Thread(target=self._load, args=(key, loader, flight), daemon=True).start()
+                    return copy.deepcopy(entry.value)
+
+            flight = self._inflight.get(key)
+            is_owner = flight is None
+            if is_owner:
+                flight = self._inflight[key] = _InFlight()
+
+        if is_owner:
+            self._load(key, loader, flight)
+        else:
+            flight.event.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.value)
+
+    def _load(self, key, loader, flight):
+        try:
+            value = loader()
+            flight.value = value
+            if is_cacheable(value):
+                with self._lock:
+                    self._entries[key] = _Entry(value)
+                    if '@' in key:
+                        # 删除同一数据源前几天的结果
+                        prefix = key.rsplit('@', 1)[0] + '@'
+                        for old in [i for i in self._entries if i.startswith(prefix) and i != key]:
+                            del self._entries[old]
+        except Exception as e:
+            logger.error(f'爬取失败[{key}]', exc_info=True)
+            flight.error = e
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.dated_key(key), None)
+
+
+# 所有爬虫共享的结果缓存
+crawl_cache = ResultCache(ttl_overrides=CRAWLER_CACHE_TTL_OVERRIDES,
+                          stale_ttl_overrides=CRAWLER_CACHE_STALE_TTL_OVERRIDES,
+                          daily_sources=CRAWLER_CACHE_DAILY_SOURCES)
@@ -5,8 +5,9 @@
 深蓝保保险攻略爬虫
 """
 
-import requests
-from bs4 import BeautifulSoup
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
 import json
 import re
 import time
@@ -44,9 +45,13 @@ class ShenlanbaoCrawler:
         return text.replace('\\', '')
 
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = await get_engine().get(url, headers=self.headers, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -60,7 +65,7 @@ class ShenlanbaoCrawler:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         try:
             # 尝试从h1标签获取标题
@@ -94,7 +99,7 @@ class ShenlanbaoCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找文章内容区域
             # 深蓝保的常见内容选择器
@@ -174,17 +179,24 @@ class ShenlanbaoCrawler:
             return f"解析文章内容出错: {e}"
 
     def get_article_detail(self, url, title=None, article_date=None):
-        """获取文章详情"""
-        html = self.get_html(url)
+        """获取文章详情，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url, title, article_date))
+    
+    async def aget_article_detail(self, url, title=None, article_date=None):
+        """获取文章详情（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
+        # 只解析一次，标题和正文共用同一个soup
+        soup = make_soup(html)
+        
         # 如果没有传入标题或标题为空，尝试从详情页提取
         if not title:
-            extracted_title = self.extract_title_from_detail_page(html)
+            extracted_title = self.extract_title_from_detail_page(soup)
             title = extracted_title if extracted_title else "深蓝保保险攻略文章"
         
-        content = self.parse_article_content(html)
+        content = self.parse_article_content(soup)
         
         # 如果没有传入日期，使用当前日期和时间
         if not article_date:
@@ -201,8 +213,12 @@ class ShenlanbaoCrawler:
         }
 
     def parse_shenlanbao_articles(self):
-        """解析深蓝保保险攻略页面的文章列表，获取前10条文章"""
-        html = self.get_html(self.url)
+        """解析深蓝保保险攻略页面的文章列表，获取前10条文章，同步接口，见aparse_shenlanbao_articles"""
+        return run_sync(self.aparse_shenlanbao_articles())
+    
+    async def aparse_shenlanbao_articles(self):
+        """解析深蓝保保险攻略页面的文章列表，获取前10条文章（异步）"""
+        html = await self.aget_html(self.url)
         if not html:
             return None
         
@@ -210,7 +226,7 @@ class ShenlanbaoCrawler:
         with open('shenlanbao_debug.html', 'w', encoding='utf-8') as f:
             f.write(html)
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         try:
             # 尝试多种选择器查找文章列表
@@ -364,10 +380,14 @@ class ShenlanbaoCrawler:
             return None
 
     def crawl(self):
-        """执行爬虫，获取深蓝保保险攻略页面的有效文章"""
+        """执行爬虫，获取深蓝保保险攻略页面的有效文章，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """执行爬虫，获取深蓝保保险攻略页面的有效文章（异步）"""
         try:
             # 尝试从列表页获取文章信息（多篇）
-            article_info_list = self.parse_shenlanbao_articles()
+            article_info_list = await self.aparse_shenlanbao_articles()
             
             # 如果列表页解析失败，使用硬编码备选方案
             if not article_info_list or len(article_info_list) == 0:
@@ -411,7 +431,7 @@ class ShenlanbaoCrawler:
             valid_articles = []
             for article_info in today_articles:
                 # 获取文章详情
-                article_detail = self.get_article_detail(
+                article_detail = await self.aget_article_detail(
                     article_info['url'], 
                     article_info['title'],
                     article_info['date']
@@ -475,8 +495,7 @@ class ShenlanbaoCrawler:
 def get_shenlanbao_article():
     """获取深蓝保保险攻略文章"""
     try:
-        crawler = ShenlanbaoCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('shenlanbao', lambda: ShenlanbaoCrawler().crawl())
         return result
     except Exception as e:
         return {
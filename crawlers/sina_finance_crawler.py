@@ -5,8 +5,11 @@
 新浪财经基金爬虫
 """
 
-import requests
-from bs4 import BeautifulSoup
+from . import http_client
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
+import asyncio
 import json
 import re
 import time
@@ -49,7 +52,7 @@ class SinaFinanceCrawler:
             print("开始自动刷新新浪财经基金Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -108,15 +111,14 @@ class SinaFinanceCrawler:
         return text.replace('\\', '')
 
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.get(url, headers=self.headers, timeout=15)
+            # 带上cookies请求
+            response = await get_engine().get(url, headers=self.headers, cookies=self.cookies or None, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -132,7 +134,7 @@ class SinaFinanceCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找文章内容区域
             # 新浪财经网的常见内容选择器
@@ -212,8 +214,12 @@ class SinaFinanceCrawler:
             return f"解析文章内容出错: {e}"
 
     def get_article_detail(self, url, title):
-        """获取文章详情"""
-        html = self.get_html(url)
+        """获取文章详情，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url, title))
+    
+    async def aget_article_detail(self, url, title):
+        """获取文章详情（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
@@ -230,12 +236,16 @@ class SinaFinanceCrawler:
         }
 
     def parse_top_news(self):
-        """解析首页顶部新闻"""
-        html = self.get_html(self.url)
+        """解析首页顶部新闻，同步接口，见aparse_top_news"""
+        return run_sync(self.aparse_top_news())
+    
+    async def aparse_top_news(self):
+        """解析首页顶部新闻（异步）"""
+        html = await self.aget_html(self.url)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         try:
             # 查找blk2中的top_news_focus下的第一个a标签
@@ -262,17 +272,21 @@ class SinaFinanceCrawler:
             return None
 
     def crawl(self):
-        """执行爬虫，获取新浪财经基金新闻"""
+        """执行爬虫，获取新浪财经基金新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """执行爬虫，获取新浪财经基金新闻（异步）"""
         try:
             # 解析首页顶部新闻
-            top_news = self.parse_top_news()
+            top_news = await self.aparse_top_news()
             
             # 如果获取失败，尝试刷新Cookie并重新搜索
             if not top_news:
                 print("初次获取首页顶部新闻失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取首页顶部新闻...")
-                    top_news = self.parse_top_news()
+                    top_news = await self.aparse_top_news()
             
             if not top_news:
                 return {
@@ -282,14 +296,14 @@ class SinaFinanceCrawler:
                 }
             
             # 获取文章详情
-            article_detail = self.get_article_detail(top_news['url'], top_news['title'])
+            article_detail = await self.aget_article_detail(top_news['url'], top_news['title'])
             
             # 如果获取详情失败，尝试刷新Cookie后重试
             if not article_detail or not article_detail.get('content') or article_detail.get('content') == "无法获取文章内容":
                 print("获取文章详情失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取文章详情...")
-                    article_detail = self.get_article_detail(top_news['url'], top_news['title'])
+                    article_detail = await self.aget_article_detail(top_news['url'], top_news['title'])
             
             if not article_detail:
                 return {
@@ -328,8 +342,7 @@ class SinaFinanceCrawler:
 def get_sina_finance_news():
     """获取新浪财经基金新闻"""
     try:
-        crawler = SinaFinanceCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('sina_finance', lambda: SinaFinanceCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -5,8 +5,11 @@
 新浪财经股票爬虫
 """
 
-import requests
-from bs4 import BeautifulSoup
+from . import http_client
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
+import asyncio
 import json
 import re
 import time
@@ -49,7 +52,7 @@ class SinaStockCrawler:
             print("开始自动刷新新浪财经Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -108,15 +111,14 @@ class SinaStockCrawler:
         return text.replace('\\', '')
 
     def get_html(self, url):
-        """获取网页HTML内容"""
+        """获取网页HTML内容，同步接口，见aget_html"""
+        return run_sync(self.aget_html(url))
+    
+    async def aget_html(self, url):
+        """获取网页HTML内容（异步）"""
         try:
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.get(url, headers=self.headers, timeout=15)
+            # 带上cookies请求
+            response = await get_engine().get(url, headers=self.headers, cookies=self.cookies or None, timeout=15)
             response.encoding = 'utf-8'
             if response.status_code == 200:
                 return response.text
@@ -132,7 +134,7 @@ class SinaStockCrawler:
         if not html:
             return "无法获取文章内容"
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         try:
             # 查找文章内容区域
             # 新浪财经网的常见内容选择器
@@ -212,8 +214,12 @@ class SinaStockCrawler:
             return f"解析文章内容出错: {e}"
 
     def get_article_detail(self, url, title):
-        """获取文章详情"""
-        html = self.get_html(url)
+        """获取文章详情，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url, title))
+    
+    async def aget_article_detail(self, url, title):
+        """获取文章详情（异步）"""
+        html = await self.aget_html(url)
         if not html:
             return None
         
@@ -230,12 +236,16 @@ class SinaStockCrawler:
         }
 
     def parse_stock_news(self):
-        """解析股票页面顶部新闻，获取前5条新闻"""
-        html = self.get_html(self.url)
+        """解析股票页面顶部新闻，获取前5条新闻，同步接口，见aparse_stock_news"""
+        return run_sync(self.aparse_stock_news())
+    
+    async def aparse_stock_news(self):
+        """解析股票页面顶部新闻，获取前5条新闻（异步）"""
+        html = await self.aget_html(self.url)
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         try:
             # 找到 tabs-contsWrap 下的第一个 tabs-cont sto_cont0 div
@@ -286,17 +296,21 @@ class SinaStockCrawler:
             return None
 
     def crawl(self):
-        """执行爬虫，获取股票新闻"""
+        """执行爬虫，获取股票新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
+        """执行爬虫，获取股票新闻（异步）"""
         try:
             # 解析股票新闻，获取多条
-            news_list = self.parse_stock_news()
+            news_list = await self.aparse_stock_news()
             
             # 如果失败，尝试刷新Cookie并重新搜索
             if not news_list:
                 print("初次获取股票新闻失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取股票新闻...")
-                    news_list = self.parse_stock_news()
+                    news_list = await self.aparse_stock_news()
             
             if not news_list or len(news_list) == 0:
                 return {
@@ -312,7 +326,7 @@ class SinaStockCrawler:
                 print(f"尝试获取第{index+1}条新闻的详情...")
                 
                 # 获取文章详情
-                article_detail = self.get_article_detail(news_item['url'], news_item['title'])
+                article_detail = await self.aget_article_detail(news_item['url'], news_item['title'])
                 
                 # 检查内容是否有效
                 if article_detail and article_detail.get('content'):
@@ -367,8 +381,7 @@ class SinaStockCrawler:
 def get_sina_stock_news():
     """获取新浪财经股票新闻"""
     try:
-        crawler = SinaStockCrawler()
-        result = crawler.crawl()
+        result = crawl_cache.get('sina_stock', lambda: SinaStockCrawler().crawl())
         return result
     except Exception as e:
         return {
@@ -5,11 +5,14 @@
 搜狐金融快讯爬虫
 """
 
+import asyncio
 import time
 import json
-import requests
+from . import http_client
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
 import random
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from datetime import datetime
 import re
 from flask import Blueprint, request
@@ -52,7 +55,7 @@ class SohuFinanceCrawler:
             print("开始自动刷新搜狐金融Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -105,6 +108,10 @@ class SohuFinanceCrawler:
             return False
 
     def get_latest_news(self):
+        """获取最新的财经快讯，同步接口，见aget_latest_news"""
+        return run_sync(self.aget_latest_news())
+    
+    async def aget_latest_news(self):
         """
         获取最新的财经快讯
         
@@ -113,14 +120,14 @@ class SohuFinanceCrawler:
         """
         try:
             # 爬取搜狐金融快讯
-            news_data = self.crawl_sohu_finance()
+            news_data = await self.acrawl_sohu_finance()
             
             # 如果获取失败，尝试刷新Cookie后重试
             if not news_data or 'error' in news_data:
                 print("初次获取财经快讯失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新获取财经快讯...")
-                    news_data = self.crawl_sohu_finance()
+                    news_data = await self.acrawl_sohu_finance()
             
             return news_data
         except Exception as e:
@@ -132,6 +139,10 @@ class SohuFinanceCrawler:
             }
 
     def crawl_sohu_finance(self):
+        """爬取搜狐金融快讯，同步接口，见acrawl_sohu_finance"""
+        return run_sync(self.acrawl_sohu_finance())
+    
+    async def acrawl_sohu_finance(self):
         """
         爬取搜狐金融快讯
         
@@ -175,13 +186,8 @@ class SohuFinanceCrawler:
                 ]
             }
             
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
-            response = session.post(url, headers=self.headers, json=payload)
+            # 带上cookies请求
+            response = await get_engine().post(url, headers=self.headers, json=payload, cookies=self.cookies or None)
             response_json = response.json()
             
             # 提取列表数据
@@ -231,14 +237,14 @@ class SohuFinanceCrawler:
                     # 如果解析出错，继续获取详情
                 
                 # 获取文章详情
-                detail_content = self.get_sohu_article_detail(news_url)
+                detail_content = await self.aget_sohu_article_detail(news_url)
                 
                 # 如果获取详情失败，尝试刷新Cookie后重试
                 if not detail_content or detail_content == "无法获取文章内容" or "获取文章详情出错" in detail_content:
                     print("获取文章详情失败，尝试刷新Cookie...")
-                    if self.refresh_cookies():
+                    if await asyncio.to_thread(self.refresh_cookies):
                         print("使用刷新后的Cookie重新获取文章详情...")
-                        detail_content = self.get_sohu_article_detail(news_url)
+                        detail_content = await self.aget_sohu_article_detail(news_url)
                 
                 news_data = {
                     'Website_Name': self.website_name,
@@ -267,6 +273,10 @@ class SohuFinanceCrawler:
             }
 
     def get_sohu_article_detail(self, url):
+        """获取搜狐文章详情，同步接口，见aget_sohu_article_detail"""
+        return run_sync(self.aget_sohu_article_detail(url))
+    
+    async def aget_sohu_article_detail(self, url):
         """
         获取搜狐文章详情
         
@@ -277,12 +287,6 @@ class SohuFinanceCrawler:
             str: 文章内容
         """
         try:
-            # 创建会话并设置cookies
-            session = requests.Session()
-            if self.cookies:
-                for key, value in self.cookies.items():
-                    session.cookies.set(key, value)
-            
             # 设置请求头
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
@@ -290,11 +294,11 @@ class SohuFinanceCrawler:
                 'Accept-Language': 'zh-CN,zh;q=0.9'
             }
             
-            response = session.get(url, headers=headers, timeout=15)
+            response = await get_engine().get(url, headers=headers, cookies=self.cookies or None, timeout=15)
             response.encoding = 'utf-8'
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 查找文章内容
             article = soup.find('article', {'class': 'article', 'id': 'mp-editor'})
@@ -324,8 +328,7 @@ class SohuFinanceCrawler:
 def get_sohu_finance_news():
     """获取搜狐金融快讯"""
     try:
-        crawler = SohuFinanceCrawler()
-        news_data = crawler.get_latest_news()
+        news_data = crawl_cache.get('sohu_finance', lambda: SohuFinanceCrawler().get_latest_news())
         
         if 'error' in news_data:
             return {
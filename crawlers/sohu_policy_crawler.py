@@ -5,14 +5,17 @@
 搜狐政策搜索爬虫
 """
 
-import requests
+from . import http_client
+from .async_engine import fetch_in_order, get_engine, run_sync
+from .result_cache import crawl_cache
+import asyncio
 import json
 import time
 from datetime import datetime, timedelta
 from flask import Blueprint, jsonify
 import re
 import random
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 
 # 创建蓝图
 sohu_policy_bp = Blueprint('sohu_policy', __name__)
@@ -87,7 +90,7 @@ class SohuPolicyCrawler:
             print("开始自动刷新Cookie...")
             
             # 创建一个新会话
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 设置基本的浏览器标识
             basic_headers = {
@@ -169,19 +172,23 @@ class SohuPolicyCrawler:
             return False
 
     def search_policy_news(self):
+        """搜索政策相关新闻，同步接口，见asearch_policy_news"""
+        return run_sync(self.asearch_policy_news())
+    
+    async def asearch_policy_news(self):
         """
         搜索政策相关新闻
         """
         try:
             # 尝试使用当前Cookie进行搜索
-            result = self._do_search()
+            result = await self.a_do_search()
             
             # 如果失败，尝试刷新Cookie并重新搜索
             if not result:
                 print("初次搜索失败，尝试刷新Cookie...")
-                if self.refresh_cookies():
+                if await asyncio.to_thread(self.refresh_cookies):
                     print("使用刷新后的Cookie重新搜索...")
-                    result = self._do_search()
+                    result = await self.a_do_search()
             
             return result
         except Exception as e:
@@ -189,27 +196,25 @@ class SohuPolicyCrawler:
             return []
             
     def _do_search(self):
+        """执行搜索操作，同步接口，见a_do_search"""
+        return run_sync(self.a_do_search())
+    
+    async def a_do_search(self):
         """
         执行搜索操作
         """
         try:
-            # 创建会话
-            session = requests.Session()
-            
-            # 设置cookies
-            for key, value in self.cookies.items():
-                session.cookies.set(key, value)
-            
             print(f"API请求URL: {self.search_url}")
             print(f"API请求参数: {self.search_params}")
             print(f"API请求头: {self.headers}")
-            print(f"API请求cookies: {session.cookies.get_dict()}")
+            print(f"API请求cookies: {self.cookies}")
             
-            # 使用session发送搜索API请求
-            response = session.get(
+            # 带上cookies发送搜索API请求
+            response = await get_engine().get(
                 self.search_url, 
                 headers=self.headers, 
                 params=self.search_params,
+                cookies=self.cookies,
                 timeout=15
             )
             
@@ -300,6 +305,10 @@ class SohuPolicyCrawler:
             return False
     
     def get_article_detail(self, url):
+        """获取文章详情页内容，同步接口，见aget_article_detail"""
+        return run_sync(self.aget_article_detail(url))
+    
+    async def aget_article_detail(self, url):
         """
         获取文章详情页内容
         """
@@ -316,13 +325,10 @@ class SohuPolicyCrawler:
                 'Upgrade-Insecure-Requests': '1'
             }
             
-            # 随机延迟，避免频繁请求
-            time.sleep(random.uniform(0.5, 1.5))
-            
             print(f"获取文章详情: {url}")
             
-            # 发送请求获取详情页
-            response = requests.get(url, headers=headers, timeout=15)
+            # 发送请求获取详情页，按主机限速，避免频繁请求
+            response = await get_engine().get(url, headers=headers, timeout=15, polite=True)
             response.encoding = 'utf-8'
             
             if response.status_code != 200:
@@ -330,7 +336,7 @@ class SohuPolicyCrawler:
                 return ""
             
             # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 尝试多种方式提取文章内容
             
@@ -371,6 +377,10 @@ class SohuPolicyCrawler:
             return ""
 
     def extract_article_info(self, article_data):
+        """从文章数据中提取所需信息，同步接口，见aextract_article_info"""
+        return run_sync(self.aextract_article_info(article_data))
+    
+    async def aextract_article_info(self, article_data):
         """
         从文章数据中提取所需信息
         """
@@ -415,7 +425,7 @@ class SohuPolicyCrawler:
             
             # 7. 如果有URL，尝试获取详情页内容
             if url:
-                detail_content = self.get_article_detail(url)
+                detail_content = await self.aget_article_detail(url)
                 if detail_content:
                     content = detail_content
             
@@ -448,10 +458,14 @@ class SohuPolicyCrawler:
             return None
     
     def get_latest_policy_news(self):
+        """获取最新的两条政策新闻，仅返回24小时内的，同步接口，见aget_latest_policy_news"""
+        return run_sync(self.aget_latest_policy_news())
+    
+    async def aget_latest_policy_news(self):
         """
         获取最新的两条政策新闻，仅返回24小时内的
         """
-        news_list = self.search_policy_news()
+        news_list = await self.asearch_policy_news()
         
         if not news_list:
             return []
@@ -498,22 +512,29 @@ class SohuPolicyCrawler:
             print("最新两条新闻不全在24小时内，返回空列表")
             return []
         
-        # 提取文章详细信息
+        # 并发提取文章详细信息
+        fetched = await fetch_in_order(
+            recent_news,
+            self.aextract_article_info,
+            accept=lambda article, info: bool(info and info.get('content') and len(info['content']) > 100)
+        )
         result_news = []
-        for article in recent_news:
-            article_info = self.extract_article_info(article)
-            if article_info and article_info.get('content') and len(article_info['content']) > 100:
-                result_news.append(article_info)
-                print(f"成功获取新闻: {article_info['title']}")
+        for article, article_info in fetched:
+            result_news.append(article_info)
+            print(f"成功获取新闻: {article_info['title']}")
         
         return result_news
 
     def crawl(self):
+        """执行爬虫，获取政策相关的最新新闻，同步接口，见acrawl"""
+        return run_sync(self.acrawl())
+    
+    async def acrawl(self):
         """
         执行爬虫，获取政策相关的最新新闻
         """
         try:
-            latest_news = self.get_latest_policy_news()
+            latest_news = await self.aget_latest_policy_news()
             
             if not latest_news:
                 # 如果找不到24小时内的新闻，返回空数据
@@ -562,7 +583,7 @@ class SohuPolicyCrawler:
             print(f"正在获取URL: {url}")
             
             # 创建session保持连接
-            session = requests.Session()
+            session = http_client.new_session()
             
             # 先访问首页，获取cookies
             try:
@@ -663,7 +684,7 @@ class SohuPolicyCrawler:
                 print("正则表达式提取失败，尝试使用BeautifulSoup")
                 
                 # 使用BeautifulSoup解析HTML
-                soup = BeautifulSoup(html_content, 'html.parser')
+                soup = make_soup(html_content)
                 
                 # 查找搜索结果区域
                 results = soup.select('.res-list .res-list-item')
@@ -804,9 +825,7 @@ class SohuPolicyCrawler:
 def get_sohu_policy_news():
     """获取搜狐政策搜索结果"""
     try:
-        crawler = SohuPolicyCrawler()
-        # 使用原来的API调用方式
-        result = crawler.crawl()
+        result = crawl_cache.get('sohu_policy', lambda: SohuPolicyCrawler().crawl())
         
         # 返回数据
         return jsonify(
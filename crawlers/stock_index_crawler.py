@@ -5,10 +5,12 @@
 股票指数爬虫
 """
 
+import asyncio
 import os
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+from .html_parser import make_soup
 import json
 import re
 import time
@@ -61,6 +63,10 @@ class StockIndexCrawler:
         return indices
     
     def crawl_index_data(self, url):
+        """爬取指定URL的股票指数数据，同步接口，见acrawl_index_data"""
+        return run_sync(self.acrawl_index_data(url))
+    
+    async def acrawl_index_data(self, url):
         """
         爬取指定URL的股票指数数据
         
@@ -72,14 +78,14 @@ class StockIndexCrawler:
         """
         try:
             # 发送请求获取页面内容
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = await get_engine().get(url, headers=self.headers, timeout=10)
             
             # 检查响应状态
             if response.status_code != 200:
                 return None
                 
             # 将响应内容解析为HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # 提取股票名称
             stock_name = None
@@ -121,10 +127,10 @@ class StockIndexCrawler:
             # 如果提取到了quotecode且不是特殊商品，尝试使用东方财富网API获取实时数据
             if (quote_code or (market and stock_code)) and not is_special_commodity:
                 if quote_code:
-                    api_data = self.get_stock_data_from_api(quote_code)
+                    api_data = await self.aget_stock_data_from_api(quote_code)
                 else:
                     full_code = f"{market}.{stock_code}"
-                    api_data = self.get_stock_data_from_api(full_code)
+                    api_data = await self.aget_stock_data_from_api(full_code)
                 
                 if api_data:
                     # 使用页面标题或URL中的名称，如果API返回的名称不明确
@@ -286,6 +292,10 @@ class StockIndexCrawler:
             return None
     
     def get_stock_data_from_api(self, quote_code):
+        """从东方财富网API获取股票数据，同步接口，见aget_stock_data_from_api"""
+        return run_sync(self.aget_stock_data_from_api(quote_code))
+    
+    async def aget_stock_data_from_api(self, quote_code):
         """
         从东方财富网API获取股票数据
         
@@ -322,7 +332,7 @@ class StockIndexCrawler:
                 "_": int(time.time() * 1000)
             }
             
-            response = requests.get(api_url, params=params, headers=self.headers)
+            response = await get_engine().get(api_url, params=params, headers=self.headers)
             if response.status_code != 200:
                 return None
             
@@ -407,6 +417,10 @@ class StockIndexCrawler:
             return None
     
     def crawl(self, index=None):
+        """爬取股票指数数据，同步接口，见acrawl"""
+        return run_sync(self.acrawl(index))
+    
+    async def acrawl(self, index=None):
         """
         爬取股票指数数据
         
@@ -439,18 +453,18 @@ class StockIndexCrawler:
                     else:
                         other_indices.append((idx, index_info))
                 
-                # 使用批量API获取其他指数数据
+                # 使用批量API获取其他指数数据，同时用专门的API获取COMEX黄金数据
+                batch_data, *gold_data = await asyncio.gather(
+                    self.abatch_get_indices(other_indices),
+                    *[self.aget_comex_gold_data() for _ in comex_gold_indices]
+                )
+                
                 all_data = []
-                if other_indices:
-                    batch_data = self.batch_get_indices(other_indices)
-                    if batch_data:
-                        all_data.extend(batch_data)
+                if batch_data:
+                    all_data.extend(batch_data)
                 
                 # 单独处理COMEX黄金
-                for i, (idx, index_info) in enumerate(comex_gold_indices):
-                    # 使用专门的API获取COMEX黄金数据
-                    stock_data = self.get_comex_gold_data()
-                    
+                for (idx, index_info), stock_data in zip(comex_gold_indices, gold_data):
                     if stock_data:
                         # 添加类型信息
                         stock_data["type"] = index_info['type']
@@ -478,7 +492,7 @@ class StockIndexCrawler:
                 url = index_info['url']
                 
                 # 爬取数据
-                stock_data = self.crawl_index_data(url)
+                stock_data = await self.acrawl_index_data(url)
                 
                 if stock_data:
                     # 添加类型信息
@@ -507,6 +521,10 @@ class StockIndexCrawler:
             }
     
     def batch_get_indices(self, index_list):
+        """批量获取多个股票指数数据，同步接口，见abatch_get_indices"""
+        return run_sync(self.abatch_get_indices(index_list))
+    
+    async def abatch_get_indices(self, index_list):
         """
         批量获取多个股票指数数据
         
@@ -590,7 +608,7 @@ class StockIndexCrawler:
             headers['Pragma'] = 'no-cache'
             headers['Expires'] = '0'
             
-            response = requests.get(api_url, params=params, headers=headers, cookies=cookies)
+            response = await get_engine().get(api_url, params=params, headers=headers, cookies=cookies)
             if response.status_code != 200:
                 return []
             
@@ -679,7 +697,7 @@ class StockIndexCrawler:
                     url = index_info['url']
                     
                     # 爬取数据
-                    stock_data = self.crawl_index_data(url)
+                    stock_data = await self.acrawl_index_data(url)
                     
                     if stock_data:
                         # 添加类型信息
@@ -694,7 +712,7 @@ class StockIndexCrawler:
                         # 添加随机延迟，避免请求过快
                         if idx < len(index_list) - 1:
                             delay = random.uniform(0.5, 1.0)
-                            time.sleep(delay)
+                            await asyncio.sleep(delay)
                 
                 return result
                 
@@ -719,6 +737,10 @@ class StockIndexCrawler:
         return market_name
 
     def get_comex_gold_data(self):
+        """获取COMEX黄金数据的专用API，同步接口，见aget_comex_gold_data"""
+        return run_sync(self.aget_comex_gold_data())
+    
+    async def aget_comex_gold_data(self):
         """
         获取COMEX黄金数据的专用API
         
@@ -764,7 +786,7 @@ class StockIndexCrawler:
                 'Expires': '0'
             }
             
-            response = requests.get(api_url, params=params, headers=headers, cookies=cookies)
+            response = await get_engine().get(api_url, params=params, headers=headers, cookies=cookies)
             
             if response.status_code != 200:
                 return None
@@ -819,8 +841,7 @@ def get_stock_index():
         JSON: 包含股票数据的响应
     """
     # 创建爬虫实例并爬取数据
-    crawler = StockIndexCrawler()
-    result = crawler.crawl()
+    result = crawl_cache.get('stock_index', lambda: StockIndexCrawler().crawl())
     
     # 返回完整响应，包含status和message字段
     return jsonify(result)
@@ -5,12 +5,14 @@
 天天黄历网站爬虫
 """
 
-import requests
+from .async_engine import get_engine, run_sync
+from .result_cache import crawl_cache
+import asyncio
 import json
 import re
 import time
 from datetime import datetime
-from bs4 import BeautifulSoup
+from .html_parser import make_soup
 from flask import Blueprint, jsonify
 
 # 创建蓝图
@@ -40,12 +42,16 @@ class TthuangliCrawler:
         }
     
     def get_page_content(self, url):
-        """获取页面内容"""
+        """获取页面内容，同步接口，见aget_page_content"""
+        return run_sync(self.aget_page_content(url))
+    
+    async def aget_page_content(self, url):
+        """获取页面内容（异步）"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = await get_engine().get(url, headers=self.headers, timeout=10)
             if response.status_code == 200:
                 response.encoding = 'utf-8'
-                return BeautifulSoup(response.text, 'html.parser')
+                return make_soup(response.text)
             return None
         except Exception as e:
             print(f"获取页面失败: {str(e)}")
@@ -229,12 +235,19 @@ class TthuangliCrawler:
         return wuxing_info
     
     def get_all_info(self):
-        """获取所有信息并返回统一格式"""
+        """获取所有信息并返回统一格式，同步接口，见aget_all_info"""
+        return run_sync(self.aget_all_info())
+    
+    async def aget_all_info(self):
+        """获取所有信息并返回统一格式（异步）"""
         try:
             print("开始获取天天黄历所有信息...")
             
-            # 获取首页内容
-            main_soup = self.get_page_content(self.base_url)
+            # 同时获取首页和五行穿衣页面内容
+            main_soup, wuxing_soup = await asyncio.gather(
+                self.aget_page_content(self.base_url),
+                self.aget_page_content(self.wuxing_url)
+            )
             if not main_soup:
                 return None
             
@@ -242,8 +255,6 @@ class TthuangliCrawler:
             date_info = self.extract_date_info_from_main(main_soup)
             yiji_info = self.extract_yiji_info_from_main(main_soup)
             
-            # 获取五行穿衣页面内容
-            wuxing_soup = self.get_page_content(self.wuxing_url)
             wuxing_info = {}
             if wuxing_soup:
                 wuxing_info = self.extract_wuxing_info_from_page(wuxing_soup)
@@ -290,7 +301,7 @@ crawler = TthuangliCrawler()
 def get_all_info():
     """获取所有信息的API接口"""
     try:
-        result = crawler.get_all_info()
+        result = crawl_cache.get('tthuangli', crawler.get_all_info)
         if result:
             return jsonify({
                 'code': 200,
@@ -314,7 +325,7 @@ def get_all_info():
 def get_date_info():
     """获取日期信息的API接口"""
     try:
-        result = crawler.get_all_info()
+        result = crawl_cache.get('tthuangli', crawler.get_all_info)
         if result:
             date_data = {
                 'date': result.get('date', ''),
@@ -345,7 +356,7 @@ def get_date_info():
 def get_yiji_info():
     """获取宜忌信息的API接口"""
     try:
-        result = crawler.get_all_info()
+        result = crawl_cache.get('tthuangli', crawler.get_all_info)
         if result:
             yiji_data = {
                 'suitableActions': result.get('suitableActions', ''),
@@ -373,7 +384,7 @@ def get_yiji_info():
 def get_wuxing_info():
     """获取五行穿衣指南的API接口"""
     try:
-        result = crawler.get_all_info()
+        result = crawl_cache.get('tthuangli', crawler.get_all_info)
         if result:
             wuxing_data = {
                 'luckyColor': result.get('luckyColor', ''),
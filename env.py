@@ -17,3 +17,124 @@ def get_lmjj_base_url():
     if LMJJ_BASE_URL:
         return LMJJ_BASE_URL if LMJJ_BASE_URL.endswith('/') else LMJJ_BASE_URL + '/'
     return None
+
+# 常驻node readability进程数量
+READABILITY_POOL_SIZE = int(os.getenv('READABILITY_POOL_SIZE', 2))
+# 单篇文章提取超时时间(秒)
+READABILITY_TIMEOUT = float(os.getenv('READABILITY_TIMEOUT', 30))
+
+# 必应新闻搜索单次请求最多同时抓取的文章数
+BING_MAX_CONCURRENCY = int(os.getenv('BING_MAX_CONCURRENCY', 10))
+# 抓取单个网页和调用必应搜索接口的连接、读取超时时间(秒)
+ARTICLE_FETCH_TIMEOUT = float(os.getenv('ARTICLE_FETCH_TIMEOUT', 15))
+# 必应新闻搜索单次请求抓取文章的总时限(秒)，到时返回已提取的文章
+BING_ARTICLES_TIMEOUT = float(os.getenv('BING_ARTICLES_TIMEOUT', 60))
+
+# 提取后文章的缓存有效期(秒)，为0时不缓存
+ARTICLE_CACHE_TTL = float(os.getenv('ARTICLE_CACHE_TTL', 24 * 3600))
+# 必应新闻搜索结果的缓存有效期(秒)，为0时不缓存
+BING_SEARCH_CACHE_TTL = float(os.getenv('BING_SEARCH_CACHE_TTL', 600))
+# 内存中最多缓存的条数，超出后按最近最少使用淘汰
+ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv('ARTICLE_CACHE_MAX_ENTRIES', 1000))
+# 磁盘缓存文件路径，为空时只使用内存缓存
+ARTICLE_CACHE_DB = os.getenv(
+    'ARTICLE_CACHE_DB',
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'article_cache.db')
+)
+# 磁盘缓存最多保留的条数
+ARTICLE_CACHE_DISK_MAX_ENTRIES = int(os.getenv('ARTICLE_CACHE_DISK_MAX_ENTRIES', 20000))
+# 并发请求同一URL时，等待其他请求加载的最长时间(秒)，超时后自行加载
+ARTICLE_CACHE_WAIT_TIMEOUT = float(os.getenv('ARTICLE_CACHE_WAIT_TIMEOUT', 30))
+
+# 批量调用工作流时每秒最多发起的请求数，为0时不限速
+WORKFLOW_RPS = float(os.getenv('WORKFLOW_RPS', 2))
+# 批量调用工作流时最多同时进行的请求数
+WORKFLOW_MAX_IN_FLIGHT = int(os.getenv('WORKFLOW_MAX_IN_FLIGHT', 10))
+
+# 批量任务的检查点目录，服务重启后可从中恢复
+BATCH_JOB_DIR = os.getenv(
+    'BATCH_JOB_DIR',
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'jobs')
+)
+# 批量任务中单个请求失败后的重试次数
+BATCH_JOB_RETRIES = int(os.getenv('BATCH_JOB_RETRIES', 3))
+# 单个工作流请求的超时时间(秒)
+BATCH_JOB_REQUEST_TIMEOUT = float(os.getenv('BATCH_JOB_REQUEST_TIMEOUT', 600))
+
+# 调用工作流的响应模式，默认blocking为原来的阻塞模式
+# 设为streaming时可以检查首个token超时并及时取消卡住的生成
+WORKFLOW_RESPONSE_MODE = os.getenv('WORKFLOW_RESPONSE_MODE', 'blocking')
+# 流式调用时等待首个文本或进度事件(workflow_started、node_started等)的超时时间(秒)，为0时不限制
+WORKFLOW_TTFT_TIMEOUT = float(os.getenv('WORKFLOW_TTFT_TIMEOUT', 120))
+# 流式调用时两次事件之间的最长间隔(秒)，不含ping，为0时不限制
+# 单个非流式节点执行期间只有ping，应大于最慢节点的执行时间
+WORKFLOW_IDLE_TIMEOUT = float(os.getenv('WORKFLOW_IDLE_TIMEOUT', 300))
+# 流式调用的整体超时时间(秒)，为0时不限制
+WORKFLOW_TOTAL_TIMEOUT = float(os.getenv('WORKFLOW_TOTAL_TIMEOUT', 600))
+
+# 异步接口共享连接池的最大连接数
+WORKFLOW_HTTP_LIMIT = int(os.getenv('WORKFLOW_HTTP_LIMIT', 100))
+# 共享连接池中每个主机的最大连接数
+WORKFLOW_HTTP_LIMIT_PER_HOST = int(os.getenv('WORKFLOW_HTTP_LIMIT_PER_HOST', 30))
+# DNS缓存时间(秒)
+WORKFLOW_HTTP_DNS_TTL = int(os.getenv('WORKFLOW_HTTP_DNS_TTL', 300))
+# 空闲连接保持时间(秒)
+WORKFLOW_HTTP_KEEPALIVE = float(os.getenv('WORKFLOW_HTTP_KEEPALIVE', 60))
+# 单个工作流请求的超时时间(秒)，为0时不限制
+WORKFLOW_HTTP_TIMEOUT = float(os.getenv('WORKFLOW_HTTP_TIMEOUT', 600))
+# 连接失败、超时或返回429/5xx时的重试次数
+WORKFLOW_HTTP_RETRIES = int(os.getenv('WORKFLOW_HTTP_RETRIES', 2))
+# 首次重试前的等待时间(秒)，之后每次翻倍
+WORKFLOW_HTTP_BACKOFF = float(os.getenv('WORKFLOW_HTTP_BACKOFF', 1))
+
+# 语义标签每次请求的提示词token预算，大于0时按token数装填记录，代替按output_len固定行数切分
+SEMANTIC_LABEL_TOKEN_BUDGET = int(os.getenv('SEMANTIC_LABEL_TOKEN_BUDGET', 0))
+# 按token装填时每次请求的最大行数，限制模型单次输出的长度
+SEMANTIC_LABEL_MAX_ROWS = int(os.getenv('SEMANTIC_LABEL_MAX_ROWS', 500))
+
+# 语义标签缓存的有效期(秒)，为0时不缓存
+LABEL_CACHE_TTL = float(os.getenv('LABEL_CACHE_TTL', 30 * 24 * 3600))
+# 语义标签缓存文件路径，为空时不缓存
+LABEL_CACHE_DB = os.getenv(
+    'LABEL_CACHE_DB',
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'label_cache.db')
+)
+# 每个工作流最多缓存的标签条数
+LABEL_CACHE_MAX_ENTRIES = int(os.getenv('LABEL_CACHE_MAX_ENTRIES', 500000))
+
+# 文档解析结果的缓存文件路径，为空时不缓存
+PARSE_CACHE_DB = os.getenv(
+    'PARSE_CACHE_DB',
+    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'parse_cache.db')
+)
+# 解析结果缓存的最大字节数，超出后按最近最少使用淘汰，为0时不缓存
+PARSE_CACHE_MAX_BYTES = int(os.getenv('PARSE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# OCR服务的识别接口
+OCR_URL = os.getenv('OCR_URL', 'http://127.0.0.1:19000/predict/ocr_system')
+# 请求OCR服务的超时时间(秒)
+OCR_REQUEST_TIMEOUT = float(os.getenv('OCR_REQUEST_TIMEOUT', 120))
+# 长图OCR同时进行的最大请求数，同时也是连接池的大小
+OCR_CONCURRENCY = int(os.getenv('OCR_CONCURRENCY', 4))
+# 长图OCR每个切片的高度(像素)
+OCR_SLICE_HEIGHT = int(os.getenv('OCR_SLICE_HEIGHT', 3096))
+# 相邻切片重叠的高度(像素)，应大于一行文字的高度，最多为切片高度的一半
+OCR_SLICE_OVERLAP = int(os.getenv('OCR_SLICE_OVERLAP', 200))
+# 每次请求OCR服务发送的切片数量
+OCR_BATCH_SLICES = int(os.getenv('OCR_BATCH_SLICES', 4))
+# 切片编码为JPEG的质量
+OCR_JPEG_QUALITY = int(os.getenv('OCR_JPEG_QUALITY', 95))
+
+# 多个上传文件同时下载的最大数量
+FILE_DOWNLOAD_CONCURRENCY = int(os.getenv('FILE_DOWNLOAD_CONCURRENCY', 6))
+
+# passport token未返回有效期时的缓存时间(秒)
+PASSPORT_TOKEN_TTL = float(os.getenv('PASSPORT_TOKEN_TTL', 300))
+# 距离token过期不足该时间(秒)时提前刷新
+PASSPORT_REFRESH_MARGIN = float(os.getenv('PASSPORT_REFRESH_MARGIN', 60))
+
+# PDF解析进程池的进程数，为1时在当前进程中解析
+# 只在waitress启动的服务中生效，直接运行app.py时不使用进程池，见app.py
+PDF_PARSE_WORKERS = int(os.getenv('PDF_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+# 页数不少于该值时才分段并行解析，页数少时启动子进程的开销更大
+PDF_PARSE_MIN_PAGES = int(os.getenv('PDF_PARSE_MIN_PAGES', 8))
@@ -0,0 +1,80 @@
+import logging
+import math
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_rows(file_path: str):
+    """
+    以只读模式逐行读取第一个工作表，跳过空行，第一行为表头
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        # 部分程序生成的文件中记录的表格范围不准确，按实际内容读取
+        ws.reset_dimensions()
+        for row in ws.iter_rows(values_only=True):
+            if any(i is not None for i in row):
+                yield row
+    finally:
+        wb.close()
+
+
+def read_columns(file_path: str, columns: list[str]) -> pd.DataFrame:
+    """
+    只读取指定的列，不加载整个工作簿
+    :return: 索引为数据行的序号（不含表头和空行），与write_with_source对应
+    """
+    rows = _iter_rows(file_path)
+    header = list(next(rows, ()))
+    missing = [i for i in columns if i not in header]
+    if missing:
+        rows.close()
+        raise KeyError(f'表格中没有列{missing}')
+
+    positions = [header.index(i) for i in columns]
+    data = [[] for _ in columns]
+    for row in rows:
+        for values, position in zip(data, positions):
+            values.append(row[position] if position < len(row) else None)
+    return pd.DataFrame(dict(zip(columns, data)))
+
+
+def _cell_value(value):
+    # 空值写成空单元格，与to_excel一致
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def write_with_source(src_path: str, dst_path: str, df: pd.DataFrame, columns: list[str]):
+    """
+    逐行复制原表格，在右侧追加df中的columns列，以只写模式保存
+    只输出df索引中的数据行，索引为read_columns返回的数据行序号
+    """
+    extra = df[columns].sort_index()
+    results = zip(extra.index, extra.itertuples(index=False, name=None))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    rows = _iter_rows(src_path)
+    header = list(next(rows, ()))
+    width = len(header)
+    ws.append(header + list(columns))
+
+    current = next(results, None)
+    for index, row in enumerate(rows):
+        if current is None:
+            break
+        if current[0] != index:
+            continue
+        row = list(row[:width]) + [None] * (width - len(row))
+        ws.append(row + [_cell_value(i) for i in current[1]])
+        current = next(results, None)
+    rows.close()
+    wb.save(dst_path)
@@ -2,6 +2,9 @@ import json
 
 import pandas as pd
 
+# 解析逻辑或结果格式变化时加1，使解析缓存中的旧结果失效
+PARSER_VERSION = 1
+
 # 读取 Excel 文件
 def read_excel(file_path):
     df = pd.read_excel(file_path)
@@ -44,30 +44,9 @@ def get_path(req_text: str):
         'path_5': '',
         'path_6': '',
     }
-    idx = 1
-    while True:
-        head = file_info.find("tenant_id='")
-        if head < 0:
-            break
-        head += + len("tenant_id='")
-        tail = head + 36
-        tenant_id = file_info[head:tail]
-
-        head = file_info.find("related_id='")
-        head += + len("related_id='")
-        tail = head + 36
-        file_id = file_info[head:tail]
-
-        file_path = lmjj_agent.file_download_by_tenant(
-            app_code=app_code,
-            file_id=file_id,
-            tenant_id=tenant_id,
-            remote_addr=remote_addr
-        )
-
+    # 并发下载所有文件
+    file_paths = lmjj_agent.download_files(app_code, list(lmjj_agent.iter_file_ids(file_info)), remote_addr)
+    for idx, file_path in enumerate(file_paths, 1):
         path[f'path_{idx}'] = file_path
 
-        idx += 1
-        file_info = file_info[tail:]
-
     return path
\ No newline at end of file
@@ -0,0 +1,65 @@
+import logging
+import threading
+import time
+
+import env
+from cache_store import DiskStore, make_key
+
+logger = logging.getLogger(__name__)
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> None | DiskStore:
+    global _store
+    if env.LABEL_CACHE_TTL <= 0 or not env.LABEL_CACHE_DB:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = DiskStore(env.LABEL_CACHE_DB, env.LABEL_CACHE_MAX_ENTRIES)
+                except Exception:
+                    logger.error(f'打开标签缓存-失败[{env.LABEL_CACHE_DB}]，不使用缓存', exc_info=True)
+                    return None
+    return _store
+
+
+def workflow_key(from_addr: str, app_key: str) -> str:
+    """
+    同一个工作流的标签才能复用，缓存按工作流地址和密钥区分，密钥只保存哈希
+    """
+    return f'label:{make_key(f"{from_addr}|{app_key}")[:32]}'
+
+
+def lookup(workflow: str, utterances: list[str]) -> dict:
+    """
+    查询已缓存的标签
+    :param utterances: 规范化后的解析命令
+    :return: {规范化的解析命令: 标签}
+    """
+    disk = _get_store()
+    if disk is None or not utterances:
+        return {}
+    keys = {make_key(i): i for i in utterances}
+    try:
+        values = disk.get_many(workflow, list(keys))
+    except Exception:
+        logger.error(f'读取标签缓存-失败[{workflow}]', exc_info=True)
+        return {}
+    return {keys[key]: value for key, value in values.items()}
+
+
+def store(workflow: str, labels: dict):
+    """
+    保存本次请求得到的标签
+    :param labels: {规范化的解析命令: 标签}
+    """
+    disk = _get_store()
+    if disk is None or not labels:
+        return
+    try:
+        disk.put_many(workflow, {make_key(k): v for k, v in labels.items()}, time.time() + env.LABEL_CACHE_TTL)
+    except Exception:
+        logger.error(f'写入标签缓存-失败[{workflow}]', exc_info=True)
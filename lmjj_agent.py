@@ -1,7 +1,12 @@
+import base64
+import json
 import logging
 import mimetypes
 import os.path
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import unquote
 
 import requests
@@ -22,24 +27,112 @@ def get_lmjj_host(remote_addr: str):
     return lmjj_host
 
 
-def get_passport(app_code: str, remote_addr: str):
-    url = get_lmjj_host(remote_addr) + 'api/passport'
+def _token_expires_at(resp_json: dict, token: str) -> float:
+    """
+    token的过期时间，优先使用接口返回的有效期，其次是JWT中的exp，都没有时按PASSPORT_TOKEN_TTL
+    """
+    now = time.time()
+    expires_in = resp_json.get('expires_in')
+    if isinstance(expires_in, (int, float)) and expires_in > 0:
+        return now + expires_in
+    parts = token.split('.')
+    if len(parts) == 3:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+            if isinstance(payload.get('exp'), (int, float)):
+                return float(payload['exp'])
+        except (ValueError, AttributeError):
+            pass
+    return now + env.PASSPORT_TOKEN_TTL
+
+
+class _PassportEntry:
+
+    def __init__(self):
+        # 同一个(app_code, host)同时只有一个线程获取token
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = 0.0
+
+
+_passports = {}
+_passports_lock = threading.Lock()
+
+
+def _fetch_passport(app_code: str, lmjj_host: str, entry: _PassportEntry):
+    url = lmjj_host + 'api/passport'
     h = {
         'X-App-Code': app_code,
     }
     resp = requests.get(url=url, headers=h, )
-    logger.info(f'get_passport[{url}][{app_code}][{resp.text}]')
+    logger.info(f'get_passport[{url}][{app_code}][{resp.status_code}]')
     resp_json: dict = resp.json()
-    return resp_json.get('access_token')
+    token = resp_json.get('access_token')
+    if token:
+        entry.expires_at = _token_expires_at(resp_json, token)
+        entry.token = token
+    return token
 
 
-def upload_file(app_code: str, file: str, remote_addr):
-    token = get_passport(app_code, remote_addr=remote_addr)
+def _refresh_passport(app_code: str, lmjj_host: str, entry: _PassportEntry):
+    try:
+        _fetch_passport(app_code, lmjj_host, entry)
+    except Exception:
+        logger.error(f'提前刷新passport-失败[{lmjj_host}][{app_code}]', exc_info=True)
+    finally:
+        entry.lock.release()
+
 
+def get_passport(app_code: str, remote_addr: str):
+    """
+    获取token，按(app_code, host)缓存到过期前
+    即将过期时由一个线程在后台刷新，其他线程继续使用当前token；
+    已经过期时只有一个线程请求接口，其他线程等待它的结果
+    """
+    lmjj_host = get_lmjj_host(remote_addr)
+    with _passports_lock:
+        entry = _passports.setdefault((app_code, lmjj_host), _PassportEntry())
+
+    now = time.time()
+    if entry.token and now < entry.expires_at - env.PASSPORT_REFRESH_MARGIN:
+        return entry.token
+    if entry.token and now < entry.expires_at:
+        if entry.lock.acquire(blocking=False):
+            threading.Thread(target=_refresh_passport, args=(app_code, lmjj_host, entry),
+                             name='passport-refresh', daemon=True).start()
+        return entry.token
+
+    with entry.lock:
+        if entry.token and time.time() < entry.expires_at:
+            return entry.token
+        return _fetch_passport(app_code, lmjj_host, entry)
+
+
+def invalidate_passport(app_code: str, remote_addr: str, token: str):
+    """
+    token被拒绝时丢弃缓存，下次重新获取
+    """
+    entry = _passports.get((app_code, get_lmjj_host(remote_addr)))
+    if entry and entry.token == token:
+        entry.token = None
+        entry.expires_at = 0.0
+
+
+def _send_with_passport(app_code: str, remote_addr, send, token: str = None) -> requests.Response:
+    """
+    带token发送请求，缓存的token被拒绝(401)时重新获取并重试一次
+    """
+    token = token or get_passport(app_code, remote_addr=remote_addr)
+    resp = send(token)
+    if resp.status_code == 401:
+        logger.info(f'token已失效，重新获取[{app_code}][{resp.url}]')
+        invalidate_passport(app_code, remote_addr, token)
+        resp = send(get_passport(app_code, remote_addr=remote_addr))
+    return resp
+
+
+def upload_file(app_code: str, file: str, remote_addr):
     url = get_lmjj_host(remote_addr) + 'api/files/v2/upload'
-    h = {
-        'Authorization': f'Bearer {token}',
-    }
 
     file_type, _ = mimetypes.guess_type(file)
     # 根据文件类型设置正确的MIME类型
@@ -54,22 +147,22 @@ def upload_file(app_code: str, file: str, remote_addr):
         # 如果无法猜测MIME类型，可以设置一个默认值或进行错误处理
         mime_type = 'application/octet-stream'
 
-    # 使用正确的MIME类型构建文件字典
-    files = {
-        'file': (
-            os.path.basename(file),
-            open(file=file, mode='rb'),
-            mime_type,
-        ),
-    }
-    # files = {
-    #     'file': (
-    #         os.path.basename(file),
-    #         open(file=file, mode='rb'),
-    #         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    #     ),
-    # }
-    resp = requests.post(url=url, files=files, headers=h)
+    def send(token):
+        h = {
+            'Authorization': f'Bearer {token}',
+        }
+        # 使用正确的MIME类型构建文件字典，重试时重新打开文件
+        with open(file=file, mode='rb') as f:
+            files = {
+                'file': (
+                    os.path.basename(file),
+                    f,
+                    mime_type,
+                ),
+            }
+            return requests.post(url=url, files=files, headers=h)
+
+    resp = _send_with_passport(app_code, remote_addr, send)
     logger.info(f'文件上传结果=>{resp.text}')
 
     resp_json: dict = resp.json()
@@ -85,47 +178,43 @@ def upload_file(app_code: str, file: str, remote_addr):
 
 
 def file_preview(app_code: str, file_id: str, remote_addr):
-    token = get_passport(app_code, remote_addr=remote_addr)
-
     url = get_lmjj_host(remote_addr) + 'api/files/v2/preview'
-    h = {
-        'Authorization': f'Bearer {token}',
-    }
     params = {
         'file_id': file_id,
     }
-    resp = requests.get(url=url, params=params, headers=h)
+    resp = _send_with_passport(
+        app_code, remote_addr,
+        lambda token: requests.get(url=url, params=params, headers={'Authorization': f'Bearer {token}'})
+    )
     return resp.text
 
 
 def get_pdf_table_result(app_code: str, file_id: str, remote_addr):
-    token = get_passport(app_code, remote_addr=remote_addr)
     url = env.LMJJ_BASE_URL + 'api/files/v2/previewPDF'
-    h = {
-        'Authorization': f'Bearer {token}',
-    }
     params = {
         'file_id': file_id,
     }
-    resp = requests.get(url=url, params=params, headers=h)
+    resp = _send_with_passport(
+        app_code, remote_addr,
+        lambda token: requests.get(url=url, params=params, headers={'Authorization': f'Bearer {token}'})
+    )
 
     return pdf_table_parse.extract_tables(resp.content)
 
 
-def file_download_by_tenant(app_code: str, file_id: str, tenant_id: str, remote_addr) -> str:
-    token = get_passport(app_code, remote_addr=remote_addr)
-
+def file_download_by_tenant(app_code: str, file_id: str, tenant_id: str, remote_addr, token: str = None) -> str:
     url = get_lmjj_host(remote_addr) + 'api/files/v2/download-by-tenant'
-    h = {
-        'Authorization': f'Bearer {token}',
-    }
     params = {
         'file_id': file_id,
         'tenant_id': tenant_id,
     }
     logger.info(f'file_download_by_tenant[{url}][{params}]')
 
-    resp = requests.get(url=url, params=params, headers=h)
+    resp = _send_with_passport(
+        app_code, remote_addr,
+        lambda t: requests.get(url=url, params=params, headers={'Authorization': f'Bearer {t}'}),
+        token=token
+    )
     filename: str = resp.headers.get('Content-Disposition')
     filename = filename[len('attachment; filename='):]
     filename = unquote(filename)
@@ -139,3 +228,47 @@ def file_download_by_tenant(app_code: str, file_id: str, tenant_id: str, remote_
     logger.info(f'file_download_by_tenant[{params}][{filename}][{temp_file_path}]')
 
     return temp_file_path
+
+
+def iter_file_ids(file_info: str):
+    """
+    依次解析file_info中上传文件的(tenant_id, file_id)
+    """
+    while True:
+        head = file_info.find("tenant_id='")
+        if head < 0:
+            break
+        head += len("tenant_id='")
+        tail = head + 36
+        tenant_id = file_info[head:tail]
+
+        head = file_info.find("related_id='")
+        head += len("related_id='")
+        tail = head + 36
+        file_id = file_info[head:tail]
+
+        yield tenant_id, file_id
+        file_info = file_info[tail:]
+
+
+def download_files(app_code: str, file_ids: list, remote_addr, parse=None) -> list:
+    """
+    所有文件使用同一个token，并发下载
+    :param file_ids: [(tenant_id, file_id)]
+    :param parse: 解析函数，下载完成后在同一个线程中解析，不必等待其他文件下载完成
+    :return: 与file_ids顺序一致的文件路径，传入parse时为解析结果
+    """
+    if not file_ids:
+        return []
+    token = get_passport(app_code, remote_addr=remote_addr)
+
+    def download(ids):
+        tenant_id, file_id = ids
+        file_path = file_download_by_tenant(app_code, file_id, tenant_id, remote_addr, token=token)
+        return parse(file_path) if parse else file_path
+
+    if len(file_ids) == 1:
+        return [download(file_ids[0])]
+    workers = min(len(file_ids), env.FILE_DOWNLOAD_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='file-download') as executor:
+        return list(executor.map(download, file_ids))
@@ -1,12 +1,41 @@
 import json
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 from PIL import Image
 import base64
 import io
 
+import env
+
+logger = logging.getLogger(__name__)
+
 ocr_result = ''
 
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    复用到OCR服务的连接，连接池大小与并发数一致
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, env.OCR_CONCURRENCY))
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
 def img_to_base64(img_path):
     img = Image.open(img_path)
     if img.mode == 'RGBA':
@@ -18,31 +47,136 @@ def img_to_base64(img_path):
     return img_b64.decode('utf-8')
 
 
-def ocr(file_path):
-    global ocr_result
-    img_b64 = img_to_base64(file_path)
+def ocr_images(images_b64: list[str]):
+    """
+    一次请求识别多张图片，OCR服务按images的顺序返回每张图片的结果
+    :return: 原始响应文本, [[{'text': 文字, 'confidence': 置信度, 'text_box_position': 文字框四个顶点}]]
+    """
     headers = {
         # Already added when you pass json=
         'Content-Type': 'application/json',
     }
+    response = _get_session().post(env.OCR_URL, headers=headers, json={'images': images_b64},
+                                   timeout=env.OCR_REQUEST_TIMEOUT)
+    results = json.loads(response.text)  # 是你要处理的原始数据
+    return response.text, results['results']
 
-    json_data = {
-        'images': [
-            img_b64
-        ],
-    }
 
-    response = requests.post('http://127.0.0.1:19000/predict/ocr_system',
-                             headers=headers, json=json_data)
-    results = json.loads(response.text)  # 是你要处理的原始数据
+def ocr(file_path):
+    global ocr_result
+    img_b64 = img_to_base64(file_path)
+    response_text, results = ocr_images([img_b64])
     texts = []
-    for result in results['results']:
+    for result in results:
         text = [item['text'] for item in result]
         texts.append(text)
     flattened_list = [item for sublist in texts for item in sublist]
     ocr_result = ' '.join(flattened_list)
-    return response.text, texts
+    return response_text, texts
+
+
+def slice_ranges(height: int, slice_height: int, overlap: int) -> list[tuple[int, int]]:
+    """
+    把长图按高度切分成[start, end)，相邻切片重叠overlap像素
+    """
+    overlap = max(0, min(overlap, slice_height // 2))
+    if height <= slice_height:
+        return [(0, height)]
+    step = slice_height - overlap
+    count = math.ceil((height - overlap) / step)
+    return [(i * step, min(i * step + slice_height, height)) for i in range(count)]
+
+
+def encode_slice(img) -> str:
+    """
+    直接在内存中把图片数组编码为JPEG的base64，不写临时文件
+    """
+    import cv2
+    ok, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, env.OCR_JPEG_QUALITY])
+    if not ok:
+        raise ValueError('图片编码失败')
+    return base64.b64encode(buffer.tobytes()).decode('utf-8')
+
+
+def _center_y(item):
+    box = item.get('text_box_position')
+    if not box:
+        return None
+    ys = [point[1] for point in box]
+    return (min(ys) + max(ys)) / 2
+
+
+def _drop_repeated_head(previous: list[str], current: list[str]) -> list[str]:
+    """
+    没有文字框坐标时，去掉current开头与previous结尾重复的文字
+    """
+    for size in range(min(len(previous), len(current)), 0, -1):
+        if previous[-size:] == current[:size]:
+            return current[size:]
+    return current
+
+
+def merge_slices(ranges: list[tuple[int, int]], results: list) -> list[str]:
+    """
+    按切片顺序合并识别结果，重叠区域以中线为界：
+    文字框中心落在本切片负责的范围内才保留，被切断的文字由另一个切片完整识别
+    :param results: 与ranges一一对应的识别结果，识别失败的切片为None
+    """
+    all_texts = []
+    for i, ((start, end), items) in enumerate(zip(ranges, results)):
+        if not items:
+            continue
+        low = (start + ranges[i - 1][1]) / 2 - start if i > 0 else -math.inf
+        high = (ranges[i + 1][0] + end) / 2 - start if i + 1 < len(ranges) else math.inf
+        centers = [_center_y(item) for item in items]
+        if None in centers:
+            all_texts.extend(_drop_repeated_head(all_texts, [item['text'] for item in items]))
+            continue
+        all_texts.extend(item['text'] for item, center in zip(items, centers) if low <= center < high)
+    return all_texts
+
+
+def ocr_long_image(file_path):
+    """
+    长图按高度切片后识别，切片在内存中编码，每次请求发送OCR_BATCH_SLICES张切片，
+    最多OCR_CONCURRENCY个请求同时进行，结果按切片的上下顺序合并
+    :return: 最后一个切片所在请求的原始响应文本, [识别出的所有文字]
+    """
+    import cv2
+    img = cv2.imread(file_path)
+    if img is None:
+        raise ValueError(f'无法读取图片[{file_path}]')
+    height = img.shape[0]
+    ranges = slice_ranges(height, env.OCR_SLICE_HEIGHT, env.OCR_SLICE_OVERLAP)
+    batch_size = max(1, env.OCR_BATCH_SLICES)
+    heads = list(range(0, len(ranges), batch_size))
+
+    def recognize(head):
+        batch = ranges[head:head + batch_size]
+        try:
+            # 切片是原图的视图，编码前不复制
+            images = [encode_slice(img[start:end, :]) for start, end in batch]
+            response_text, batch_results = ocr_images(images)
+            if len(batch_results) != len(batch):
+                raise ValueError(f'识别结果数量{len(batch_results)}与切片数量{len(batch)}不一致')
+            logger.info(f'ocr_long_image[{file_path}][{head}-{head + len(batch)}/{len(ranges)}][{response_text}]')
+            return response_text, batch_results
+        except Exception:
+            logger.error(f'ocr_long_image[{file_path}][切片{head}-{head + len(batch)}识别失败]', exc_info=True)
+            return '', [None] * len(batch)
+
+    workers = min(len(heads), max(1, env.OCR_CONCURRENCY))
+    if workers == 1:
+        responses = [recognize(head) for head in heads]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr') as executor:
+            # map按提交顺序返回，与切片的上下顺序一致
+            responses = list(executor.map(recognize, heads))
+
+    response_text = next((text for text, _ in reversed(responses) if text), '')
+    results = [item for _, batch_results in responses for item in batch_results]
+    return response_text, [merge_slices(ranges, results)]
+
 
 if __name__ == '__main__':
     img_path = "WechatIMG44.jpg"
-
@@ -0,0 +1,78 @@
+import hashlib
+import logging
+import threading
+
+import env
+from cache_store import SingleFlight, SizedStore
+
+logger = logging.getLogger(__name__)
+
+_store = None
+_store_lock = threading.Lock()
+_flight = SingleFlight()
+
+
+def _get_store() -> None | SizedStore:
+    global _store
+    if env.PARSE_CACHE_MAX_BYTES <= 0 or not env.PARSE_CACHE_DB:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = SizedStore(env.PARSE_CACHE_DB, env.PARSE_CACHE_MAX_BYTES)
+                except Exception:
+                    logger.error(f'打开解析缓存-失败[{env.PARSE_CACHE_DB}]，不使用缓存', exc_info=True)
+                    return None
+    return _store
+
+
+def content_key(source, parser: str, version) -> str:
+    """
+    缓存键为文件内容的SHA-256加上解析器名称和版本，与文件名和下载地址无关
+    :param source: 文件路径或文件内容
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    else:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    return f'{parser}:{version}:{digest.hexdigest()}'
+
+
+def parse(parser: str, version, source, func):
+    """
+    读取解析结果的缓存，未命中时调用func(source)解析并保存
+    并发解析同一个文件时只解析一次
+    :param parser: 解析器名称
+    :param version: 解析器版本，解析逻辑或结果格式变化时修改，旧结果不再命中
+    :param source: 文件路径或文件内容
+    """
+    disk = _get_store()
+    if disk is None:
+        return func(source)
+
+    key = content_key(source, parser, version)
+    try:
+        value = disk.get(key)
+    except Exception:
+        logger.error(f'读取解析缓存-失败[{parser}]', exc_info=True)
+        value = None
+    if value is not None:
+        logger.info(f'解析缓存命中[{key}]')
+        return value
+
+    def load():
+        loaded = func(source)
+        if loaded is not None:
+            try:
+                disk.put(key, parser, loaded)
+            except Exception:
+                logger.error(f'写入解析缓存-失败[{parser}]', exc_info=True)
+        return loaded
+
+    value, owner = _flight.do(key, load)
+    # 解析失败时由当前请求重新解析，把异常返回给调用方
+    return func(source) if value is None and not owner else value
@@ -1,8 +1,27 @@
 import pdfplumber
 import logging
 
+import pdf_workers
+
 logger = logging.getLogger(__name__)
 pdf_all_info_result = ''
+# 解析逻辑或结果格式变化时加1，使解析缓存中的旧结果失效
+PARSER_VERSION = 1
+
+
+def _extract_pages(pdf_path, start, end):
+    """
+    提取[start, end)页的文本，在进程池中执行
+    """
+    with pdf_workers.open_pdf(pdf_path) as pdf:
+        extracted_data = []
+        for page_number in range(start, end):
+            page = pdf.pages[page_number]
+            # 提取文本内容
+            extracted_data.append(page.extract_text())
+            # 释放页面解析缓存，避免长文档占用大量内存
+            page.close()
+    return extracted_data
 
 
 def extract_information_from_pdf(pdf_path):
@@ -10,15 +29,8 @@ def extract_information_from_pdf(pdf_path):
     with pdfplumber.open(pdf_path) as pdf:
         total_pages = len(pdf.pages)
 
-        # 创建一个空的列表用于存储信息
-        extracted_data = []
-
-        for page_number in range(total_pages):
-            page = pdf.pages[page_number]
-
-            # 提取文本内容
-            text = page.extract_text()
-            extracted_data.append(text)
+    # 页数较多时按页码分段并行提取，结果按页码顺序拼接
+    extracted_data = pdf_workers.map_pages(_extract_pages, pdf_path, total_pages)
     text = '\n'.join(extracted_data)
     logger.info(f'改变前的pdf_wff_result数据[{pdf_all_info_result}]')
     pdf_all_info_result = text
@@ -1,8 +1,12 @@
-import pdfplumber
 import re
 from operator import itemgetter
 from datetime import datetime
 
+import pdf_workers
+
+# 解析逻辑或结果格式变化时加1，使解析缓存中的旧结果失效
+PARSER_VERSION = 1
+
 
 # page_chars最尾部的非空字符
 def tail_not_space_char(page_chars):
@@ -22,10 +26,45 @@ def head_not_space_char(page_chars):
     return page_chars[i]
 
 
+def _page_tables(input_file, start, end):
+    """
+    识别[start, end)页的表格，在进程池中执行
+    每页只识别一次表格，从识别出的表格对象中提取文本和坐标
+    :return: 每页一个结果，没有表格时为None，
+             否则为(表格文本, 最底部非空字符的y0, 最底部表格的y0, 最顶部非空字符的y1, 最顶部表格的y1)
+    """
+    results = []
+    with pdf_workers.open_pdf(input_file) as pdf:
+        for page in pdf.pages[start:end]:
+            # table对象，可以访问其row属性的bbox对象获取坐标
+            table_objects = page.find_tables()
+            text_table_current_page = [table.extract() for table in table_objects]
+            if text_table_current_page:
+                results.append((
+                    text_table_current_page,
+                    # 获取页面最底部非空字符的y0
+                    tail_not_space_char(page.chars).get('y0'),
+                    # 获取页面最底部表格中最底部字符的y0，table对象的bbox以左上角为原点，而page的char的坐标以左下角为原点，可以用page的高度减去table对象的y来统一
+                    page.bbox[3] - table_objects[-1].bbox[3],
+                    # 获取页面最顶部字符的y1
+                    head_not_space_char(page.chars).get('y1'),
+                    # 获取页面最顶部表格中最底部字符的y1
+                    page.bbox[3] - table_objects[0].bbox[1],
+                ))
+            else:
+                results.append(None)
+            # 释放页面解析缓存
+            page.close()
+    return results
+
+
 # 将pdf表格数据抽取到文件中
 def extract_tables(input_file_path):
-    # 读取pdf文件，保存为pdf实例
-    pdf = pdfplumber.open(input_file_path)
+    """
+    :param input_file_path: 文件路径或PDF内容
+    """
+    with pdf_workers.open_pdf(input_file_path) as pdf:
+        total_pages = len(pdf.pages)
 
     # 存储每个页面最底部字符的y0坐标
     y0_bottom_char = []
@@ -37,22 +76,16 @@ def extract_tables(input_file_path):
     y1_top_table = []
     # 存储所有页面内的表格文本
     text_all_table = []
-    # 访问每一页
-
-    for page in pdf.pages:
-        # table对象，可以访问其row属性的bbox对象获取坐标
-        table_objects = page.find_tables()
-        text_table_current_page = page.extract_tables()
-        if text_table_current_page:
-            text_all_table.append(text_table_current_page)
-            # 获取页面最底部非空字符的y0
-            y0_bottom_char.append(tail_not_space_char(page.chars).get('y0'))
-            # 获取页面最底部表格中最底部字符的y0，table对象的bbox以左上角为原点，而page的char的坐标以左下角为原点，可以用page的高度减去table对象的y来统一
-            y0_bottom_table.append(page.bbox[3] - table_objects[-1].bbox[3])
-            # 获取页面最顶部字符的y1
-            y1_top_char.append(head_not_space_char(page.chars).get('y1'))
-            # 获取页面最顶部表格中最底部字符的y1
-            y1_top_table.append(page.bbox[3] - table_objects[0].bbox[1])
+    # 页数较多时按页码分段并行识别，结果按页码顺序处理
+    for page_result in pdf_workers.map_pages(_page_tables, input_file_path, total_pages):
+        if page_result is None:
+            continue
+        text_table_current_page, bottom_char, bottom_table, top_char, top_table = page_result
+        text_all_table.append(text_table_current_page)
+        y0_bottom_char.append(bottom_char)
+        y0_bottom_table.append(bottom_table)
+        y1_top_char.append(top_char)
+        y1_top_table.append(top_table)
 
     # 处理跨页面表格，将跨页面表格合并，i是当前页码，对于连跨数页的表，应跳过中间页面，防止重复处理
     i = 0
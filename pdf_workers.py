@@ -0,0 +1,77 @@
+import io
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pdfplumber
+
+import env
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def open_pdf(source):
+    """
+    source可以是文件路径或PDF内容
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pdfplumber.open(source)
+
+
+def _get_executor() -> None | ProcessPoolExecutor:
+    global _executor
+    if env.PDF_PARSE_WORKERS <= 1:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # 服务进程中有多个线程，使用spawn启动子进程，不fork当前进程
+                # 子进程会重新导入主模块，进程池中执行的函数所在模块只导入pdfplumber和env
+                _executor = ProcessPoolExecutor(max_workers=env.PDF_PARSE_WORKERS,
+                                                mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+def _reset_executor(executor: ProcessPoolExecutor):
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def page_ranges(total_pages: int, shards: int) -> list[tuple[int, int]]:
+    """
+    把页码切分成最多shards段连续的[start, end)
+    """
+    size = max(1, math.ceil(total_pages / max(1, shards)))
+    return [(i, min(i + size, total_pages)) for i in range(0, total_pages, size)]
+
+
+def map_pages(func, source, total_pages: int) -> list:
+    """
+    按页码分段在进程池中执行func(source, start, end)，每段返回该段每页的结果，按页码顺序拼接
+    页数少于PDF_PARSE_MIN_PAGES或未启用进程池时在当前进程中执行
+    """
+    executor = _get_executor()
+    if executor is None or total_pages < env.PDF_PARSE_MIN_PAGES:
+        return func(source, 0, total_pages)
+
+    ranges = page_ranges(total_pages, env.PDF_PARSE_WORKERS)
+    try:
+        futures = [executor.submit(func, source, start, end) for start, end in ranges]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    except BrokenProcessPool:
+        logger.error('PDF解析进程池异常退出，改为在当前进程中解析', exc_info=True)
+        _reset_executor(executor)
+        return func(source, 0, total_pages)
@@ -0,0 +1,199 @@
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import site
+import subprocess
+import threading
+import time
+
+import env
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'readability_worker.js')
+
+
+class ReadabilityError(Exception):
+    """readability提取失败"""
+
+
+class ReadabilityWorkerDied(ReadabilityError):
+    """worker进程退出或超时，需要重启"""
+
+
+def find_module_path(module_name):
+    for package_path in site.getsitepackages():
+        potential_path = os.path.join(package_path, module_name)
+        if os.path.exists(potential_path):
+            return potential_path
+    raise Exception(f'未找到模块[{module_name}]')
+
+
+class _Worker:
+    """
+    一个常驻的node readability进程，stdin/stdout上按行收发JSON
+    """
+
+    def __init__(self, js_dir: str):
+        self.proc = subprocess.Popen(
+            ['node', WORKER_SCRIPT, js_dir],
+            cwd=js_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        self.responses = queue.Queue()
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+        logger.info(f'readability worker已启动[pid={self.proc.pid}]')
+
+    def _read_loop(self):
+        for line in self.proc.stdout:
+            self.responses.put(line)
+        # EOF，进程已退出
+        self.responses.put(None)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def extract(self, request_id: int, html: str, timeout: float) -> None | dict:
+        try:
+            self.proc.stdin.write(json.dumps({'id': request_id, 'html': html}, ensure_ascii=False) + '\n')
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise ReadabilityWorkerDied(f'写入worker失败[{e}]')
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ReadabilityWorkerDied(f'提取超时[{timeout}s]')
+            try:
+                line = self.responses.get(timeout=remaining)
+            except queue.Empty:
+                raise ReadabilityWorkerDied(f'提取超时[{timeout}s]')
+            if line is None:
+                raise ReadabilityWorkerDied(f'worker进程已退出[returncode={self.proc.poll()}]')
+
+            message: dict = json.loads(line)
+            if message.get('id') != request_id:
+                # 之前请求遗留的响应，丢弃
+                continue
+            if 'error' in message:
+                raise ReadabilityError(message['error'])
+            return message.get('article')
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class ReadabilityPool:
+    """
+    node readability worker进程池
+
+    worker在首次使用时启动，崩溃或超时后自动重启
+    """
+
+    def __init__(self, size: int, timeout: float, js_dir: str = None):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.js_dir = js_dir
+        self._idle: queue.Queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._workers = []
+        self._started = False
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.js_dir)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _discard(self, worker: _Worker):
+        worker.close()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def start(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            if not self.js_dir:
+                self.js_dir = os.path.join(find_module_path('readabilipy'), 'javascript')
+            # 空位在取用时才真正启动进程
+            for _ in range(self.size):
+                self._idle.put(None)
+            self._started = True
+
+    def extract(self, html: str, timeout: float = None) -> None | dict:
+        """
+        提取正文，返回readability的article对象，与ExtractArticle.js的输出一致
+        """
+        self.start()
+        timeout = timeout if timeout else self.timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise ReadabilityError(f'等待空闲worker超时[{timeout}s]')
+
+        try:
+            if worker is None or not worker.alive():
+                if worker is not None:
+                    self._discard(worker)
+                worker = self._spawn()
+            return worker.extract(next(self._ids), html, timeout)
+        except ReadabilityWorkerDied as e:
+            logger.error(f'readability worker异常，重启[pid={worker.proc.pid}][{e}]')
+            self._discard(worker)
+            worker = None
+            raise
+        except ReadabilityError:
+            raise
+        except Exception:
+            if worker is not None:
+                self._discard(worker)
+                worker = None
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ReadabilityPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ReadabilityPool(size=env.READABILITY_POOL_SIZE, timeout=env.READABILITY_TIMEOUT)
+                atexit.register(_pool.close)
+    return _pool
+
+
+def extract(html: str, timeout: float = None) -> None | dict:
+    return get_pool().extract(html, timeout=timeout)
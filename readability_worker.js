@@ -0,0 +1,52 @@
+/*
+ * 常驻的readability提取进程
+ *
+ * 协议：stdin每行一个JSON请求 {"id": 1, "html": "..."}
+ *      stdout每行一个JSON响应 {"id": 1, "article": {...}} 或 {"id": 1, "error": "..."}
+ *
+ * 用法：node readability_worker.js <readabilipy的javascript目录>
+ * 依赖从readabilipy自带的node_modules中加载，与ExtractArticle.js保持一致
+ */
+
+const path = require('path');
+const readline = require('readline');
+const { createRequire } = require('module');
+
+const jsDir = process.argv[2] || process.cwd();
+const requireFromJsDir = createRequire(path.join(jsDir, 'ExtractArticle.js'));
+const { Readability } = requireFromJsDir('@mozilla/readability');
+const { JSDOM } = requireFromJsDir('jsdom');
+
+function extractArticle(html) {
+	var doc = new JSDOM(html.trim());
+	let reader = new Readability(doc.window.document);
+	let article = reader.parse();
+	doc.window.close();
+	return article;
+}
+
+function reply(message) {
+	process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+rl.on('line', (line) => {
+	if (!line.trim()) {
+		return;
+	}
+	let request;
+	try {
+		request = JSON.parse(line);
+	} catch (e) {
+		reply({ id: null, error: 'invalid request: ' + e.message });
+		return;
+	}
+	try {
+		reply({ id: request.id, article: extractArticle(request.html || '') });
+	} catch (e) {
+		reply({ id: request.id, error: String(e && e.stack ? e.stack : e) });
+	}
+});
+
+rl.on('close', () => process.exit(0));
@@ -1,5 +1,4 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-import requests
 import json
 import logging
 import pytz
@@ -7,6 +6,9 @@ import datetime
 import os
 import uuid  # 用于生成唯一ID
 
+import env
+import workflow_stream
+
 # 配置日志
 logger = logging.getLogger('scheduler')
 # 防止日志传播到根记录器
@@ -25,19 +27,18 @@ class TaskConfig:
     def hotspots(article_type, api_token):
         url = "https://dipp.rs-ibg.com/rssz/v1/workflows/run"
         # url = "https://malla.leagpoint.com/rssz/v1/workflows/run"
-        payload = json.dumps({
+        payload = {
             "inputs": {
                 "article_type": article_type
             },
-            "response_mode": "blocking",
+            "response_mode": env.WORKFLOW_RESPONSE_MODE,
             "user": "abc-123"
-        })
+        }
         headers = {
             'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json'
         }
-        response = requests.request("POST", url, headers=headers, data=payload)
-        logger.info(f"调度任务执行: {article_type}, 响应: {response.text}")
+        result = workflow_stream.post(url, headers, payload)
+        logger.info(f"调度任务执行: {article_type}, 响应: {json.dumps(result, ensure_ascii=False)}")
 
     @staticmethod
     def task2(api_token):
@@ -56,23 +57,22 @@ class TaskConfig:
         try:
             # url = "https://malla.leagpoint.com/rssz/v1/workflows/run"
             url = "https://dipp.rs-ibg.com/rssz/v1/workflows/run"
-            payload = json.dumps({
+            payload = {
                 "inputs": {
                     "article_type": article_type
                 },
-                "response_mode": "blocking",
+                "response_mode": env.WORKFLOW_RESPONSE_MODE,
                 "user": "abc-123"
-            })
+            }
             headers = {
                 'Authorization': f'Bearer {api_token}',
-                'Content-Type': 'application/json'
             }
             
-            # 发送请求
-            response = requests.request("POST", url, headers=headers, data=payload)
+            # 发送请求，streaming模式下首个token超时或生成卡住时会提前取消
+            result = workflow_stream.post(url, headers, payload)
             
             # 记录响应
-            logger.info(f"响应状态码: {response.status_code}")
+            logger.info(f"执行状态: {(result.get('data') or {}).get('status')}")
             
         except Exception as e:
             logger.error(f"{article_type}任务执行出错: {str(e)}", exc_info=True)
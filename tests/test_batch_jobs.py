@@ -0,0 +1,65 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import batch_jobs
+import env
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def interrupted_job(tmp_path, monkeypatch):
+    """记录为执行中、但执行它的进程已退出的任务"""
+    monkeypatch.setattr(env, 'BATCH_JOB_DIR', str(tmp_path))
+    job = batch_jobs.BatchJob('0' * 32)
+    os.makedirs(job.chunk_dir)
+    batch_jobs._write_json(job.meta_path, {
+        'job_id': job.job_id, 'kind': 'semantic_label', 'params': {}, 'status': batch_jobs.RUNNING,
+        'total': 3, 'failed_chunks': [], 'error': '', 'result': None, 'pid': _dead_pid(),
+        'created_at': time.time(), 'updated_at': time.time(),
+    })
+    return job
+
+
+def test_get_status_does_not_restart_job(interrupted_job):
+    with open(interrupted_job.meta_path, encoding='utf-8') as f:
+        before = json.load(f)
+
+    status = batch_jobs.get_status(interrupted_job.job_id)
+
+    assert status['status'] == batch_jobs.INTERRUPTED
+    assert interrupted_job.read() == before
+    assert interrupted_job.job_id not in batch_jobs._running
+
+
+def _claim(job_id, barrier, results):
+    # 子进程中执行任务只需要占住进程，不真正调用工作流
+    batch_jobs._run = lambda job: time.sleep(2)
+    barrier.wait()
+    results.put((os.getpid(), batch_jobs._start(batch_jobs.BatchJob(job_id))))
+
+
+def test_resume_is_claimed_by_one_process(interrupted_job):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(4)
+    results = context.Queue()
+    processes = [context.Process(target=_claim, args=(interrupted_job.job_id, barrier, results)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    claims = [results.get(timeout=10) for _ in processes]
+    for process in processes:
+        process.join(10)
+
+    winners = [pid for pid, claimed in claims if claimed]
+    assert len(winners) == 1
+    assert interrupted_job.read()['pid'] == winners[0]
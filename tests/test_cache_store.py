@@ -0,0 +1,103 @@
+import threading
+import time
+
+from cache_store import DiskStore, SingleFlight, SizedStore
+
+
+def test_single_flight_runs_once_for_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(5)
+    results = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do('key', load))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [('value', False)] * 4 + [('value', True)]
+
+
+def test_single_flight_waiters_get_none_when_loader_fails():
+    flight = SingleFlight()
+    started = threading.Event()
+    results = []
+
+    def load():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError('failed')
+
+    def owner():
+        try:
+            flight.do('key', load)
+        except ValueError:
+            results.append('raised')
+
+    thread = threading.Thread(target=owner)
+    thread.start()
+    started.wait()
+    results.append(flight.do('key', lambda: 'not called'))
+    thread.join()
+
+    assert sorted(results, key=str) == [(None, False), 'raised']
+
+
+def test_disk_store_expires_and_evicts(tmp_path):
+    store = DiskStore(str(tmp_path / 'cache.db'), max_entries=2)
+    store.put('ns', 'expired', 1, time.time() - 1)
+    assert store.get('ns', 'expired') == (None, 0)
+
+    expires_at = time.time() + 60
+    store.put_many('ns', {'a': 1, 'b': 2}, expires_at)
+    store.get('ns', 'a')
+    store.put('ns', 'c', 3, expires_at)
+
+    assert store.get_many('ns', ['a', 'b', 'c']) == {'a': 1, 'c': 3}
+    assert store.get_many('other', ['a']) == {}
+
+
+def test_sized_store_stays_within_byte_budget(tmp_path):
+    store = SizedStore(str(tmp_path / 'cache.db'), max_bytes=100)
+    store.put('big', 'test', 'x' * 200)
+    assert store.get('big') is None
+
+    for i in range(5):
+        store.put(f'k{i}', 'test', 'x' * 30)
+    assert store.total_size() <= 100
+    assert store.get('k4') == 'x' * 30
+    assert store.get('k0') is None
+
+
+def test_single_flight_waiter_loads_itself_after_timeout():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def stuck():
+        started.set()
+        release.wait(5)
+        return 'stuck'
+
+    thread = threading.Thread(target=flight.do, args=('key', stuck))
+    thread.start()
+    started.wait()
+    begin = time.monotonic()
+    result = flight.do('key', lambda: 'fresh', timeout=0.2)
+    waited = time.monotonic() - begin
+    release.set()
+    thread.join()
+
+    assert result == ('fresh', True)
+    assert waited < 1
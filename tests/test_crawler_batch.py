@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from crawlers import batch, crawlers_bp
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(batch, 'CRAWLER_SOURCES', {
+        'fast': lambda: ['fast'],
+        'slow': lambda: release.wait(5) and ['slow'],
+        'queued': lambda: ['queued'],
+    })
+    yield
+    # 让超时后留在后台的爬虫线程结束
+    release.set()
+
+
+@pytest.fixture
+def client(sources):
+    app = Flask(__name__)
+    app.register_blueprint(crawlers_bp, url_prefix='/api/crawlers')
+    return app.test_client()
+
+
+def test_run_batch_coerces_string_params(sources):
+    results = batch.run_batch(['fast'], timeout='30', max_workers='4', use_cache='false')
+    assert results['fast'] == {'status': 'success', 'elapsed': results['fast']['elapsed'], 'data': ['fast']}
+
+
+@pytest.mark.parametrize('params', [
+    {'timeout': 'abc'}, {'timeout': 0}, {'timeout': -1},
+    {'max_workers': '4.5'}, {'max_workers': 0}, {'max_workers': True},
+    {'use_cache': 'maybe'}, {'use_cache': 2},
+])
+def test_run_batch_rejects_bad_params(sources, params):
+    with pytest.raises(ValueError):
+        batch.run_batch(['fast'], **params)
+
+
+def test_queued_source_times_out_with_the_batch(sources):
+    start = time.monotonic()
+    results = batch.run_batch(['slow', 'queued'], timeout=1, max_workers=1, use_cache=False)
+    elapsed = time.monotonic() - start
+
+    # 总时限为1 * ceil(2 / 1) = 2秒，queued一直排在卡住的slow后面
+    assert elapsed < 2.5
+    assert results['slow']['status'] == 'timeout'
+    assert results['queued']['status'] == 'timeout'
+    assert results['queued']['elapsed'] == 0
+
+
+def test_route_rejects_bad_params(client):
+    response = client.post('/api/crawlers/batch', json={'names': ['fast'], 'timeout': 'abc'})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+    response = client.post('/api/crawlers/batch', json={'names': ['unknown']})
+    assert response.status_code == 400
+
+
+def test_route_parses_use_cache_string(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(batch.crawl_cache, 'get', lambda key, loader: calls.append(key) or loader())
+
+    response = client.post('/api/crawlers/batch', json={'names': ['fast'], 'use_cache': 'false'})
+    assert response.status_code == 200
+    assert response.get_json()['data']['fast']['data'] == ['fast']
+    assert calls == []
+
+    response = client.get('/api/crawlers/batch?names=fast&use_cache=true&timeout=5&max_workers=2')
+    assert response.status_code == 200
+    assert calls == ['fast']
+
+
+def test_cache_keys_match_individual_routes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(batch, 'CRAWLER_SOURCES', {'chinapolicy': lambda: [], 'fast': lambda: []})
+    monkeypatch.setattr(batch.crawl_cache, 'get', lambda key, loader: calls.append(key) or loader())
+
+    batch.run_batch(['chinapolicy', 'fast'], max_workers=1)
+
+    # chinapolicy接口默认days=1，缓存键为chinapolicy:1
+    assert calls == ['chinapolicy:1', 'fast']
@@ -0,0 +1,113 @@
+import pytest
+
+import env
+import paddle_ocr
+
+pytest.importorskip('cv2')
+from _standin import free_port, start_in_thread
+from ocr_standin_server import StandinServer, make_long_image
+
+SLICE_HEIGHT = 1000
+OVERLAP = 200
+# make_long_image中每行的位置：从24开始，行高32，行间距24
+LINE_TOP, LINE_HEIGHT, LINE_PERIOD = 24, 32, 56
+
+
+@pytest.fixture(scope='module')
+def server():
+    port = free_port()
+    server = StandinServer(ms_per_mpx=0, workers=4)
+    start_in_thread(server.app, port)
+    return f'http://127.0.0.1:{port}/predict/ocr_system'
+
+
+@pytest.fixture
+def ocr(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(env, 'OCR_URL', server)
+    monkeypatch.setattr(env, 'OCR_SLICE_HEIGHT', SLICE_HEIGHT)
+    monkeypatch.setattr(env, 'OCR_SLICE_OVERLAP', OVERLAP)
+    monkeypatch.setattr(env, 'OCR_BATCH_SLICES', 2)
+    monkeypatch.setattr(env, 'OCR_CONCURRENCY', 1)
+
+    def run(height):
+        path = str(tmp_path / f'long_{height}.png')
+        expected = make_long_image(path, height)
+        return expected, paddle_ocr.ocr_long_image(path)[1]
+
+    return run
+
+
+def _straddles(y: int) -> bool:
+    return any(top < y < top + LINE_HEIGHT for top in range(LINE_TOP, y + 1, LINE_PERIOD))
+
+
+def test_slice_ranges():
+    assert paddle_ocr.slice_ranges(500, 1000, 200) == [(0, 500)]
+    assert paddle_ocr.slice_ranges(2400, 1000, 200) == [(0, 1000), (800, 1800), (1600, 2400)]
+    assert paddle_ocr.slice_ranges(2000, 1000, 0) == [(0, 1000), (1000, 2000)]
+    # 重叠不超过切片高度的一半
+    assert paddle_ocr.slice_ranges(1500, 1000, 800) == [(0, 1000), (500, 1500)]
+
+
+def test_merge_slices_keeps_each_line_once():
+    ranges = [(0, 100), (80, 180)]
+    results = [
+        [{'text': 'a', 'text_box_position': [[0, 10], [1, 10], [1, 30], [0, 30]]},
+         {'text': 'cut', 'text_box_position': [[0, 85], [1, 85], [1, 100], [0, 100]]}],
+        [{'text': 'b', 'text_box_position': [[0, 5], [1, 5], [1, 25], [0, 25]]},
+         {'text': 'c', 'text_box_position': [[0, 50], [1, 50], [1, 70], [0, 70]]}],
+    ]
+    assert paddle_ocr.merge_slices(ranges, results) == ['a', 'b', 'c']
+    assert paddle_ocr.merge_slices(ranges, [None, results[1]]) == ['b', 'c']
+
+
+def test_image_shorter_than_one_slice(ocr):
+    expected, texts = ocr(500)
+    assert texts == [expected]
+
+
+def test_height_exact_multiple_of_stride(ocr):
+    height = 3 * (SLICE_HEIGHT - OVERLAP)
+    assert len(paddle_ocr.slice_ranges(height, SLICE_HEIGHT, OVERLAP)) == 3
+    expected, texts = ocr(height)
+    assert texts == [expected]
+
+
+def test_line_straddling_a_seam(ocr):
+    height = 2500
+    ranges = paddle_ocr.slice_ranges(height, SLICE_HEIGHT, OVERLAP)
+    assert any(_straddles(end) for _, end in ranges[:-1])
+    expected, texts = ocr(height)
+    assert texts == [expected]
+
+
+def test_no_overlap(ocr, monkeypatch):
+    # 切片高度是行周期的整数倍，没有文字被切断
+    monkeypatch.setattr(env, 'OCR_SLICE_HEIGHT', LINE_PERIOD * 18)
+    monkeypatch.setattr(env, 'OCR_SLICE_OVERLAP', 0)
+    height = LINE_PERIOD * 18 * 3 + 300
+    ranges = paddle_ocr.slice_ranges(height, LINE_PERIOD * 18, 0)
+    assert len(ranges) == 4 and not any(_straddles(end) for _, end in ranges[:-1])
+    expected, texts = ocr(height)
+    assert texts == [expected]
+
+
+def test_concurrent_batches_keep_vertical_order(tmp_path, monkeypatch):
+    # 先发出的请求后返回，结果仍按切片的上下顺序合并
+    port = free_port()
+    server = StandinServer(ms_per_mpx=0, workers=4, reverse_delay=0.4)
+    start_in_thread(server.app, port)
+    monkeypatch.setattr(env, 'OCR_URL', f'http://127.0.0.1:{port}/predict/ocr_system')
+    monkeypatch.setattr(env, 'OCR_SLICE_HEIGHT', SLICE_HEIGHT)
+    monkeypatch.setattr(env, 'OCR_SLICE_OVERLAP', OVERLAP)
+    monkeypatch.setattr(env, 'OCR_BATCH_SLICES', 1)
+    monkeypatch.setattr(env, 'OCR_CONCURRENCY', 4)
+    height = 4 * (SLICE_HEIGHT - OVERLAP) + OVERLAP
+    path = str(tmp_path / 'long.png')
+    expected = make_long_image(path, height)
+
+    texts = paddle_ocr.ocr_long_image(path)[1]
+
+    assert server.requests == 4
+    assert server.completed != sorted(server.completed)
+    assert texts == [expected]
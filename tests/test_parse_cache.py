@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+import env
+import parse_cache
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(env, 'PARSE_CACHE_DB', str(tmp_path / 'parse_cache.db'))
+    monkeypatch.setattr(env, 'PARSE_CACHE_MAX_BYTES', 1024 * 1024)
+    monkeypatch.setattr(parse_cache, '_store', None)
+
+
+class CountingParser:
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, source):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        with open(source, 'rb') as f:
+            return {'text': f.read().decode('utf-8')}
+
+
+def _write(path, content):
+    path.write_bytes(content.encode('utf-8'))
+    return str(path)
+
+
+def test_same_content_hits_regardless_of_file_name(tmp_path):
+    parser = CountingParser()
+    first = parse_cache.parse('test', 1, _write(tmp_path / 'a.pdf', 'hello'), parser)
+    second = parse_cache.parse('test', 1, _write(tmp_path / 'b.pdf', 'hello'), parser)
+
+    assert first == second == {'text': 'hello'}
+    assert parser.calls == 1
+
+
+def test_different_content_parser_or_version_misses(tmp_path):
+    parser = CountingParser()
+    path = _write(tmp_path / 'a.pdf', 'hello')
+    parse_cache.parse('test', 1, path, parser)
+
+    assert parse_cache.parse('test', 1, _write(tmp_path / 'b.pdf', 'world'), parser) == {'text': 'world'}
+    parse_cache.parse('test', 2, path, parser)
+    parse_cache.parse('other', 1, path, parser)
+    assert parser.calls == 4
+
+
+def test_content_key_matches_for_path_and_bytes(tmp_path):
+    path = _write(tmp_path / 'a.pdf', 'hello')
+    assert parse_cache.content_key(path, 'test', 1) == parse_cache.content_key(b'hello', 'test', 1)
+    assert parse_cache.content_key(path, 'test', 1) != parse_cache.content_key(path, 'test', 2)
+
+
+def test_concurrent_parses_call_parser_once(tmp_path):
+    parser = CountingParser(delay=0.3)
+    path = _write(tmp_path / 'a.pdf', 'hello')
+    barrier = threading.Barrier(5)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(parse_cache.parse('test', 1, path, parser))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert parser.calls == 1
+    assert results == [{'text': 'hello'}] * 5
+
+
+def test_disabled_cache_always_parses(tmp_path, monkeypatch):
+    monkeypatch.setattr(env, 'PARSE_CACHE_MAX_BYTES', 0)
+    parser = CountingParser()
+    path = _write(tmp_path / 'a.pdf', 'hello')
+    parse_cache.parse('test', 1, path, parser)
+    parse_cache.parse('test', 1, path, parser)
+    assert parser.calls == 2
@@ -0,0 +1,108 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from aiohttp import ClientSession
+
+import workflow_stream
+from _standin import free_port, start_in_thread
+from sse_standin_server import StandinServer
+
+PROMPT = '1.还款\n2.不还\n3.无识别'
+EXPECTED = '1, 标签-还款\n2, 标签-不还\n3, 标签-无识别'
+
+
+@pytest.fixture(scope='module')
+def standin():
+    server = StandinServer(first_token_delay=0.05, token_interval=0.01, slow_delay=2.0, ping_interval=0.1,
+                           node_delay=0.6)
+    port = free_port()
+    start_in_thread(server.app, port)
+    server.base_url = f'http://127.0.0.1:{port}'
+    return server
+
+
+def _url(server, scenario):
+    return f'{server.base_url}/{scenario}/v1/workflows/run'
+
+
+def _data(mode='streaming'):
+    return {'inputs': {'text': PROMPT}, 'response_mode': mode, 'user': str(uuid.uuid4())}
+
+
+HEADERS = {'Authorization': 'Bearer app-standin'}
+
+
+def test_streaming_result_matches_blocking(standin):
+    blocking = workflow_stream.post(_url(standin, 'normal'), HEADERS, _data('blocking'))
+    chunks = []
+    streaming = workflow_stream.post(_url(standin, 'normal'), HEADERS, _data(), on_chunk=chunks.append)
+
+    assert streaming['data']['outputs'] == blocking['data']['outputs'] == {'text': EXPECTED}
+    assert ''.join(chunks) == EXPECTED
+
+
+def test_ttft_timeout_before_workflow_starts(standin):
+    start = time.monotonic()
+    with pytest.raises(workflow_stream.WorkflowTimeout, match='首个token超时'):
+        workflow_stream.post(_url(standin, 'slow'), HEADERS, _data(), ttft_timeout=0.5, idle_timeout=0)
+    assert time.monotonic() - start < 1.5
+
+
+def test_node_events_count_as_progress(standin):
+    # 三个节点共1.8秒没有文本，首个token超时只要求0.5秒内有进度事件
+    result = workflow_stream.post(_url(standin, 'nodes'), HEADERS, _data(), ttft_timeout=0.5, idle_timeout=1)
+
+    assert result['data']['status'] == 'succeeded'
+    assert result['data']['outputs'] == {'text': EXPECTED}
+
+
+def test_pings_do_not_reset_idle_timeout(standin):
+    # 节点执行期间每0.1秒一个ping，停滞超时仍然生效
+    with pytest.raises(workflow_stream.WorkflowTimeout, match='生成停滞超时'):
+        workflow_stream.post(_url(standin, 'nodes'), HEADERS, _data(), ttft_timeout=0, idle_timeout=0.3)
+
+
+def test_idle_timeout_keeps_partial_and_stops_task(standin):
+    stopped = len(standin.stopped)
+    with pytest.raises(workflow_stream.WorkflowTimeout, match='生成停滞超时') as e:
+        workflow_stream.post(_url(standin, 'stall'), HEADERS, _data(), idle_timeout=0.5)
+
+    assert e.value.partial and EXPECTED.startswith(e.value.partial)
+    assert len(standin.stopped) == stopped + 1
+
+
+def test_error_event(standin):
+    with pytest.raises(workflow_stream.WorkflowStreamError, match='模拟错误') as e:
+        workflow_stream.post(_url(standin, 'error'), HEADERS, _data())
+    assert not isinstance(e.value, workflow_stream.WorkflowTimeout)
+    assert EXPECTED.startswith(e.value.partial)
+
+
+def test_workflow_finished_with_failed_status(standin):
+    with pytest.raises(workflow_stream.WorkflowStreamError, match='工作流执行失败\\[failed\\]') as e:
+        workflow_stream.post(_url(standin, 'failed'), HEADERS, _data())
+    assert not isinstance(e.value, workflow_stream.WorkflowTimeout)
+    assert e.value.partial and EXPECTED.startswith(e.value.partial)
+
+
+def test_http_error_status(standin):
+    with pytest.raises(workflow_stream.WorkflowStreamError) as e:
+        workflow_stream.post(_url(standin, 'http500'), HEADERS, _data())
+    assert e.value.status_code == 500
+
+
+def test_async_timeouts(standin):
+    async def run():
+        async with ClientSession() as session:
+            result = await workflow_stream.apost(session, _url(standin, 'nodes'), HEADERS, _data(),
+                                                 ttft_timeout=0.5, idle_timeout=1)
+            assert result['data']['outputs'] == {'text': EXPECTED}
+            with pytest.raises(workflow_stream.WorkflowTimeout, match='首个token超时'):
+                await workflow_stream.apost(session, _url(standin, 'slow'), HEADERS, _data(),
+                                            ttft_timeout=0.5, idle_timeout=0)
+            with pytest.raises(workflow_stream.WorkflowTimeout, match='生成停滞超时'):
+                await workflow_stream.apost(session, _url(standin, 'stall'), HEADERS, _data(), idle_timeout=0.5)
+
+    asyncio.run(run())
@@ -4,6 +4,9 @@ from docx.oxml.text.paragraph import CT_P
 from docx.table import Table
 from docx.text.paragraph import Paragraph
 
+# 解析逻辑或结果格式变化时加1，使解析缓存中的旧结果失效
+PARSER_VERSION = 1
+
 
 def iter_block_items(parent):
     """
@@ -18,6 +21,14 @@ def iter_block_items(parent):
             yield Table(child, parent)
 
 
+def read_paragraphs(file_path):
+    """
+    只读取非空段落的文本，不包括表格
+    """
+    doc = Document(file_path)
+    return '\n'.join(para.text for para in doc.paragraphs if para.text)
+
+
 def read_text_and_tables_from_word(file_path):
     doc = Document(file_path)
     content_texts = []
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import logging
+import time
+
+import requests
+from aiohttp import ClientTimeout
+
+import env
+
+logger = logging.getLogger(__name__)
+
+# 输出文本增量的事件，workflow为text_chunk，chat为message/agent_message
+TEXT_EVENTS = ('text_chunk', 'message', 'agent_message')
+# 表示工作流仍在执行的事件，与文本事件一样结束首个token的计时
+# 结束节点才输出文本、或中间有耗时较长的非流式节点时，不会因为迟迟没有文本被取消
+PROGRESS_EVENTS = ('workflow_started', 'node_started', 'node_finished',
+                   'iteration_started', 'iteration_next', 'iteration_completed')
+
+
+class WorkflowStreamError(Exception):
+    """
+    工作流调用失败，partial为失败前已经生成的文本，status_code为非200响应的状态码
+    """
+
+    def __init__(self, message: str, partial: str = '', status_code: int = None):
+        super().__init__(message)
+        self.partial = partial
+        self.status_code = status_code
+
+
+class WorkflowTimeout(WorkflowStreamError):
+    """首个token、生成停滞或整体超时，已请求取消生成"""
+
+
+def is_streaming(data: dict) -> bool:
+    return data.get('response_mode') == 'streaming'
+
+
+def _is_chat(url: str) -> bool:
+    return url.rstrip('/').endswith('/chat-messages')
+
+
+def _stop_url(url: str, task_id: str) -> None | str:
+    url = url.rstrip('/')
+    if url.endswith('/workflows/run'):
+        return f'{url[:-len("/run")]}/tasks/{task_id}/stop'
+    if url.endswith('/chat-messages'):
+        return f'{url}/{task_id}/stop'
+    return None
+
+
+class SSEParser:
+    """
+    增量解析text/event-stream，按任意大小的数据块输入，返回其中完整的事件
+    """
+
+    def __init__(self):
+        self._buffer = b''
+        self._data = []
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b'\n')
+        events = []
+        for line in lines:
+            event = self._feed_line(line.decode('utf-8').rstrip('\r'))
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _feed_line(self, line: str) -> None | dict:
+        if not line:
+            # 空行表示一个事件结束
+            if not self._data:
+                return None
+            payload = '\n'.join(self._data)
+            self._data = []
+            try:
+                return json.loads(payload)
+            except ValueError:
+                logger.error(f'工作流事件不是正确的JSON[{payload}]')
+                return None
+        if line.startswith(':'):
+            return None
+        field, _, value = line.partition(':')
+        if field == 'data':
+            self._data.append(value[1:] if value.startswith(' ') else value)
+        # event: ping 等没有data的事件忽略
+        return None
+
+
+class StreamCollector:
+    """
+    汇总流式事件并检查超时，结束后result与blocking模式的响应格式一致
+    """
+
+    def __init__(self, url: str, ttft_timeout: float = None, idle_timeout: float = None, total_timeout: float = None):
+        self.chat = _is_chat(url)
+        self.ttft_timeout = env.WORKFLOW_TTFT_TIMEOUT if ttft_timeout is None else ttft_timeout
+        self.idle_timeout = env.WORKFLOW_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.total_timeout = env.WORKFLOW_TOTAL_TIMEOUT if total_timeout is None else total_timeout
+        self.started_at = time.monotonic()
+        self.last_event_at = self.started_at
+        # 收到第一个文本或进度事件的时间，首个token超时按它计算
+        self.first_progress_at = None
+        self.first_token_at = None
+        self.task_id = None
+        self.chunks = []
+        self.result = None
+
+    @property
+    def partial(self) -> str:
+        return ''.join(self.chunks)
+
+    def _deadlines(self) -> list[tuple[float, str]]:
+        deadlines = []
+        if self.ttft_timeout and self.first_progress_at is None:
+            deadlines.append((self.started_at + self.ttft_timeout, f'首个token超时[{self.ttft_timeout}s]'))
+        if self.idle_timeout:
+            deadlines.append((self.last_event_at + self.idle_timeout, f'生成停滞超时[{self.idle_timeout}s]'))
+        if self.total_timeout:
+            deadlines.append((self.started_at + self.total_timeout, f'生成超时[{self.total_timeout}s]'))
+        return deadlines
+
+    def check(self):
+        now = time.monotonic()
+        for deadline, message in self._deadlines():
+            if now >= deadline:
+                raise WorkflowTimeout(message, self.partial)
+
+    def next_wait(self) -> None | float:
+        """
+        距离最近一个超时的秒数，没有超时设置时返回None
+        """
+        deadlines = self._deadlines()
+        if not deadlines:
+            return None
+        return max(0.0, min(i[0] for i in deadlines) - time.monotonic()) + 0.01
+
+    def handle(self, event: dict) -> None | str:
+        """
+        处理一个事件，返回新增的文本
+        除ping以外的事件都重新开始停滞计时
+        """
+        self.last_event_at = time.monotonic()
+        self.task_id = self.task_id or event.get('task_id')
+        name = event.get('event')
+        if self.first_progress_at is None and (name in TEXT_EVENTS or name in PROGRESS_EVENTS):
+            self.first_progress_at = self.last_event_at
+
+        if name in TEXT_EVENTS:
+            chunk = (event.get('data') or {}).get('text') if name == 'text_chunk' else event.get('answer')
+            if self.first_token_at is None:
+                self.first_token_at = self.last_event_at
+            if chunk:
+                self.chunks.append(chunk)
+            return chunk
+        if name == 'error':
+            raise WorkflowStreamError(f"工作流返回错误[{event.get('code')}][{event.get('message')}]", self.partial)
+        if name == 'workflow_finished':
+            data = event.get('data') or {}
+            if data.get('status') not in (None, 'succeeded'):
+                raise WorkflowStreamError(f"工作流执行失败[{data.get('status')}][{data.get('error')}]", self.partial)
+            if not self.chat:
+                self.result = {
+                    'task_id': self.task_id,
+                    'workflow_run_id': event.get('workflow_run_id'),
+                    'data': data,
+                }
+        elif name == 'message_end' and self.chat:
+            self.result = {
+                'event': 'message',
+                'task_id': self.task_id,
+                'message_id': event.get('message_id') or event.get('id'),
+                'conversation_id': event.get('conversation_id'),
+                'answer': self.partial,
+                'metadata': event.get('metadata', {}),
+            }
+        return None
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None
+
+
+def stop_task(url: str, headers: dict, task_id: str, user: str, verify=True):
+    """
+    取消生成，尽力而为，失败只记录日志
+    """
+    stop_url = _stop_url(url, task_id) if task_id else None
+    if not stop_url:
+        return
+    try:
+        requests.post(url=stop_url, headers=headers, json={'user': user}, verify=verify, timeout=10)
+        logger.info(f'已取消工作流生成[{task_id}]')
+    except Exception:
+        logger.error(f'取消工作流生成-失败[{task_id}]', exc_info=True)
+
+
+def iter_text(url: str, headers: dict, data: dict, collector: StreamCollector, verify=True):
+    """
+    以streaming模式调用工作流，逐段返回生成的文本，结束后完整结果在collector.result中
+    超时在每次收到数据（含ping）或读超时时检查
+    """
+    read_timeout = collector.idle_timeout or None
+    parser = SSEParser()
+    try:
+        with requests.post(url=url, headers=headers, json=data, verify=verify, stream=True,
+                           timeout=(10, read_timeout)) as resp:
+            if resp.status_code != 200:
+                raise WorkflowStreamError(f'状态码[{resp.status_code}][{resp.text}]', status_code=resp.status_code)
+            try:
+                for block in resp.iter_content(chunk_size=None):
+                    for event in parser.feed(block):
+                        chunk = collector.handle(event)
+                        if chunk:
+                            yield chunk
+                        if collector.finished:
+                            return
+                    collector.check()
+            except requests.exceptions.ConnectionError as e:
+                # 读超时说明已经停滞了idle_timeout秒，check()会抛出WorkflowTimeout
+                collector.check()
+                raise WorkflowStreamError(f'连接中断[{e}]', collector.partial)
+        raise WorkflowStreamError('响应流提前结束', collector.partial)
+    except (WorkflowTimeout, GeneratorExit):
+        # 超时或调用方不再需要结果，取消上游生成，释放上游资源
+        stop_task(url, headers, collector.task_id, data.get('user'), verify=verify)
+        raise
+
+
+def post(url: str, headers: dict, data: dict, on_chunk=None, ttft_timeout: float = None, idle_timeout: float = None,
+         total_timeout: float = None, verify=True) -> dict:
+    """
+    调用工作流，返回与blocking模式格式一致的结果
+    data中response_mode为streaming时按流式调用，on_chunk(text)在每段文本到达时调用
+    """
+    if not is_streaming(data):
+        resp = requests.post(url=url, headers=headers, json=data, verify=verify)
+        if resp.status_code != 200:
+            raise WorkflowStreamError(f'状态码[{resp.status_code}][{resp.text}]', status_code=resp.status_code)
+        return resp.json()
+
+    collector = StreamCollector(url, ttft_timeout, idle_timeout, total_timeout)
+    for chunk in iter_text(url, headers, data, collector, verify=verify):
+        if on_chunk:
+            on_chunk(chunk)
+    return collector.result
+
+
+async def _astop_task(session, url: str, headers: dict, task_id: str, user: str):
+    stop_url = _stop_url(url, task_id) if task_id else None
+    if not stop_url:
+        return
+    try:
+        async with session.post(url=stop_url, headers=headers, json={'user': user}, ssl=True):
+            logger.info(f'已取消工作流生成[{task_id}]')
+    except Exception:
+        logger.error(f'取消工作流生成-失败[{task_id}]', exc_info=True)
+
+
+async def apost(session, url: str, headers: dict, data: dict, on_chunk=None, ttft_timeout: float = None,
+                idle_timeout: float = None, total_timeout: float = None, timeout: float = None) -> dict:
+    """
+    post的异步版本，使用调用方的aiohttp会话
+    :param timeout: 整个请求的超时时间(秒)，为None时使用会话的设置
+    """
+    kwargs = {'timeout': ClientTimeout(total=timeout)} if timeout else {}
+    if not is_streaming(data):
+        async with session.post(url=url, headers=headers, json=data, ssl=True, **kwargs) as response:
+            if response.status != 200:
+                raise WorkflowStreamError(f'状态码[{response.status}][{await response.text()}]',
+                                          status_code=response.status)
+            return await response.json()
+
+    collector = StreamCollector(url, ttft_timeout, idle_timeout, total_timeout)
+    parser = SSEParser()
+    try:
+        async with session.post(url=url, headers=headers, json=data, ssl=True, **kwargs) as response:
+            if response.status != 200:
+                raise WorkflowStreamError(f'状态码[{response.status}][{await response.text()}]',
+                                          status_code=response.status)
+            while True:
+                try:
+                    # 等到最近的超时时间为止，超时后check()一定会抛出WorkflowTimeout
+                    block = await asyncio.wait_for(response.content.readany(), collector.next_wait())
+                except asyncio.TimeoutError:
+                    collector.check()
+                    continue
+                if not block:
+                    break
+                for event in parser.feed(block):
+                    chunk = collector.handle(event)
+                    if chunk and on_chunk:
+                        on_chunk(chunk)
+                    if collector.finished:
+                        return collector.result
+                collector.check()
+        raise WorkflowStreamError('响应流提前结束', collector.partial)
+    except WorkflowTimeout:
+        await _astop_task(session, url, headers, collector.task_id, data.get('user'))
+        raise